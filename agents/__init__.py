@@ -9,15 +9,27 @@ from .base import (
     AgentContext, MultiAgentResponse
 )
 
-from .web_agent import WebAgent
+from .factory import AgentFactory, AgentCapabilities
 
-from .cursor_agent import CursorAgent
-from .windsurf_agent import WindsurfAgent
-from .openai_codex_agent import OpenAICodexAgent
-from .test_agent import TestAgent
-from .factory import AgentFactory
-from .gemini_cli_agent import GeminiCliAgent
-from .claude_cli_agent import ClaudeCliAgent
+# Agent implementations pull in GUI/browser dependencies, so they are imported on first access
+_LAZY_AGENT_CLASSES = {
+    'WebAgent': '.web_agent',
+    'CursorAgent': '.cursor_agent',
+    'WindsurfAgent': '.windsurf_agent',
+    'OpenAICodexAgent': '.openai_codex_agent',
+    'TestAgent': '.test_agent',
+    'GeminiCliAgent': '.gemini_cli_agent',
+    'ClaudeCliAgent': '.claude_cli_agent',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_AGENT_CLASSES:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_AGENT_CLASSES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'CodingAgent',
@@ -34,6 +46,7 @@ __all__ = [
     'OpenAICodexAgent',
     'TestAgent',
     'AgentFactory',
+    'AgentCapabilities',
     'GeminiCliAgent',
     'ClaudeCliAgent'
 ] 
\ No newline at end of file
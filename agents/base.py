@@ -3,15 +3,16 @@
 Base classes and shared components for coding agents.
 """
 
-import time
-import pyautogui
-import pyperclip
+import asyncio
 import os
+import time
+import uuid
 from abc import ABC, abstractmethod
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 from common.config import config
+from common.tracing import span
 
 # Import ReadyIndicatorMode from tmux operations manager
 from tmux_operations_manager import ReadyIndicatorMode
@@ -79,11 +80,17 @@ class MultiAgentTask:
         self._sort_agents_by_role()
     
     def _validate_unique_roles(self):
-        """Ensure each role appears only once"""
+        """Ensure each role appears only once (unless agents carry explicit ids)"""
         used_roles = set()
+        used_ids = set()
         for i, agent in enumerate(self.agents):
+            if agent.agent_id:
+                if agent.agent_id in used_ids:
+                    raise ValueError(f"Duplicate agent_id '{agent.agent_id}' found at agent {i}.")
+                used_ids.add(agent.agent_id)
+                continue
             if agent.role in used_roles:
-                raise ValueError(f"Duplicate role '{agent.role.value}' found at agent {i}. Each role can only be assigned to one agent.")
+                raise ValueError(f"Duplicate role '{agent.role.value}' found at agent {i}. Each role can only be assigned to one agent unless agents declare an explicit 'agent_id'.")
             used_roles.add(agent.role)
     
     def _validate_workflow_requirements(self):
@@ -155,18 +162,30 @@ class MultiAgentTask:
 
 @dataclass
 class AgentDefinition:
-    """Definition of an agent with its role and model"""
+    """Definition of an agent with its role and model
+    
+    ``agent_id`` and ``depends_on`` are optional. When any agent in a task declares
+    ``depends_on``, the orchestrator schedules the agents as a dependency graph and
+    runs independent agents concurrently; otherwise agents run one after another.
+    """
     coding_ide: str
     model: str
     role: AgentRole
+    agent_id: Optional[str] = None  # Stable identifier other agents can depend on
+    depends_on: Optional[List[str]] = None  # agent_ids that must finish before this agent starts
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
+        result = {
             "coding_ide": self.coding_ide,
             "model": self.model,
             "role": self.role.value
         }
+        if self.agent_id:
+            result["agent_id"] = self.agent_id
+        if self.depends_on is not None:
+            result["depends_on"] = list(self.depends_on)
+        return result
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'AgentDefinition':
@@ -176,10 +195,19 @@ class AgentDefinition:
         if not coding_ide:
             raise ValueError("Missing required field: 'coding_ide' (or legacy 'name')")
         
+        depends_on = data.get("depends_on")
+        if depends_on is not None:
+            if isinstance(depends_on, str):
+                depends_on = [depends_on]
+            if not isinstance(depends_on, list) or not all(isinstance(dep, str) for dep in depends_on):
+                raise ValueError("'depends_on' must be a list of agent_id strings")
+        
         return cls(
             coding_ide=coding_ide,
             model=data["model"],
-            role=AgentRole(data["role"])
+            role=AgentRole(data["role"]),
+            agent_id=data.get("agent_id"),
+            depends_on=depends_on
         )
 
 
@@ -194,15 +222,18 @@ class AgentContext:
     working_repo_url: Optional[str] = None  # Repository URL agents should work with (may be fork)
     original_repo_url: Optional[str] = None  # Original repository URL before any forking
     
-    def add_agent_output(self, coding_ide: str, role: AgentRole, output: str, success: bool):
-        """Add output from an agent to the context"""
-        self.previous_outputs.append({
+    def add_agent_output(self, coding_ide: str, role: AgentRole, output: str, success: bool,
+                         step: Optional[int] = None) -> Dict[str, Any]:
+        """Add output from an agent to the context and return the stored entry"""
+        entry = {
             "coding_ide": coding_ide,
             "role": role.value,
             "output": output,
             "success": success,
-            "step": self.current_step
-        })
+            "step": step if step is not None else self.current_step
+        }
+        self.previous_outputs.append(entry)
+        return entry
     
     def get_outputs_by_role(self, role: AgentRole) -> List[Dict[str, Any]]:
         """Get all outputs from agents with a specific role"""
@@ -241,6 +272,8 @@ class MultiAgentResponse:
     error_message: Optional[str] = None
     execution_time_seconds: Optional[float] = None
     pr_url: Optional[str] = None
+    run_id: Optional[str] = None  # Checkpoint id of the run that produced this response
+    cache_hit: bool = False  # True when returned from the result cache instead of running agents
 
 class CodingAgent(ABC):
     """Abstract base class for AI coding agents"""
@@ -248,8 +281,11 @@ class CodingAgent(ABC):
     def __init__(self, computer_use_client):
         self.computer_use_client = computer_use_client
         self.agent_name = self.__class__.__name__.lower().replace('agent', '')
-        self.output_file = "agent_execution_output.md"
+        # Unique per agent, so agents sharing a work directory never read (and delete) each other's output
+        self.output_file = f"agent_execution_output_{self.agent_name}_{uuid.uuid4().hex[:8]}.md"
         self._current_project_name = None  # Track current project
+        self._project_path = None  # Work directory the agent operates on
+        self._activity_monitor = None  # Watcher of the work directory during the last completion wait
     
     @property
     @abstractmethod
@@ -280,9 +316,32 @@ class CodingAgent(ABC):
         """Optional keyboard shortcut to open the agent interface"""
         return None
     
+    @property
+    def chat_panel_region(self) -> Optional[tuple]:
+        """Optional (left, top, right, bottom) fractions of the window holding the agent chat,
+        captured instead of the whole window when CROP_IDE_SCREENSHOTS is enabled"""
+        return None
+    
+    @property
+    def state_templates_dir(self) -> Optional[str]:
+        """Optional directory of per-state marker images ({state}/*.png) for the local
+        IDE state classifier; see utils/ide_state_classifier.py"""
+        return None
+    
     def set_current_project(self, project_path: str):
-        """Set the current project name for window title checking"""
-        self._current_project_name = os.path.basename(project_path)
+        """Set the project (work directory) the agent operates on and its name for window title checking"""
+        self._project_path = os.path.abspath(project_path)
+        self._current_project_name = os.path.basename(self._project_path)
+    
+    @property
+    def project_path(self) -> str:
+        """Work directory of the current project
+        
+        Agents never rely on the process cwd when a project is set, so several
+        orchestrators can run in one process. Falls back to the cwd only for
+        agents used standalone without set_current_project().
+        """
+        return self._project_path or os.getcwd()
     
     def is_ide_open_with_correct_project(self) -> bool:
         """Check if the IDE is open with the correct project by checking window titles"""
@@ -372,7 +431,7 @@ class CodingAgent(ABC):
             
             if close_success:
                 # Wait a moment for the window to close
-                time.sleep(1)
+                await asyncio.sleep(1)
                 
                 # Verify the window was closed
                 if not self.is_ide_open_with_correct_project():
@@ -403,13 +462,15 @@ class CodingAgent(ABC):
         try:
             # Step 1: Send the prompt
             print(f"Sending prompt to {self.agent_name}...")
-            await self._send_prompt_to_interface(prompt)
+            with span("agent.send_prompt", category="agent", agent=self.agent_name):
+                await self._send_prompt_to_interface(prompt)
             # wait for 5 seconds to make sure the prompt is sent
-            time.sleep(5)
+            await asyncio.sleep(5)
 
             # Step 2: Wait for completion
             print(f"Waiting for {self.agent_name} to complete...")
-            await self._wait_for_completion()
+            with span("agent.wait_for_completion", category="agent", agent=self.agent_name):
+                await self._wait_for_completion()
             
             # Step 3: Ask agent to save output
             print(f"Asking {self.agent_name} to save output to {self.output_file}...")
@@ -420,15 +481,18 @@ class CodingAgent(ABC):
                 from utils.computer_use_utils import bring_to_front_window
                 bring_to_front_window(self.agent_name, self._current_project_name)
             
-            await self._send_prompt_to_interface(save_prompt)
-            time.sleep(3)
+            with span("agent.send_prompt", category="agent", agent=self.agent_name, purpose="save_output"):
+                await self._send_prompt_to_interface(save_prompt)
+            await asyncio.sleep(3)
 
             # Wait a bit for file save operation (use shorter timeout for file save)
-            await self._wait_for_completion(timeout_seconds=240)
+            with span("agent.wait_for_completion", category="agent", agent=self.agent_name, purpose="save_output"):
+                await self._wait_for_completion(timeout_seconds=240)
             
             # Step 4: Read the file
             print(f"Reading output from {self.output_file}...")
-            content = await self._read_output_file()
+            with span("agent.read_output_file", category="agent", agent=self.agent_name):
+                content = await self._read_output_file()
             
             return AgentResponse(content=content, success=True)
         except Exception as e:
@@ -440,6 +504,10 @@ class CodingAgent(ABC):
     
     async def _send_prompt_to_interface(self, prompt: str):
         """Send a prompt to the agent interface (GUI-based implementation)"""
+        # Imported here so that non-GUI agents never load the desktop automation stack
+        import pyautogui
+        import pyperclip
+        
         # Check if the correct project window is visible and focused (with auto-focus enabled)
         if self._current_project_name:
             from utils.computer_use_utils import is_project_window_visible, play_beep_sound
@@ -460,61 +528,60 @@ class CodingAgent(ABC):
         
         # Focus on the input field
         pyautogui.moveTo(input_coords.coordinates.x, input_coords.coordinates.y, duration=0.5)
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         pyautogui.click(input_coords.coordinates.x, input_coords.coordinates.y)
-        time.sleep(1.0)
+        await asyncio.sleep(1.0)
         
         # Copy prompt to clipboard and paste it
         pyperclip.copy(prompt)
-        time.sleep(0.5)
+        await asyncio.sleep(0.5)
         
         # Paste the prompt using Cmd+V on macOS
         pyautogui.hotkey('command', 'v')
-        time.sleep(1.0)
+        await asyncio.sleep(1.0)
         
         # Submit the prompt
         pyautogui.press('enter')
-        time.sleep(1.0)
+        await asyncio.sleep(1.0)
     
     async def _wait_for_completion(self, timeout_seconds: int = None):
         """Wait for the agent to complete processing"""
         from utils.ide_completion_detector import wait_until_ide_finishes
+        from utils.ide_state_classifier import TemplateStateClassifier
+        from utils.workspace_activity import WorkspaceActivityMonitor
         from common.config import config
         
         # Use configured timeout if not explicitly provided
         if not timeout_seconds:
             timeout_seconds = config.agent_timeout_seconds
         
-        await wait_until_ide_finishes(
-            self.agent_name, 
-            self.interface_state_prompt, 
-            timeout_seconds, 
-            self.resume_button_prompt, 
-            require_two_subsequent_done_states=True,
-            project_name=self._current_project_name,
-            save_screenshots_for_debug=config.save_screenshots_for_debug
-        )
+        # Kept on the agent so _read_output_file can use what it saw being created
+        self._activity_monitor = WorkspaceActivityMonitor(self.project_path, self.output_file)
+        with self._activity_monitor as activity_monitor:
+            await wait_until_ide_finishes(
+                self.agent_name, 
+                self.interface_state_prompt, 
+                timeout_seconds, 
+                self.resume_button_prompt, 
+                require_two_subsequent_done_states=True,
+                project_name=self._current_project_name,
+                save_screenshots_for_debug=config.save_screenshots_for_debug,
+                crop_region=self.chat_panel_region if config.crop_ide_screenshots else None,
+                state_classifier=TemplateStateClassifier.for_agent(self.agent_name, self.state_templates_dir),
+                activity_monitor=activity_monitor
+            )
     
     async def _read_output_file(self) -> str:
         """Read the output file and return its content"""
-        import glob
-        
-        # First try the current working directory
-        file_path = os.path.join(os.getcwd(), self.output_file)
+        from utils.workspace_activity import find_output_file
         
-        if os.path.exists(file_path):
-            found_file = file_path
-        else:
-            # Search recursively in current directory and subdirectories
-            search_pattern = os.path.join(os.getcwd(), "**", self.output_file)
-            matching_files = glob.glob(search_pattern, recursive=True)
-            
-            if matching_files:
-                # Use the first match found
-                found_file = matching_files[0]
-                print(f"Found {self.output_file} at: {found_file}")
-            else:
-                raise Exception(f"Output file {self.output_file} was not found in current directory or subdirectories")
+        # Look in the project directory first, then where the agent was seen creating it,
+        # then in untracked files and subdirectories (skipping dependency/vendored trees)
+        found_file = find_output_file(self.project_path, self.output_file, self._activity_monitor)
+        if not found_file:
+            raise Exception(f"Output file {self.output_file} was not found in {self.project_path} or its subdirectories")
+        if os.path.dirname(found_file) != self.project_path:
+            print(f"Found {self.output_file} at: {found_file}")
         
         # Read the file
         with open(found_file, 'r', encoding='utf-8') as f:
@@ -530,6 +597,9 @@ class CodingAgent(ABC):
 class CLIAgent(CodingAgent):
     """Base class for CLI-based coding agents using tmux"""
     
+    # Seconds between checks of the tmux session while waiting for completion
+    COMPLETION_CHECK_SECONDS = 5.0
+    
     def __init__(self, computer_use_client):
         super().__init__(computer_use_client)
         # CLI agents don't use GUI elements
@@ -607,17 +677,63 @@ class CLIAgent(CodingAgent):
         
         await self._tmux_service.send_command_to_session(self._session_id, prompt)
     
+    async def _session_is_idle(self) -> bool:
+        """Check if the tmux session shows the agent waiting for input (per its ready indicators)"""
+        if not self._tmux_service or not self._session_id:
+            return False
+        
+        try:
+            output = await self._tmux_service.capture_session_output(self._session_id)
+        except Exception as e:
+            print(f"Error checking {self.agent_name} session: {e}")
+            return False
+        if not output:
+            return False
+        
+        agent_config = self.get_config()
+        has_indicators = any(indicator in output for indicator in agent_config.ready_indicators)
+        # Compared by name: agent configs import the enum from common.tmux_types
+        if agent_config.ready_indicator_mode.name == ReadyIndicatorMode.INCLUSIVE.name:
+            return has_indicators  # Ready when the indicators are present
+        return not has_indicators  # Ready when the (busy) indicators are absent
+    
     async def _wait_for_completion(self, timeout_seconds: int = None):
-        """Wait for CLI agent to complete via tmux output monitoring"""
-        # This would need to be implemented based on agent-specific completion indicators
-        # For now, use a simple timeout
-        import asyncio
+        """Wait for CLI agent to complete
+        
+        Waits until the output file appears or the tmux session shows the agent idle
+        (see _session_is_idle), or until the timeout. Work directory activity is only a
+        hint: while files keep changing the agent is working, and once they stop the
+        session is checked right away. An agent that is quiet because it runs tests or
+        thinks is not cut off.
+        """
         from common.config import config
+        from utils.workspace_activity import WorkspaceActivityMonitor
         
         if timeout_seconds is None:
             timeout_seconds = config.agent_timeout_seconds
         
-        await asyncio.sleep(timeout_seconds)
+        check_interval = self.COMPLETION_CHECK_SECONDS
+        deadline = time.monotonic() + timeout_seconds
+        self._activity_monitor = WorkspaceActivityMonitor(self.project_path, self.output_file)
+        with self._activity_monitor as activity_monitor:
+            output_existed = activity_monitor.output_file_exists()
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"Warning: {self.agent_name} completion monitoring timed out after {timeout_seconds} seconds")
+                    return
+                
+                # Wakes early when the output file appears or writes stop
+                await activity_monitor.wait_for_signal(min(check_interval, remaining), config.workspace_quiet_seconds)
+                
+                if not output_existed and activity_monitor.output_file_exists():
+                    print(f"{self.agent_name} appears to have completed (output file)")
+                    return
+                if activity_monitor.is_active(config.workspace_quiet_seconds):
+                    continue
+                if await self._session_is_idle():
+                    print(f"{self.agent_name} appears to have completed (session idle)")
+                    return
     
     async def _read_output_file(self) -> str:
         """Read output from tmux session instead of file"""
@@ -65,36 +65,3 @@ class ClaudeCliAgent(CLIAgent):
             print(f"Error checking project context for {self.agent_name}: {e}")
             
         return False
-    
-    async def _wait_for_completion(self, timeout_seconds: int = None):
-        """Wait for Claude CLI to complete via output monitoring"""
-        # Claude-specific completion detection based on ready indicators
-        import asyncio
-        from common.config import config
-        
-        if not timeout_seconds:
-            timeout_seconds = config.agent_timeout_seconds
-        
-        start_time = asyncio.get_event_loop().time()
-        check_interval = 5  # Reduced frequency to minimize console spam
-        
-        while (asyncio.get_event_loop().time() - start_time) < timeout_seconds:
-            try:
-                if self._tmux_service and self._session_id:
-                    output = await self._tmux_service.capture_session_output(self._session_id)
-                    
-                    # Claude is done when "esc to interrupt" is NOT present (exclusive mode)
-                    agent_config = self.get_config()
-                    has_busy_indicators = any(indicator in output for indicator in agent_config.ready_indicators)
-                    
-                    if not has_busy_indicators:  # Ready when busy indicators are absent
-                        print(f"{self.agent_name} appears to have completed")
-                        return
-                        
-            except Exception as e:
-                print(f"Error monitoring {self.agent_name} completion: {e}")
-            
-            await asyncio.sleep(check_interval)
-        
-        print(f"Warning: {self.agent_name} completion monitoring timed out after {timeout_seconds} seconds")
- 
\ No newline at end of file
@@ -3,7 +3,7 @@
 Cursor Agent Implementation
 """
 
-import time
+import asyncio
 import pyautogui
 from typing import Optional
 from .base import CodingAgent
@@ -22,6 +22,14 @@ class CursorAgent(CodingAgent):
     def keyboard_shortcut(self) -> Optional[str]:
         return "cmd+l"  # Command+L opens Cursor chat
     
+    @property
+    def chat_panel_region(self) -> tuple:
+        return (0.5, 0.0, 1.0, 1.0)  # Cursor chat lives in the right pane
+    
+    @property
+    def state_templates_dir(self) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "cursor")
+    
     @property
     def interface_state_prompt(self) -> str:
         return """You are analyzing a screenshot of the Cursor AI coding assistant interface. You only care about the right panel. IGNORE ALL THE REST OF THE SCREENSHOT. Determine Cursor's current state based on visual cues in the right pane of the image. Return the following state for the following scenarios:
@@ -58,9 +66,9 @@ Only analyze the right panel and provide nothing but valid JSON in your response
     
     async def open_coding_interface(self) -> bool:
         """Open Cursor IDE and chat interface"""
-        # Set current project for window title checking
-        project_path = os.getcwd()
-        self.set_current_project(project_path)
+        # Default to the cwd only when the orchestrator did not set the project
+        if not self._current_project_name:
+            self.set_current_project(self.project_path)
         
         # First ensure Cursor application is running
         await self._ensure_cursor_app_open()
@@ -72,7 +80,7 @@ Only analyze the right panel and provide nothing but valid JSON in your response
         # Interface is not open or not with correct project, open chat interface with keyboard shortcut
         print(f"Opening {self.agent_name} chat interface with shortcut: {self.keyboard_shortcut}")
         pyautogui.hotkey('command', 'l')
-        time.sleep(2)  # Wait for interface to open
+        await asyncio.sleep(2)  # Wait for interface to open
         
         # Verify the chat interface opened with correct project
         if await self.is_coding_agent_open_with_project():
@@ -91,12 +99,12 @@ Only analyze the right panel and provide nothing but valid JSON in your response
         
         try:
             # Get current project path
-            project_path = os.getcwd()
+            project_path = self.project_path
             
             # Open Cursor with the current project
             subprocess.run(["open", "-a", self.window_name, project_path])
             print("Waiting 3 seconds for app to start...")
-            time.sleep(3)  # wait for the app to start
+            await asyncio.sleep(3)  # wait for the app to start
             
             # Activate the application
             activate_script = f'''
@@ -105,7 +113,7 @@ Only analyze the right panel and provide nothing but valid JSON in your response
             end tell
             '''
             subprocess.run(["osascript", "-e", activate_script], check=True)
-            time.sleep(1)
+            await asyncio.sleep(1)
             
             # Use computer_use_utils to activate window and steal focus for initial setup
             repo_name = os.path.basename(project_path)
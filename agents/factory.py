@@ -1,58 +1,101 @@
 #!/usr/bin/env python3
 """
 Agent Factory for creating coding agent instances
+
+Agent backends are registered by entry-point name ("module:Class") and only
+imported when an agent of that type is created, so e.g. running a CLI agent
+never loads the GUI (pyautogui, mss) or browser (Playwright) stacks.
 """
 
+import importlib
+from dataclasses import dataclass
+from typing import Dict, List, Type, Union
+
 from .base import CodingAgent, CodingAgentIdeType
-from .cursor_agent import CursorAgent
-from .windsurf_agent import WindsurfAgent
-from .openai_codex_agent import OpenAICodexAgent
-from .gemini_cli_agent import GeminiCliAgent
-from .claude_cli_agent import ClaudeCliAgent
-from .test_agent import TestAgent
+
+
+@dataclass(frozen=True)
+class AgentCapabilities:
+    """Entry point and static capabilities of an agent backend, known without importing it"""
+    entry_point: str  # "module:Class" of the backend
+    interface: str  # "gui", "web", "cli" or "headless"
+    parallel_safe: bool  # Several instances may run at the same time (e.g. in separate work directories)
+    needs_screen_focus: bool  # Drives the shared screen/keyboard, so excludes other such agents
+    supports_resume: bool  # Can continue after pausing (e.g. via a resume button)
+    
+    @property
+    def is_web(self) -> bool:
+        return self.interface == "web"
 
 
 class AgentFactory:
     """Factory for creating coding agent instances"""
     
+    # Declarative agent registry: one entry per agent type, imported on first use by load_agent_class
+    AGENTS: Dict[CodingAgentIdeType, AgentCapabilities] = {
+        CodingAgentIdeType.CURSOR: AgentCapabilities(
+            entry_point="agents.cursor_agent:CursorAgent",
+            interface="gui", parallel_safe=False, needs_screen_focus=True, supports_resume=True),
+        CodingAgentIdeType.WINDSURF: AgentCapabilities(
+            entry_point="agents.windsurf_agent:WindsurfAgent",
+            interface="gui", parallel_safe=False, needs_screen_focus=True, supports_resume=True),
+        CodingAgentIdeType.OPENAI_CODEX: AgentCapabilities(
+            entry_point="agents.openai_codex_agent:OpenAICodexAgent",
+            interface="web", parallel_safe=False, needs_screen_focus=False, supports_resume=False),
+        CodingAgentIdeType.GEMINI_CLI: AgentCapabilities(
+            entry_point="agents.gemini_cli_agent:GeminiCliAgent",
+            interface="cli", parallel_safe=True, needs_screen_focus=False, supports_resume=False),
+        CodingAgentIdeType.CLAUDE_CLI: AgentCapabilities(
+            entry_point="agents.claude_cli_agent:ClaudeCliAgent",
+            interface="cli", parallel_safe=True, needs_screen_focus=False, supports_resume=False),
+        CodingAgentIdeType.TEST: AgentCapabilities(
+            entry_point="agents.test_agent:TestAgent",
+            interface="headless", parallel_safe=True, needs_screen_focus=False, supports_resume=False),
+    }
+    
     @staticmethod
-    def create_agent(agent_type: CodingAgentIdeType, claude_computer_use) -> CodingAgent:
-        """Create an agent instance based on the agent type"""
-        if agent_type == CodingAgentIdeType.CURSOR:
-            return CursorAgent(claude_computer_use)
-        elif agent_type == CodingAgentIdeType.WINDSURF:
-            return WindsurfAgent(claude_computer_use)
-        elif agent_type == CodingAgentIdeType.OPENAI_CODEX:
-            return OpenAICodexAgent(claude_computer_use)
-        elif agent_type == CodingAgentIdeType.GEMINI_CLI:
-            return GeminiCliAgent(claude_computer_use)
-        elif agent_type == CodingAgentIdeType.CLAUDE_CLI:
-            return ClaudeCliAgent(claude_computer_use)
-        elif agent_type == CodingAgentIdeType.TEST:
-            return TestAgent(claude_computer_use)
-        else:
+    def _resolve_agent_type(agent_type: Union[CodingAgentIdeType, str]) -> CodingAgentIdeType:
+        if isinstance(agent_type, CodingAgentIdeType):
+            return agent_type
+        try:
+            return CodingAgentIdeType(agent_type.lower().strip())
+        except ValueError:
             raise ValueError(f"Unsupported agent: {agent_type}")
     
-    @staticmethod
-    def create_agent_from_string(agent_name: str, claude_computer_use) -> CodingAgent:
+    @classmethod
+    def load_agent_class(cls, agent_type: Union[CodingAgentIdeType, str]) -> Type[CodingAgent]:
+        """Import and return the agent class registered for an agent type"""
+        module_name, class_name = cls.get_capabilities(agent_type).entry_point.split(":")
+        return getattr(importlib.import_module(module_name), class_name)
+    
+    @classmethod
+    def get_capabilities(cls, agent_type: Union[CodingAgentIdeType, str]) -> AgentCapabilities:
+        """Get the capabilities of an agent type (or its string name) without creating the agent"""
+        capabilities = cls.AGENTS.get(cls._resolve_agent_type(agent_type))
+        if capabilities is None:
+            raise ValueError(f"Unsupported agent: {agent_type}")
+        return capabilities
+    
+    @classmethod
+    def is_web_agent(cls, agent_type: Union[CodingAgentIdeType, str]) -> bool:
+        """Check if an agent type is a web agent"""
+        return cls.get_capabilities(agent_type).is_web
+    
+    @classmethod
+    def agents_with(cls, **required) -> List[CodingAgentIdeType]:
+        """Get the agent types whose capabilities match all given values (e.g. parallel_safe=True)"""
+        return [agent_type for agent_type, capabilities in cls.AGENTS.items()
+                if all(getattr(capabilities, name) == value for name, value in required.items())]
+    
+    @classmethod
+    def create_agent(cls, agent_type: CodingAgentIdeType, claude_computer_use) -> CodingAgent:
+        """Create an agent instance based on the agent type"""
+        return cls.load_agent_class(agent_type)(claude_computer_use)
+    
+    @classmethod
+    def create_agent_from_string(cls, agent_name: str, claude_computer_use) -> CodingAgent:
         """Create an agent instance based on a string name (for backward compatibility)"""
-        agent_name = agent_name.lower().strip()
-        
-        if agent_name == "cursor":
-            return CursorAgent(claude_computer_use)
-        elif agent_name == "windsurf":
-            return WindsurfAgent(claude_computer_use)
-
-        elif agent_name == "openai_codex":
-            return OpenAICodexAgent(claude_computer_use)
-        elif agent_name == "gemini_cli":
-            return GeminiCliAgent(claude_computer_use)
-        elif agent_name == "claude_cli":
-            return ClaudeCliAgent(claude_computer_use)
-        elif agent_name == "test":
-            return TestAgent(claude_computer_use)
-        else:
-            raise ValueError(f"Unsupported agent: {agent_name}")
+        return cls.load_agent_class(agent_name)(claude_computer_use)
     
     @staticmethod
     def get_supported_agents() -> list:
@@ -78,38 +78,3 @@ class GeminiCliAgent(CLIAgent):
             print(f"Error checking project context for {self.agent_name}: {e}")
             
         return False
-    
-    async def _wait_for_completion(self, timeout_seconds: int = None):
-        """Wait for Gemini CLI to complete using callback mechanism to reduce polling"""
-        import asyncio
-        from common.config import config
-        
-        if timeout_seconds is None:
-            timeout_seconds = config.agent_timeout_seconds
-        
-        # Use callback mechanism instead of polling to reduce console spam
-        completion_event = asyncio.Event()
-        completion_status = None
-        
-        def completion_callback(session_id: str, status):
-            nonlocal completion_status
-            completion_status = status
-            completion_event.set()
-            print(f"{self.agent_name} completed with status: {status}")
-        
-        # Register callback with tmux service
-        if self._tmux_service and self._session_id:
-            self._tmux_service.register_completion_callback(self._session_id, completion_callback)
-            
-            try:
-                # Wait for completion or timeout
-                await asyncio.wait_for(completion_event.wait(), timeout=timeout_seconds)
-                print(f"{self.agent_name} completion detected via callback")
-            except asyncio.TimeoutError:
-                print(f"Warning: {self.agent_name} completion monitoring timed out after {timeout_seconds} seconds")
-                # Fall back to heuristic completion after timeout
-                pass
-        else:
-            print(f"Warning: No tmux service available for {self.agent_name}, using fallback delay")
-            await asyncio.sleep(10)  # Fallback delay
- 
\ No newline at end of file
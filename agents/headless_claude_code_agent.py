@@ -20,7 +20,7 @@ class HeadlessClaudeCodeAgent(CodingAgent):
     
     def __init__(self, claude_computer_use):
         super().__init__(claude_computer_use)
-        self.repo_dir = os.getcwd()
+        self.repo_dir = None  # Defaults to the project path when the agent is opened
     
     @property
     def window_name(self) -> str:
@@ -235,13 +235,13 @@ class HeadlessClaudeCodeAgent(CodingAgent):
     def is_ide_open_with_correct_project(self) -> bool:
         """Check if Claude Code is in the correct project directory
         
-        For headless mode, this means checking if we're in the correct working directory
+        For headless mode, this means checking that Claude Code will run in the project directory
         """
         if not self._current_project_name:
             print(f"Warning: No project name set for {self.agent_name}, cannot verify project-specific directory")
             return False
         
-        current_dir = os.getcwd()
+        current_dir = self.repo_dir or self.project_path
         current_project = os.path.basename(current_dir)
         
         if self._current_project_name.lower() in current_project.lower():
@@ -275,9 +275,10 @@ class HeadlessClaudeCodeAgent(CodingAgent):
         """Verify Claude Code is available and ready for headless mode with correct project"""
         print(f"Checking {self.agent_name} availability...")
         
-        # Set current project if we have a repo_dir
-        if hasattr(self, 'repo_dir') and self.repo_dir:
-            self.set_current_project(self.repo_dir)
+        # Run Claude Code in the project directory set by the orchestrator
+        if not self.repo_dir:
+            self.repo_dir = self.project_path
+        self.set_current_project(self.repo_dir)
         
         # Check if available and in correct project
         if await self.is_coding_agent_open_with_project():
@@ -288,7 +289,7 @@ class HeadlessClaudeCodeAgent(CodingAgent):
             if await self.is_coding_agent_open():
                 if self._current_project_name:
                     print(f"Claude Code is available but not in correct project directory")
-                    print(f"Current directory: {os.getcwd()}")
+                    print(f"Current directory: {self.repo_dir}")
                     print(f"Expected project: {self._current_project_name}")
                     print(f"Note: For headless mode, ensure you're running from the correct project directory")
                 return False
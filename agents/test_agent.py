@@ -9,8 +9,10 @@ This agent simulates the orchestrator's _execute_agent method behavior for testi
 
 import os
 import time
+import asyncio
 from typing import Optional
 from .base import CodingAgent, AgentResponse
+from common.tracing import span
 
 
 class TestAgent(CodingAgent):
@@ -62,14 +64,15 @@ Provide nothing but valid JSON in your response."""
             await self._simulate_orchestrator_execution(prompt)
             
             # Run the actual analysis
-            await self._run_analysis(prompt)
+            with span("agent.analysis", category="agent", agent=self.agent_name):
+                await self._run_analysis(prompt)
             
             # Get and save results
             results = self._get_analysis_results()
             
             # Save to output file
             print(f"Test Agent: Saving results to {self.output_file}...")
-            with open(self.output_file, 'w', encoding='utf-8') as f:
+            with open(os.path.join(self.project_path, self.output_file), 'w', encoding='utf-8') as f:
                 f.write(f"# Test Agent Analysis Results\n\n")
                 f.write(f"**Prompt:** {prompt}\n\n")
                 f.write(f"**Analysis Date:** {time.strftime('%Y-%m-%d %H:%M:%S')}\n\n")
@@ -80,7 +83,8 @@ Provide nothing but valid JSON in your response."""
             print("Test Agent: Analysis complete, results saved to file")
             
             # Read the file back
-            content = await self._read_output_file()
+            with span("agent.read_output_file", category="agent", agent=self.agent_name):
+                content = await self._read_output_file()
             
             return AgentResponse(content=content, success=True)
             
@@ -95,8 +99,8 @@ Provide nothing but valid JSON in your response."""
         """Simulate the orchestrator's _execute_agent method behavior"""
         print("Test Agent: Simulating orchestrator execution behavior...")
         
-        # Simulate getting current working directory (like orchestrator does)
-        work_directory = os.getcwd()
+        # Simulate getting the work directory (like orchestrator does)
+        work_directory = self.project_path
         print(f"Test Agent: Current work directory: {work_directory}")
         
         # Simulate setting current project for window title checking (like orchestrator does)
@@ -124,7 +128,7 @@ Provide nothing but valid JSON in your response."""
             return
         
         # Simulate the orchestrator's behavior from lines 348-349
-        repo_name = os.path.basename(os.getcwd())
+        repo_name = os.path.basename(self.project_path)
         print(f"Test Agent: Simulating close_ide_window_for_project('{self.window_name}', '{repo_name}')")
         
         # For test agent, we don't actually close windows, just simulate the behavior
@@ -132,7 +136,7 @@ Provide nothing but valid JSON in your response."""
         
         # Simulate the 2-second wait like in the orchestrator
         print("Test Agent: [SIMULATED] Waiting 2 seconds for window to close completely...")
-        time.sleep(2)
+        await asyncio.sleep(2)
         
         print("Test Agent: IDE window closure simulation complete")
 
@@ -206,7 +210,7 @@ Provide nothing but valid JSON in your response."""
         try:
             # Check if all agent files have corresponding entries in factory.py
             agent_files = []
-            agents_dir = "agents"
+            agents_dir = os.path.join(self.project_path, "agents")
             
             if os.path.exists(agents_dir):
                 for file in os.listdir(agents_dir):
@@ -214,7 +218,7 @@ Provide nothing but valid JSON in your response."""
                         agent_files.append(file)
             
             # Check factory.py for missing agents
-            with open("agents/factory.py", "r") as f:
+            with open(os.path.join(agents_dir, "factory.py"), "r") as f:
                 factory_content = f.read()
             
             for agent_file in agent_files:
@@ -234,15 +238,17 @@ Provide nothing but valid JSON in your response."""
         try:
             # Get list of agent files
             agent_files = []
-            if os.path.exists("agents"):
-                for file in os.listdir("agents"):
+            agents_dir = os.path.join(self.project_path, "agents")
+            readme_path = os.path.join(self.project_path, "README.md")
+            if os.path.exists(agents_dir):
+                for file in os.listdir(agents_dir):
                     if file.endswith("_agent.py") and file != "base.py":
                         agent_name = file.replace("_agent.py", "").replace("_", " ").title()
                         agent_files.append(agent_name)
             
             # Check README content
-            if os.path.exists("README.md"):
-                with open("README.md", "r") as f:
+            if os.path.exists(readme_path):
+                with open(readme_path, "r") as f:
                     readme_content = f.read().lower()
                 
                 for agent in agent_files:
@@ -262,7 +268,7 @@ Provide nothing but valid JSON in your response."""
         
         try:
             # Check if all Python files have proper headers
-            for root, dirs, files in os.walk("."):
+            for root, dirs, files in os.walk(self.project_path):
                 # Skip venv and other common directories
                 dirs[:] = [d for d in dirs if d not in ['venv', '__pycache__', '.git', 'node_modules']]
                 
@@ -273,7 +279,7 @@ Provide nothing but valid JSON in your response."""
                             with open(file_path, "r") as f:
                                 first_line = f.readline().strip()
                                 if not first_line.startswith("#!") and not first_line.startswith('"""') and not first_line.startswith("'''"):
-                                    issues.append(f"{file_path} missing proper header or docstring")
+                                    issues.append(f"{os.path.relpath(file_path, self.project_path)} missing proper header or docstring")
                         except Exception:
                             pass  # Skip files that can't be read
                             
@@ -3,7 +3,7 @@
 Windsurf Agent Implementation
 """
 
-import time
+import asyncio
 import pyautogui
 from typing import Optional
 from .base import CodingAgent
@@ -23,6 +23,14 @@ class WindsurfAgent(CodingAgent):
     def keyboard_shortcut(self) -> Optional[str]:
         return "cmd+i"  # Command+I opens Windsurf Cascade
     
+    @property
+    def chat_panel_region(self) -> tuple:
+        return (0.5, 0.0, 1.0, 1.0)  # Cascade chat lives in the right pane
+    
+    @property
+    def state_templates_dir(self) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "windsurf")
+    
     @property
     def interface_state_prompt(self) -> str:
         return """You are analyzing a screenshot of the Cascade AI coding assistant interface. You only care about the right chat panel that is called 'Cascade'. IGNORE ALL THE REST OF THE SCREENSHOT.
@@ -74,9 +82,9 @@ Only analyze the right panel and provide nothing but valid JSON in your response
     
     async def open_coding_interface(self) -> bool:
         """Open Windsurf IDE and Cascade interface, handle any setup popups"""
-        # Set current project for window title checking
-        project_path = os.getcwd()
-        self.set_current_project(project_path)
+        # Default to the cwd only when the orchestrator did not set the project
+        if not self._current_project_name:
+            self.set_current_project(self.project_path)
         
         # First ensure Windsurf application is running
         await self._ensure_windsurf_app_open()
@@ -88,7 +96,7 @@ Only analyze the right panel and provide nothing but valid JSON in your response
         # Interface is not open or not with correct project, open Cascade interface with keyboard shortcut
         print(f"Opening {self.agent_name} Cascade interface with shortcut: {self.keyboard_shortcut}")
         pyautogui.hotkey('command', 'i')
-        time.sleep(2)  # Wait for interface to open
+        await asyncio.sleep(2)  # Wait for interface to open
         
         # TODO commend out for now as it's not working that well, prompt needs to be improved
         # Handle trust workspace popup if it appears
@@ -111,12 +119,12 @@ Only analyze the right panel and provide nothing but valid JSON in your response
         
         try:
             # Get current project path
-            project_path = os.getcwd()
+            project_path = self.project_path
             
             # Open Windsurf with the current project
             subprocess.run(["open", "-a", self.window_name, project_path])
             print("Waiting 5 seconds for app to start...")
-            time.sleep(5)  # wait for the app to start
+            await asyncio.sleep(5)  # wait for the app to start
             
             # Activate the application
             activate_script = f'''
@@ -125,7 +133,7 @@ Only analyze the right panel and provide nothing but valid JSON in your response
             end tell
             '''
             subprocess.run(["osascript", "-e", activate_script], check=True)
-            time.sleep(1)
+            await asyncio.sleep(1)
             
             # Use computer_use_utils to activate window and steal focus for initial setup
             repo_name = os.path.basename(project_path)
@@ -151,7 +159,7 @@ Only analyze the right panel and provide nothing but valid JSON in your response
             print("Found trust workspace button, clicking it...")
             pyautogui.moveTo(result.coordinates.x, result.coordinates.y)
             pyautogui.click(result.coordinates.x, result.coordinates.y)
-            time.sleep(1.0)
+            await asyncio.sleep(1.0)
             return True
         else:
             print("INFO: No trust workspace popup found (this is normal if workspace is already trusted)")
@@ -1,8 +1,15 @@
 from fastapi import APIRouter, HTTPException, Response, Cookie, Depends, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-import requests
 from datetime import datetime
+import sys
+import os
+import asyncio
+
+# Add parent directory to path for SimulateDev imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))))
+
+from common.github_client import github_client
 
 from app.database import get_db
 from app.models.user import UserSession
@@ -40,7 +47,8 @@ async def github_auth_callback(
     
     try:
         # Exchange code for access token
-        token_response = requests.post(
+        token_response = await asyncio.to_thread(
+            github_client.post,
             "https://github.com/login/oauth/access_token",
             data={
                 "client_id": settings.github_client_id,
@@ -60,7 +68,8 @@ async def github_auth_callback(
         access_token = token_data["access_token"]
         
         # Get user info from GitHub
-        user_response = requests.get(
+        user_response = await asyncio.to_thread(
+            github_client.get,
             "https://api.github.com/user",
             headers={"Authorization": f"token {access_token}"}
         )
@@ -71,7 +80,8 @@ async def github_auth_callback(
         github_user = user_response.json()
         
         # Get user email (might be private)
-        email_response = requests.get(
+        email_response = await asyncio.to_thread(
+            github_client.get,
             "https://api.github.com/user/emails",
             headers={"Authorization": f"token {access_token}"}
         )
@@ -221,7 +231,8 @@ async def get_user_repositories(
         access_token = auth_service.decrypt_token(user.access_token_encrypted)
         
         # Fetch repositories from GitHub API (both public and private)
-        repos_response = requests.get(
+        repos_response = await asyncio.to_thread(
+            github_client.get,
             "https://api.github.com/user/repos?visibility=all&sort=updated&per_page=100",
             headers={"Authorization": f"token {access_token}"}
         )
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 import sys
 import os
+import asyncio
 import importlib
 
 # Add parent directory to path for SimulateDev imports
@@ -15,6 +16,8 @@ github_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(github_module)
 GitHubIntegration = github_module.GitHubIntegration
 
+from common.github_client import github_client, GitHubPriority
+
 # try:
 #     from src.github_integration import GitHubIntegration
 # except ImportError:
@@ -39,9 +42,8 @@ async def get_user_repositories(
     try:
         github_integration = GitHubIntegration(github_token)
         # GitHubIntegration doesn't have list_user_repositories, so we'll use a basic API call
-        import requests
         headers = {'Authorization': f'token {github_token}'}
-        response = requests.get('https://api.github.com/user/repos', headers=headers, params={'per_page': 100})
+        response = await asyncio.to_thread(github_client.get, 'https://api.github.com/user/repos', headers=headers, params={'per_page': 100})
         response.raise_for_status()
         
         repositories = response.json()
@@ -75,7 +77,6 @@ async def get_repository_issues(
     
     try:
         # Use direct API call since GitHubIntegration doesn't have this method
-        import requests
         headers = {'Authorization': f'token {github_token}'}
         params = {
             "state": state,
@@ -85,8 +86,8 @@ async def get_repository_issues(
             "direction": "desc"
         }
         
-        response = requests.get(f'https://api.github.com/repos/{owner}/{repo}/issues', 
-                              headers=headers, params=params)
+        response = await asyncio.to_thread(github_client.get, f'https://api.github.com/repos/{owner}/{repo}/issues', 
+                              headers=headers, params=params, priority=GitHubPriority.BACKGROUND)
         response.raise_for_status()
         
         issues = response.json()
@@ -146,7 +147,6 @@ async def get_repository_pull_requests(
     
     try:
         # Use direct API call since GitHubIntegration doesn't have this method
-        import requests
         headers = {'Authorization': f'token {github_token}'}
         params = {
             "state": state,
@@ -156,8 +156,8 @@ async def get_repository_pull_requests(
             "direction": "desc"
         }
         
-        response = requests.get(f'https://api.github.com/repos/{owner}/{repo}/pulls', 
-                              headers=headers, params=params)
+        response = await asyncio.to_thread(github_client.get, f'https://api.github.com/repos/{owner}/{repo}/pulls', 
+                              headers=headers, params=params, priority=GitHubPriority.BACKGROUND)
         response.raise_for_status()
         
         pull_requests = response.json()
@@ -212,9 +212,8 @@ async def get_repository_info(
         raise HTTPException(status_code=500, detail="GitHub integration not available")
     
     try:
-        import requests
         headers = {'Authorization': f'token {github_token}'}
-        response = requests.get(f'https://api.github.com/repos/{owner}/{repo}', headers=headers)
+        response = await asyncio.to_thread(github_client.get, f'https://api.github.com/repos/{owner}/{repo}', headers=headers)
         response.raise_for_status()
         
         repo_data = response.json()
@@ -245,9 +244,8 @@ async def get_pull_request(
         raise HTTPException(status_code=500, detail="GitHub integration not available")
     
     try:
-        import requests
         headers = {'Authorization': f'token {github_token}'}
-        response = requests.get(f'https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}', headers=headers)
+        response = await asyncio.to_thread(github_client.get, f'https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}', headers=headers)
         response.raise_for_status()
         
         pr_data = response.json()
@@ -20,6 +20,37 @@ async def get_system_config():
     }
 
 
+@router.get("/llm-usage")
+async def get_llm_usage():
+    """Get LLM call telemetry for all tasks since this server started, plus rate limiter state"""
+    try:
+        from utils.llm_telemetry import process_telemetry
+        from utils.llm_client import llm_client
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"LLM telemetry unavailable: {e}")
+    
+    return {
+        **process_telemetry.summary(),
+        "rate_limiter": llm_client.rate_limiter.stats(),
+        "response_cache": llm_client.cache_stats()
+    }
+
+
+@router.get("/github-usage")
+async def get_github_usage():
+    """Get GitHub request counts, rate limit budgets and waits, plus metadata cache state"""
+    try:
+        from common.github_client import github_client
+        from common.github_metadata import github_metadata_cache
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail=f"GitHub client unavailable: {e}")
+
+    return {
+        **github_client.stats(),
+        "metadata_cache": github_metadata_cache.stats()
+    }
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
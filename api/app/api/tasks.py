@@ -16,7 +16,8 @@ router = APIRouter()
 task_service = TaskService()
 
 
-async def execute_task_with_error_handling(task_id: str, github_token: str, websocket_manager=None):
+async def execute_task_with_error_handling(task_id: str, github_token: str, websocket_manager=None,
+                                           resume: bool = False):
     """Wrapper to handle background task execution with proper error handling"""
     print(f"[TaskExecution] Starting background task execution for: {task_id}")
     print(f"[TaskExecution] WebSocket manager provided: {websocket_manager is not None}")
@@ -47,7 +48,8 @@ async def execute_task_with_error_handling(task_id: str, github_token: str, webs
                 print(f"[TaskExecution] No WebSocket manager available")
         
         print(f"[TaskExecution] Calling task_service.execute_task for: {task_id}")
-        result = await task_service.execute_task(task_id, github_token, progress_callback=progress_callback)
+        result = await task_service.execute_task(task_id, github_token, progress_callback=progress_callback,
+                                                 resume=resume)
         print(f"[TaskExecution] Task {task_id} completed successfully with result: {result}")
         return result
         
@@ -221,6 +223,29 @@ async def get_task_steps(
     return task.steps_plan
 
 
+@router.get("/{task_id}/llm-usage")
+async def get_task_llm_usage(
+    task_id: str,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_authentication)
+):
+    """Get LLM call telemetry (tokens, latency histogram, cost) for a task, per caller and model"""
+    
+    # Verify task exists and belongs to user
+    task = db.query(Task).filter(
+        Task.id == task_id,
+        Task.user_id == user.id
+    ).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    usage = task_service.get_llm_usage(task_id)
+    if usage is None:
+        raise HTTPException(status_code=404, detail="No LLM usage recorded for this task")
+    
+    return usage
+
+
 @router.post("/execute-sequential")
 async def execute_sequential_task(
     task_data: TaskCreate,
@@ -474,6 +499,42 @@ async def get_user_tasks(
     } 
 
 
+@router.post("/{task_id}/resume")
+async def resume_task(
+    task_id: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    user: User = Depends(require_authentication),
+    github_token: str = Depends(get_user_github_token)
+):
+    """Resume an interrupted or failed task from its last checkpoint"""
+    
+    task = db.query(Task).filter(
+        Task.id == task_id,
+        Task.user_id == user.id
+    ).first()
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    
+    if task_service.is_task_running(task_id):
+        raise HTTPException(status_code=400, detail="Task is already running")
+    if task.status == "completed":
+        raise HTTPException(status_code=400, detail="Task already completed")
+    
+    from app.services.websocket_manager import WebSocketManager
+    websocket_manager = WebSocketManager.get_instance()
+    
+    background_tasks.add_task(
+        execute_task_with_error_handling,
+        task_id,
+        github_token,
+        websocket_manager,
+        True
+    )
+    
+    return {"message": "Task resume started", "task_id": task_id}
+
+
 @router.post("/{task_id}/cancel")
 async def cancel_task(
     task_id: str, 
@@ -16,12 +16,14 @@ try:
     from agents import AgentDefinition, AgentRole, CodingAgentIdeType
     from common.config import config
     from src.github_integration import GitHubIntegration
+    from common.github_client import github_wait_listener
 except ImportError as e:
     print(f"Warning: Could not import SimulateDev modules: {e}")
     Orchestrator = None
     TaskRequest = None
     AgentDefinition = None
     GitHubIntegration = None
+    github_wait_listener = None
 
 from app.database import SessionLocal
 from app.models.task import Task, ExecutionHistory
@@ -129,8 +131,14 @@ class TaskService:
             db.close()
     
     async def execute_task(self, task_id: str, github_token: str, 
-                          progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
-        """Execute a SimulateDev task using the Orchestrator"""
+                          progress_callback: Optional[Callable] = None,
+                          resume: bool = False) -> Dict[str, Any]:
+        """
+        Execute a SimulateDev task using the Orchestrator
+        
+        The task id doubles as the orchestrator run id, so with resume=True an interrupted
+        task continues from its checkpoint instead of re-running finished agents.
+        """
         
         if progress_callback:
             self.progress_callbacks[task_id] = progress_callback
@@ -138,7 +146,7 @@ class TaskService:
         try:
             # Create async task for execution
             execution_task = asyncio.create_task(
-                self._execute_task_internal(task_id, github_token)
+                self._execute_task_internal(task_id, github_token, resume)
             )
             
             # Store running task
@@ -160,7 +168,7 @@ class TaskService:
             if task_id in self.progress_callbacks:
                 del self.progress_callbacks[task_id]
 
-    async def _execute_task_internal(self, task_id: str, github_token: str) -> Dict[str, Any]:
+    async def _execute_task_internal(self, task_id: str, github_token: str, resume: bool = False) -> Dict[str, Any]:
         """Internal task execution using Orchestrator in a separate thread"""
         
         # Get task from database to access steps plan
@@ -253,7 +261,9 @@ class TaskService:
                 self._execute_orchestrator_sync,
                 task_request,
                 github_token,
-                progress_monitor
+                progress_monitor,
+                resume,
+                self._create_github_wait_callback(task_id, asyncio.get_running_loop())
             )
             
             # Process results
@@ -309,7 +319,9 @@ class TaskService:
             
             raise e
 
-    def _execute_orchestrator_sync(self, task_request: TaskRequest, github_token: str, progress_monitor) -> Any:
+    def _execute_orchestrator_sync(self, task_request: TaskRequest, github_token: str, progress_monitor,
+                                   resume: bool = False,
+                                   github_wait_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Any:
         """Synchronous wrapper for orchestrator execution that runs in a separate thread"""
         try:
             print(f"[TaskService] Creating orchestrator in thread for task execution")
@@ -328,9 +340,16 @@ class TaskService:
             
             # Execute orchestrator - it will handle AGENT_EXECUTION phase progress
             print(f"[TaskService] Executing orchestrator in thread")
-            response = loop.run_until_complete(
-                orchestrator.execute_task(task_request, progress_monitor)
-            )
+            if github_wait_callback and github_wait_listener:
+                # GitHub calls held back by the rate limit budget show up in the task's progress
+                with github_wait_listener(github_wait_callback):
+                    response = loop.run_until_complete(
+                        orchestrator.execute_task(task_request, progress_monitor, resume=resume)
+                    )
+            else:
+                response = loop.run_until_complete(
+                    orchestrator.execute_task(task_request, progress_monitor, resume=resume)
+                )
             
             print(f"[TaskService] Orchestrator execution completed in thread")
             return response
@@ -360,7 +379,8 @@ class TaskService:
             workflow_type=task.workflow_type,
             repo_url=task.repo_url,
             create_pr=True,  # Always create PR for API execution
-            delete_existing_repo_env=True  # Clean execution environment
+            delete_existing_repo_env=True,  # Clean execution environment
+            run_id=task.id  # Checkpoint under the task id so the task can be resumed
         )
     
 
@@ -406,6 +426,28 @@ class TaskService:
         finally:
             db.close()
     
+    def _create_github_wait_callback(self, task_id: str, loop: asyncio.AbstractEventLoop):
+        """Create a callback that reports GitHub rate limit waits of the orchestrator thread as task progress"""
+        def github_wait_callback(event: Dict[str, Any]):
+            asyncio.run_coroutine_threadsafe(self._report_github_wait(task_id, event), loop)
+        
+        return github_wait_callback
+    
+    async def _report_github_wait(self, task_id: str, event: Dict[str, Any]):
+        """Log a GitHub rate limit wait to the execution history and send it over WebSocket"""
+        if event["status"] == "waiting":
+            message = (f"Waiting {event['seconds']:.0f}s for GitHub rate limit ({event['reason']}) "
+                       f"before {event['method']} {event['path']}")
+        else:
+            message = f"Resumed GitHub call {event['method']} {event['path']} after {event['waited_seconds']:.0f}s"
+        await self._log_progress(task_id, "github_rate_limit", message)
+        
+        if task_id in self.progress_callbacks:
+            try:
+                await self.progress_callbacks[task_id]({"type": "github_rate_limit", "message": message, **event})
+            except Exception as e:
+                print(f"[TaskService] ERROR sending GitHub rate limit update for task {task_id}: {e}")
+    
     def _create_websocket_callback(self, task_id: str):
         """Create WebSocket callback for progress monitoring"""
         async def websocket_callback(progress_data: dict):
@@ -436,6 +478,15 @@ class TaskService:
     def is_task_running(self, task_id: str) -> bool:
         """Check if a task is currently running"""
         return task_id in self.running_tasks
+    
+    def get_llm_usage(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Get LLM tokens, latency and cost of a task (live while it runs), or None if none were recorded"""
+        try:
+            from utils.llm_telemetry import get_run_usage
+        except ImportError as e:
+            self.logger.warning(f"LLM telemetry unavailable: {e}")
+            return None
+        return get_run_usage(task_id)
         
     async def cleanup(self):
         """Cleanup task service and CLI services"""
@@ -491,12 +542,13 @@ class TaskService:
     def _get_issue_details(self, owner: str, repo: str, issue_number: int, token: str) -> Dict[str, Any]:
         """Get issue details using GitHub API"""
         import requests
+        from common.github_client import github_client
         
         headers = {'Authorization': f'token {token}'}
         url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}"
         
         try:
-            response = requests.get(url, headers=headers)
+            response = github_client.get(url, headers=headers)
             response.raise_for_status()
             return response.json()
         except requests.RequestException as e:
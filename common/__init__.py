@@ -11,6 +11,7 @@ from .exceptions import (
     RepositoryException,
     IDEException
 )
+from .tracing import Tracer, span, traced, get_tracer
 
 __all__ = [
     'config',
@@ -20,5 +21,9 @@ __all__ = [
     'WorkflowTimeoutException',
     'AgentExecutionException',
     'RepositoryException',
-    'IDEException'
+    'IDEException',
+    'Tracer',
+    'span',
+    'traced',
+    'get_tracer'
 ] 
\ No newline at end of file
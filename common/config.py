@@ -18,6 +18,13 @@ class Config:
     EXECUTION_OUTPUT_DIR = "execution_output"
     SCANNED_REPOS_DIR = "scanned_repos"
     REPORTS_DIR = "reports"
+    REPO_MIRRORS_DIR = "repo_mirrors"
+    WORKSPACES_DIR = "workspaces"
+    CHECKPOINTS_DIR = "checkpoints"
+    RESULT_CACHE_DIR = "result_cache"
+    LLM_CACHE_DIR = "llm_cache"
+    LLM_USAGE_DIR = "llm_usage"
+    GITHUB_METADATA_FILE = "github_metadata.json"
     
     def __init__(self):
         # Load environment variables from .env file if it exists
@@ -25,10 +32,14 @@ class Config:
         
         # Cache loaded values
         self._agent_timeout_seconds: Optional[int] = None
+        self._max_parallel_agents: Optional[int] = None
     
     @property
     def execution_output_path(self) -> str:
-        """Get the full path to the execution output directory"""
+        """Get the full path to the execution output directory (EXECUTION_OUTPUT_PATH overrides it)"""
+        override = os.getenv('EXECUTION_OUTPUT_PATH')
+        if override:
+            return os.path.abspath(override)
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         return os.path.join(project_root, self.EXECUTION_OUTPUT_DIR)
     
@@ -42,6 +53,126 @@ class Config:
         """Get the full path to the reports directory"""
         return os.path.join(self.execution_output_path, self.REPORTS_DIR)
     
+    @property
+    def repo_mirrors_path(self) -> str:
+        """Get the full path to the bare repository mirrors directory"""
+        return os.path.join(self.execution_output_path, self.REPO_MIRRORS_DIR)
+    
+    @property
+    def workspaces_path(self) -> str:
+        """Get the full path to the per-task worktrees directory"""
+        return os.path.join(self.execution_output_path, self.WORKSPACES_DIR)
+    
+    @property
+    def checkpoints_path(self) -> str:
+        """Get the full path to the run checkpoints directory"""
+        return os.path.join(self.execution_output_path, self.CHECKPOINTS_DIR)
+    
+    @property
+    def result_cache_path(self) -> str:
+        """Get the full path to the run result cache directory"""
+        return os.path.join(self.execution_output_path, self.RESULT_CACHE_DIR)
+    
+    @property
+    def result_cache_enabled(self) -> bool:
+        """Get whether identical runs on an unchanged commit reuse a cached result"""
+        value = os.getenv('RESULT_CACHE_ENABLED', 'true').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
+    @property
+    def llm_cache_path(self) -> str:
+        """Get the full path to the LLM response cache directory"""
+        return os.path.join(self.execution_output_path, self.LLM_CACHE_DIR)
+    
+    @property
+    def llm_usage_path(self) -> str:
+        """Get the full path to the per-run LLM usage summaries directory"""
+        return os.path.join(self.execution_output_path, self.LLM_USAGE_DIR)
+    
+    @property
+    def llm_cache_enabled(self) -> bool:
+        """Get whether identical LLM calls are answered from the on-disk response cache"""
+        value = os.getenv('LLM_CACHE_ENABLED', 'false').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
+    @property
+    def llm_cache_max_entries(self) -> int:
+        """Get how many LLM responses to keep before evicting the least recently used"""
+        try:
+            return max(1, int(os.getenv('LLM_CACHE_MAX_ENTRIES', '2000')))
+        except ValueError:
+            print(f"WARNING: Invalid LLM_CACHE_MAX_ENTRIES value '{os.getenv('LLM_CACHE_MAX_ENTRIES')}', using default of 2000")
+            return 2000
+    
+    @property
+    def llm_cache_ttl_seconds(self) -> float:
+        """Get how long a cached LLM response stays valid (0 means forever)"""
+        try:
+            return max(0.0, float(os.getenv('LLM_CACHE_TTL_SECONDS', '86400')))
+        except ValueError:
+            print(f"WARNING: Invalid LLM_CACHE_TTL_SECONDS value '{os.getenv('LLM_CACHE_TTL_SECONDS')}', using default of 86400 seconds")
+            return 86400.0
+    
+    @property
+    def llm_max_concurrent_requests(self) -> int:
+        """Get how many LLM calls may be in flight at once across all tasks in this process"""
+        try:
+            return max(1, int(os.getenv('LLM_MAX_CONCURRENT_REQUESTS', '4')))
+        except ValueError:
+            print(f"WARNING: Invalid LLM_MAX_CONCURRENT_REQUESTS value '{os.getenv('LLM_MAX_CONCURRENT_REQUESTS')}', using default of 4")
+            return 4
+    
+    @property
+    def llm_requests_per_minute(self) -> Optional[int]:
+        """Get the LLM requests-per-minute budget (None uses the provider's default, 0 disables the limit)"""
+        value = os.getenv('LLM_REQUESTS_PER_MINUTE')
+        if not value:
+            return None
+        try:
+            return max(0, int(value))
+        except ValueError:
+            print(f"WARNING: Invalid LLM_REQUESTS_PER_MINUTE value '{value}', using the provider's default")
+            return None
+    
+    @property
+    def use_workspace_pool(self) -> bool:
+        """Get whether repositories are checked out as worktrees of a cached mirror"""
+        value = os.getenv('USE_WORKSPACE_POOL', 'true').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
+    @property
+    def max_idle_workspaces(self) -> int:
+        """Get how many idle worktrees to keep per repository for reuse"""
+        try:
+            return max(0, int(os.getenv('MAX_IDLE_WORKSPACES', '2')))
+        except ValueError:
+            print(f"WARNING: Invalid MAX_IDLE_WORKSPACES value '{os.getenv('MAX_IDLE_WORKSPACES')}', using default of 2")
+            return 2
+    
+    @property
+    def resume_workspace_ttl_hours(self) -> float:
+        """Get how long the worktree of an interrupted run is kept for --resume before it is reused"""
+        try:
+            return max(0.0, float(os.getenv('RESUME_WORKSPACE_TTL_HOURS', '24')))
+        except ValueError:
+            print(f"WARNING: Invalid RESUME_WORKSPACE_TTL_HOURS value '{os.getenv('RESUME_WORKSPACE_TTL_HOURS')}', using default of 24")
+            return 24.0
+    
+    @property
+    def clone_mode(self) -> str:
+        """Get the git clone mode: full, blobless (--filter=blob:none) or shallow (--depth 1)"""
+        value = os.getenv('CLONE_MODE', 'full').lower()
+        if value not in ('full', 'blobless', 'shallow'):
+            print(f"WARNING: Invalid CLONE_MODE value '{value}', using default of 'full'")
+            return 'full'
+        return value
+    
+    @property
+    def sparse_checkout(self) -> bool:
+        """Get whether to check out only the directories mentioned in the task"""
+        value = os.getenv('SPARSE_CHECKOUT', 'false').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
     @property
     def agent_timeout_seconds(self) -> int:
         """Get the agent execution timeout in seconds"""
@@ -65,6 +196,21 @@ class Config:
         
         return self._agent_timeout_seconds
     
+    @property
+    def max_parallel_agents(self) -> int:
+        """Get the maximum number of agents that may run concurrently in one task"""
+        if self._max_parallel_agents is None:
+            try:
+                self._max_parallel_agents = int(os.getenv('MAX_PARALLEL_AGENTS', '4'))
+                if self._max_parallel_agents < 1:
+                    print(f"WARNING: MAX_PARALLEL_AGENTS ({self._max_parallel_agents}) is too low, using minimum of 1")
+                    self._max_parallel_agents = 1
+            except ValueError:
+                print(f"WARNING: Invalid MAX_PARALLEL_AGENTS value '{os.getenv('MAX_PARALLEL_AGENTS')}', using default of 4")
+                self._max_parallel_agents = 4
+        
+        return self._max_parallel_agents
+    
     @property
     def anthropic_api_key(self) -> Optional[str]:
         """Get the Anthropic API key"""
@@ -77,6 +223,85 @@ class Config:
         """Get the GitHub token"""
         return os.getenv('GITHUB_TOKEN')
     
+    @property
+    def github_api_url(self) -> str:
+        """Get the GitHub REST API base URL (override for GitHub Enterprise or a local stand-in)"""
+        return os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+    
+    @property
+    def github_graphql_url(self) -> str:
+        """Get the GitHub GraphQL endpoint matching GITHUB_API_URL"""
+        api_url = self.github_api_url
+        if api_url.endswith('/v3'):
+            # GitHub Enterprise: https://host/api/v3 -> https://host/api/graphql
+            return f"{api_url[:-len('/v3')]}/graphql"
+        return f"{api_url}/graphql"
+    
+    @property
+    def github_rate_limit_reserve(self) -> int:
+        """Get how many requests of a token's GitHub rate limit are kept for critical calls (PR creation, forking)"""
+        try:
+            return max(0, int(os.getenv('GITHUB_RATE_LIMIT_RESERVE', '100')))
+        except ValueError:
+            print(f"WARNING: Invalid GITHUB_RATE_LIMIT_RESERVE value '{os.getenv('GITHUB_RATE_LIMIT_RESERVE')}', using default of 100")
+            return 100
+    
+    @property
+    def github_metadata_cache_path(self) -> str:
+        """Get the full path to the persisted GitHub repository/identity metadata cache"""
+        return os.path.join(self.execution_output_path, self.GITHUB_METADATA_FILE)
+    
+    @property
+    def github_repo_metadata_ttl_seconds(self) -> float:
+        """Get how long cached repository metadata (push permission, default branch) stays valid (0 disables)"""
+        try:
+            return max(0.0, float(os.getenv('GITHUB_REPO_METADATA_TTL_SECONDS', '600')))
+        except ValueError:
+            print(f"WARNING: Invalid GITHUB_REPO_METADATA_TTL_SECONDS value '{os.getenv('GITHUB_REPO_METADATA_TTL_SECONDS')}', using default of 600 seconds")
+            return 600.0
+    
+    @property
+    def github_identity_ttl_seconds(self) -> float:
+        """Get how long the cached authenticated user (login, name, email) and their forks stay valid (0 disables)"""
+        try:
+            return max(0.0, float(os.getenv('GITHUB_IDENTITY_TTL_SECONDS', '86400')))
+        except ValueError:
+            print(f"WARNING: Invalid GITHUB_IDENTITY_TTL_SECONDS value '{os.getenv('GITHUB_IDENTITY_TTL_SECONDS')}', using default of 86400 seconds")
+            return 86400.0
+    
+    @property
+    def github_fork_ready_timeout_seconds(self) -> float:
+        """Get how long to wait for a newly created fork to become usable before continuing anyway"""
+        try:
+            return max(0.0, float(os.getenv('GITHUB_FORK_READY_TIMEOUT_SECONDS', '60')))
+        except ValueError:
+            print(f"WARNING: Invalid GITHUB_FORK_READY_TIMEOUT_SECONDS value '{os.getenv('GITHUB_FORK_READY_TIMEOUT_SECONDS')}', using default of 60 seconds")
+            return 60.0
+    
+    @property
+    def github_pr_fetch_mode(self) -> str:
+        """Get how PR data is fetched: rest (concurrent paginated calls) or graphql (one query)"""
+        value = os.getenv('GITHUB_PR_FETCH_MODE', 'rest').lower()
+        if value not in ('rest', 'graphql'):
+            print(f"WARNING: Invalid GITHUB_PR_FETCH_MODE value '{value}', using default of 'rest'")
+            return 'rest'
+        return value
+    
+    @property
+    def github_timeout_seconds(self) -> float:
+        """Get the read timeout for GitHub HTTP requests"""
+        try:
+            return max(1.0, float(os.getenv('GITHUB_TIMEOUT_SECONDS', '30')))
+        except ValueError:
+            print(f"WARNING: Invalid GITHUB_TIMEOUT_SECONDS value '{os.getenv('GITHUB_TIMEOUT_SECONDS')}', using default of 30 seconds")
+            return 30.0
+    
+    @property
+    def open_pr_in_browser(self) -> bool:
+        """Get whether a created pull request is opened in the default browser"""
+        value = os.getenv('OPEN_PR_IN_BROWSER', 'true').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
     @property
     def git_user_name(self) -> str:
         """Get the git user name"""
@@ -93,6 +318,83 @@ class Config:
         value = os.getenv('SAVE_SCREENSHOTS_FOR_DEBUG', 'false').lower()
         return value in ('true', '1', 'yes', 'on')
     
+    @property
+    def screenshot_format(self) -> str:
+        """Get the image format screenshots are encoded in for the vision model: jpeg, webp or png"""
+        value = os.getenv('SCREENSHOT_FORMAT', 'jpeg').lower()
+        if value == 'jpg':
+            value = 'jpeg'
+        if value not in ('jpeg', 'webp', 'png'):
+            print(f"WARNING: Invalid SCREENSHOT_FORMAT value '{value}', using default of 'jpeg'")
+            return 'jpeg'
+        return value
+    
+    @property
+    def screenshot_quality(self) -> int:
+        """Get the lossy encoding quality (1-100) for jpeg/webp screenshots"""
+        try:
+            return min(100, max(1, int(os.getenv('SCREENSHOT_QUALITY', '80'))))
+        except ValueError:
+            print(f"WARNING: Invalid SCREENSHOT_QUALITY value '{os.getenv('SCREENSHOT_QUALITY')}', using default of 80")
+            return 80
+    
+    @property
+    def crop_ide_screenshots(self) -> bool:
+        """Get whether IDE state checks only capture the agent's chat panel instead of the whole window"""
+        value = os.getenv('CROP_IDE_SCREENSHOTS', 'false').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
+    @property
+    def local_classifier_enabled(self) -> bool:
+        """Get whether IDE state is first classified locally from per-agent marker templates"""
+        value = os.getenv('LOCAL_STATE_CLASSIFIER', 'true').lower()
+        return value in ('true', '1', 'yes', 'on')
+    
+    @property
+    def local_classifier_threshold(self) -> float:
+        """Get the template match score (0-1) at which the local classifier answers without the LLM"""
+        try:
+            return min(1.0, max(0.0, float(os.getenv('LOCAL_CLASSIFIER_THRESHOLD', '0.9'))))
+        except ValueError:
+            print(f"WARNING: Invalid LOCAL_CLASSIFIER_THRESHOLD value '{os.getenv('LOCAL_CLASSIFIER_THRESHOLD')}', using default of 0.9")
+            return 0.9
+    
+    @property
+    def local_classifier_audit_rate(self) -> float:
+        """Get the fraction of confident local answers that are also checked by the LLM to measure agreement"""
+        try:
+            return min(1.0, max(0.0, float(os.getenv('LOCAL_CLASSIFIER_AUDIT_RATE', '0.1'))))
+        except ValueError:
+            print(f"WARNING: Invalid LOCAL_CLASSIFIER_AUDIT_RATE value '{os.getenv('LOCAL_CLASSIFIER_AUDIT_RATE')}', using default of 0.1")
+            return 0.1
+    
+    @property
+    def workspace_quiet_seconds(self) -> float:
+        """Get how long the work directory must go without file changes to count as quiescent"""
+        try:
+            return max(1.0, float(os.getenv('WORKSPACE_QUIET_SECONDS', '20')))
+        except ValueError:
+            print(f"WARNING: Invalid WORKSPACE_QUIET_SECONDS value '{os.getenv('WORKSPACE_QUIET_SECONDS')}', using default of 20 seconds")
+            return 20.0
+    
+    @property
+    def screen_change_threshold(self) -> float:
+        """Get the fraction of the IDE window that must change before its state is re-analyzed by the LLM"""
+        try:
+            return max(0.0, float(os.getenv('SCREEN_CHANGE_THRESHOLD', '0.002')))
+        except ValueError:
+            print(f"WARNING: Invalid SCREEN_CHANGE_THRESHOLD value '{os.getenv('SCREEN_CHANGE_THRESHOLD')}', using default of 0.002")
+            return 0.002
+    
+    @property
+    def screen_max_staleness_seconds(self) -> float:
+        """Get how long an IDE state verdict may be reused for an unchanged window (0 disables reuse)"""
+        try:
+            return max(0.0, float(os.getenv('SCREEN_MAX_STALENESS_SECONDS', '120')))
+        except ValueError:
+            print(f"WARNING: Invalid SCREEN_MAX_STALENESS_SECONDS value '{os.getenv('SCREEN_MAX_STALENESS_SECONDS')}', using default of 120 seconds")
+            return 120.0
+    
     def validate_required_keys(self) -> bool:
         """Validate that required API keys are present"""
         missing_keys = []
@@ -111,6 +413,7 @@ class Config:
         """Print a summary of the current configuration"""
         print("Configuration Summary:")
         print(f"  Agent Timeout: {self.agent_timeout_seconds} seconds ({self.agent_timeout_seconds/60:.1f} minutes)")
+        print(f"  Max Parallel Agents: {self.max_parallel_agents}")
         print(f"  Anthropic API Key: {'✓ Set' if self.anthropic_api_key else '✗ Missing'}")
         print(f"  GitHub Token: {'✓ Set' if self.github_token else '✗ Not set (optional)'}")
         print(f"  Git User: {self.git_user_name} <{self.git_user_email}>")
@@ -118,6 +421,8 @@ class Config:
         print(f"  Execution Output: {self.execution_output_path}")
         print(f"  Scanned Repos: {self.scanned_repos_path}")
         print(f"  Reports: {self.reports_path}")
+        print(f"  Clone Mode: {self.clone_mode}{' + sparse checkout' if self.sparse_checkout else ''}")
+        print(f"  Workspace Pool: {'✓ Enabled' if self.use_workspace_pool else '✗ Disabled'} ({self.workspaces_path})")
 
 
 # Global configuration instance
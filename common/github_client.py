@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub HTTP Client for SimulateDev
+
+One pooled requests.Session for every GitHub API call in the process (the PR
+workflow, PR/issue processors, the API server and the scripts), with:
+
+- connection pooling, so repeated calls reuse TLS connections instead of opening one
+  per request
+- default timeouts (GITHUB_TIMEOUT_SECONDS) on every request
+- retry with exponential backoff on connection errors, and on 5xx responses for
+  idempotent methods
+- rate-limit-aware scheduling: X-RateLimit-Remaining/Reset of every response update
+  a budget per token (shared by all tasks in the process). Callers pass a priority:
+  CRITICAL calls (PR creation, forking, push permission checks) may use the whole
+  budget, NORMAL calls stop GITHUB_RATE_LIMIT_RESERVE requests short of it, and
+  BACKGROUND calls (issue listing, comment hydration) are additionally spread over
+  the rest of the window once half of it is used. Secondary rate limits (403/429
+  with Retry-After) pause the token for everyone, and the rate-limited request is
+  retried afterwards, POSTs included: GitHub did not process it. Mutating requests
+  of a token are spaced a second apart, as GitHub asks. Unauthenticated calls (e.g.
+  the OAuth code exchange) are budgeted per host and never spaced, since they create
+  no content and belong to no user. Waits are reported to the listener set with
+  github_wait_listener(), so tasks can show them as progress.
+- pagination: get_all_pages() follows Link rel="next" headers, requesting each next
+  page on a worker thread before the current one is parsed
+- conditional requests: GET responses carrying an ETag (or Last-Modified) are kept
+  in a bounded in-memory store, and the next GET of the same resource sends
+  If-None-Match. GitHub answers 304 Not Modified for unchanged resources, which does
+  not count against the rate limit; the stored body is returned as a normal 200
+  response, so callers don't need to know.
+
+Stored responses are keyed by URL, query parameters, Accept header and a hash of the
+Authorization header, so users never see each other's data.
+
+Usage:
+    from common.github_client import github_client
+    response = github_client.get(f"{config.github_api_url}/user", headers=headers)
+"""
+
+import time
+import hashlib
+import threading
+import contextvars
+from enum import IntEnum
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Tuple, List, Callable, Iterator
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from .config import config
+
+
+class GitHubPriority(IntEnum):
+    """How urgent a GitHub call is when the rate limit budget runs low"""
+    CRITICAL = 0  # PR creation, forking, push permission checks: finished work depends on them
+    NORMAL = 1
+    BACKGROUND = 2  # Issue listing, comment hydration: can be paced
+
+
+@dataclass
+class _RateBudget:
+    """What GitHub last reported about one token's limit for one resource (core, graphql, search)"""
+    limit: Optional[int] = None
+    remaining: Optional[int] = None
+    reset_at: float = 0.0  # Epoch seconds
+
+
+@dataclass
+class _TokenState:
+    """Rate limit state of one token (or of the unauthenticated calls to one host)"""
+    budgets: Dict[str, _RateBudget] = field(default_factory=dict)
+    blocked_until: float = 0.0  # Secondary rate limit or exhausted budget (epoch seconds)
+    next_mutation_at: float = 0.0
+    next_background_at: float = 0.0
+    space_mutations: bool = True
+
+
+_wait_listener: contextvars.ContextVar[Optional[Callable[[Dict[str, Any]], None]]] = contextvars.ContextVar(
+    "simulatedev_github_wait_listener", default=None)
+
+
+@contextmanager
+def github_wait_listener(callback: Callable[[Dict[str, Any]], None]) -> Iterator[None]:
+    """
+    Report rate limit waits of GitHub calls made inside the block.
+
+    The callback gets {"status": "waiting", "reason", "seconds", "priority", "method", "path"}
+    when a call is held back, and {"status": "resumed", "waited_seconds", ...} when it goes out.
+    """
+    token = _wait_listener.set(callback)
+    try:
+        yield
+    finally:
+        _wait_listener.reset(token)
+
+
+@dataclass
+class _StoredResponse:
+    """Body and validators of a GET response, for conditional re-requests"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: bytes
+    headers: Dict[str, str]
+    encoding: Optional[str]
+
+
+class GitHubClient:
+    """Pooled, retrying GitHub HTTP client with ETag-based conditional requests"""
+
+    # Maximum number of stored GET responses (least recently used are dropped)
+    MAX_STORED_RESPONSES = 2000
+
+    # Idempotent methods whose 5xx responses and read errors are retried
+    RETRY_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+
+    # Methods GitHub counts as content-creating, spaced MUTATION_SPACING_SECONDS apart per token
+    MUTATING_METHODS = frozenset(["POST", "PATCH", "PUT", "DELETE"])
+    MUTATION_SPACING_SECONDS = 1.0
+
+    # How often a rate-limited request is retried after waiting
+    RATE_LIMIT_RETRIES = 3
+
+    # Pause after a secondary rate limit response without Retry-After
+    SECONDARY_LIMIT_PAUSE_SECONDS = 60.0
+
+    # Longest single sleep of a waiting call, so it notices changed budgets
+    MAX_WAIT_SLICE_SECONDS = 5.0
+
+    def __init__(self, timeout_seconds: Optional[float] = None, max_retries: int = 3, pool_size: int = 20):
+        self.timeout_seconds = config.github_timeout_seconds if timeout_seconds is None else timeout_seconds
+        self.session = requests.Session()
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=max_retries,
+            status=max_retries,
+            backoff_factor=0.5,
+            status_forcelist=(500, 502, 503, 504),  # Rate limits are handled by the budget below
+            allowed_methods=self.RETRY_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._stored: "OrderedDict[Tuple, _StoredResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+
+        self._tokens: Dict[str, _TokenState] = {}
+        self._rate_condition = threading.Condition()
+        self.rate_limited = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.waiting = 0
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout applied when the caller does not pass one"""
+        return min(10.0, self.timeout_seconds), self.timeout_seconds
+
+    @staticmethod
+    def _token_key(headers: Dict[str, str]) -> str:
+        """Hash of the Authorization header ("" for anonymous requests)"""
+        authorization = next((value for name, value in headers.items() if name.lower() == "authorization"), "")
+        return hashlib.sha256(authorization.encode("utf-8")).hexdigest() if authorization else ""
+
+    @classmethod
+    def _budget_key(cls, url: str, headers: Dict[str, str]) -> str:
+        """Key of the rate limit state a request counts against: its token, else its host"""
+        return cls._token_key(headers) or f"anonymous:{urlparse(url).netloc}"
+
+    @classmethod
+    def _store_key(cls, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str]) -> Tuple:
+        lowered = {name.lower(): value for name, value in headers.items()}
+        return (
+            url,
+            urlencode(sorted((params or {}).items()), doseq=True),
+            lowered.get("accept", ""),
+            cls._token_key(headers)
+        )
+
+    @staticmethod
+    def _resource(url: str) -> str:
+        """Rate limit resource a request counts against"""
+        path = urlparse(url).path
+        if path.endswith("/graphql"):
+            return "graphql"
+        if "/search/" in path:
+            return "search"
+        return "core"
+
+    def _admission_wait(self, state: _TokenState, resource: str, method: str,
+                        priority: GitHubPriority, now: float) -> Tuple[float, str]:
+        """Seconds a call has to wait before it may go out, and why (caller holds the condition)"""
+        if state.blocked_until > now:
+            return state.blocked_until - now, "secondary rate limit"
+
+        waits = [(0.0, "")]
+        budget = state.budgets.get(resource)
+        if budget is not None and budget.remaining is not None and budget.reset_at > now:
+            reserve = 0 if priority == GitHubPriority.CRITICAL else config.github_rate_limit_reserve
+            if budget.remaining <= reserve:
+                return budget.reset_at - now, "rate limit reserve"
+            if priority == GitHubPriority.BACKGROUND and budget.limit and budget.remaining < budget.limit / 2:
+                waits.append((state.next_background_at - now, "pacing background calls"))
+        if method in self.MUTATING_METHODS and state.space_mutations:
+            waits.append((state.next_mutation_at - now, "spacing content-creating calls"))
+        return max(waits)
+
+    def _admit(self, state: _TokenState, resource: str, method: str, priority: GitHubPriority, now: float):
+        """Account for a call that is going out (caller holds the condition)"""
+        budget = state.budgets.get(resource)
+        if budget is not None and budget.remaining is not None and budget.reset_at > now:
+            # Claim the request now, so concurrent callers don't all spend the same remaining budget
+            budget.remaining -= 1
+            spare = budget.remaining - config.github_rate_limit_reserve
+            if priority == GitHubPriority.BACKGROUND and spare > 0:
+                state.next_background_at = now + (budget.reset_at - now) / spare
+        if method in self.MUTATING_METHODS and state.space_mutations:
+            state.next_mutation_at = now + self.MUTATION_SPACING_SECONDS
+
+    def _state(self, budget_key: str) -> _TokenState:
+        """Rate limit state of a budget key (caller holds the condition)"""
+        state = self._tokens.get(budget_key)
+        if state is None:
+            state = self._tokens[budget_key] = _TokenState(space_mutations=not budget_key.startswith("anonymous:"))
+        return state
+
+    def _wait_for_budget(self, budget_key: str, url: str, method: str, priority: GitHubPriority):
+        """Block until the token's budget admits a call of this priority"""
+        resource = self._resource(url)
+        started = time.monotonic()
+        reported: Optional[Dict[str, Any]] = None
+        announced = False  # Only waits of a second or more are printed and sent to the listener
+        with self._rate_condition:
+            state = self._state(budget_key)
+            while True:
+                now = time.time()
+                wait, reason = self._admission_wait(state, resource, method, priority, now)
+                if wait <= 0:
+                    self._admit(state, resource, method, priority, now)
+                    break
+                if reported is None:
+                    reported = {"status": "waiting", "reason": reason, "seconds": round(wait, 1),
+                                "priority": priority.name.lower(), "method": method, "path": urlparse(url).path}
+                    self.waits += 1
+                    self.waiting += 1
+                    announced = wait >= 1
+                    if announced:
+                        print(f"INFO: Holding {priority.name.lower()} GitHub call {method} {reported['path']} "
+                              f"for {wait:.0f}s ({reason})")
+                        self._notify_listener(reported)
+                self._rate_condition.wait(timeout=min(wait, self.MAX_WAIT_SLICE_SECONDS))
+
+            if reported is not None:
+                waited = time.monotonic() - started
+                self.waiting -= 1
+                self.wait_seconds += waited
+        if announced:
+            self._notify_listener({**reported, "status": "resumed", "waited_seconds": round(waited, 1)})
+
+    @staticmethod
+    def _notify_listener(event: Dict[str, Any]):
+        listener = _wait_listener.get()
+        if listener is not None:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"WARNING: GitHub wait listener failed: {str(e)}")
+
+    def _update_budget(self, budget_key: str, url: str, response: requests.Response) -> bool:
+        """Record the rate limit headers of a response; returns whether it was rate limited"""
+        headers = response.headers
+        now = time.time()
+        with self._rate_condition:
+            state = self._state(budget_key)
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                budget = state.budgets.setdefault(headers.get("X-RateLimit-Resource") or self._resource(url),
+                                                  _RateBudget())
+                try:
+                    budget.remaining = int(remaining)
+                    budget.limit = int(headers.get("X-RateLimit-Limit", budget.limit or 0)) or None
+                    budget.reset_at = float(headers.get("X-RateLimit-Reset", 0))
+                except ValueError:
+                    pass
+
+            if response.status_code not in (403, 429):
+                return False
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                try:
+                    blocked_until = now + float(retry_after)
+                except ValueError:
+                    blocked_until = now + self.SECONDARY_LIMIT_PAUSE_SECONDS
+            elif remaining == "0":
+                try:
+                    blocked_until = float(headers.get("X-RateLimit-Reset", 0)) or now + self.SECONDARY_LIMIT_PAUSE_SECONDS
+                except ValueError:
+                    blocked_until = now + self.SECONDARY_LIMIT_PAUSE_SECONDS
+            elif response.status_code == 429 or "rate limit" in response.text.lower():
+                blocked_until = now + self.SECONDARY_LIMIT_PAUSE_SECONDS
+            else:
+                return False  # A plain permission error
+
+            state.blocked_until = max(state.blocked_until, blocked_until)
+            self.rate_limited += 1
+            self._rate_condition.notify_all()
+        print(f"WARNING: GitHub rate limit hit ({response.status_code}), pausing calls for "
+              f"{max(0.0, blocked_until - now):.0f}s")
+        return True
+
+    def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                params: Optional[Dict[str, Any]] = None, timeout: Any = None, conditional: bool = True,
+                priority: GitHubPriority = GitHubPriority.NORMAL, **kwargs) -> requests.Response:
+        """
+        Send a request through the shared session.
+
+        Args:
+            method: HTTP method
+            url: Full URL
+            headers: Request headers (e.g. Authorization, Accept)
+            params: Query parameters
+            timeout: Overrides the default (connect, read) timeout
+            conditional: For GET, revalidate a stored response with If-None-Match/If-Modified-Since
+            priority: Urgency when the token's rate limit budget runs low
+            **kwargs: Passed to requests (json, data, ...)
+
+        Returns:
+            requests.Response: A 304 for a stored resource is returned as the stored 200 response.
+            A rate limit response is only returned once RATE_LIMIT_RETRIES retries are used up.
+        """
+        method = method.upper()
+        headers = dict(headers or {})
+        key = self._store_key(url, params, headers) if conditional and method == "GET" else None
+
+        stored = None
+        if key is not None:
+            with self._lock:
+                stored = self._stored.get(key)
+                if stored is not None:
+                    self._stored.move_to_end(key)
+            if stored is not None:
+                if stored.etag:
+                    headers.setdefault("If-None-Match", stored.etag)
+                if stored.last_modified:
+                    headers.setdefault("If-Modified-Since", stored.last_modified)
+
+        budget_key = self._budget_key(url, headers)
+        for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+            self._wait_for_budget(budget_key, url, method, priority)
+            response = self.session.request(method, url, headers=headers, params=params,
+                                            timeout=timeout or self.timeout, **kwargs)
+            with self._lock:
+                self.requests += 1
+            if not self._update_budget(budget_key, url, response) or attempt == self.RATE_LIMIT_RETRIES:
+                break
+
+        if key is None:
+            return response
+
+        if response.status_code == 304 and stored is not None:
+            with self._lock:
+                self.not_modified += 1
+            return self._replay(stored, response)
+
+        if response.status_code == 200 and (response.headers.get("ETag") or response.headers.get("Last-Modified")):
+            entry = _StoredResponse(
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                content=response.content,
+                headers=dict(response.headers),
+                encoding=response.encoding
+            )
+            with self._lock:
+                self._stored[key] = entry
+                self._stored.move_to_end(key)
+                while len(self._stored) > self.MAX_STORED_RESPONSES:
+                    self._stored.popitem(last=False)
+        return response
+
+    @staticmethod
+    def _replay(stored: _StoredResponse, not_modified: requests.Response) -> requests.Response:
+        """Build a 200 response from a stored body, with the fresh headers of the 304 (rate limit etc.)"""
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response._content = stored.content
+        response.headers = CaseInsensitiveDict(stored.headers)
+        response.headers.update(not_modified.headers)
+        response.encoding = stored.encoding
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.from_cache = True
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def get_all_pages(self, url: str, headers: Optional[Dict[str, str]] = None,
+                      params: Optional[Dict[str, Any]] = None, per_page: int = 100,
+                      priority: GitHubPriority = GitHubPriority.BACKGROUND) -> Optional[List[Any]]:
+        """
+        GET a list endpoint and every following page (Link rel="next").
+
+        The next page's URL is known from the headers, so it is requested on a worker thread
+        while the current page's JSON is parsed.
+
+        Returns:
+            Optional[List]: All items, or None if the first page failed. A later page failing
+            ends the list early with a warning.
+        """
+        params = dict(params or {})
+        params.setdefault("per_page", per_page)
+        response = self.get(url, headers=headers, params=params, priority=priority)
+        if response.status_code != 200:
+            return None
+
+        items: List[Any] = []
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="github-prefetch") as prefetcher:
+            while True:
+                next_url = response.links.get("next", {}).get("url")
+                next_page = prefetcher.submit(self.get, next_url, headers=headers,
+                                              priority=priority) if next_url else None
+                items.extend(response.json())
+                if next_page is None:
+                    return items
+                response = next_page.result()
+                if response.status_code != 200:
+                    print(f"WARNING: Stopped paging {url} at HTTP {response.status_code} after {len(items)} items")
+                    return items
+
+    def stats(self) -> Dict[str, Any]:
+        """Request counts and rate limit state for this process"""
+        with self._lock:
+            stats = {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "stored_responses": len(self._stored)
+            }
+        with self._rate_condition:
+            stats.update({
+                "rate_limited": self.rate_limited,
+                "waits": self.waits,
+                "waiting": self.waiting,
+                "wait_seconds": round(self.wait_seconds, 1),
+                "budgets": {
+                    budget_key if budget_key.startswith("anonymous:") else budget_key[:12]: {
+                        resource: {"remaining": budget.remaining, "limit": budget.limit, "reset_at": budget.reset_at}
+                        for resource, budget in state.budgets.items()
+                    }
+                    for budget_key, state in self._tokens.items()
+                }
+            })
+        return stats
+
+
+# Global GitHub client shared by the whole process
+github_client = GitHubClient()
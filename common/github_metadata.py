@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+GitHub Metadata Cache for SimulateDev
+
+Caches the GitHub lookups every run repeats: the authenticated user, their
+primary email, per repository the push permission, default branch and parent (one
+/repos/{owner}/{repo} response answers check_push_permissions, get_default_branch
+and "does my fork already exist"), and per upstream repository the user's fork of
+it, so repeat tasks skip forking. Fifty tasks against one org then make a handful
+of calls instead of hundreds.
+
+- Entries expire after a TTL: GITHUB_REPO_METADATA_TTL_SECONDS for repositories
+  (permissions can change), GITHUB_IDENTITY_TTL_SECONDS for the user and their
+  forks. 0 disables caching of that kind.
+- Entries are scoped by a hash of the token, so users of the API server never see
+  each other's permissions.
+- The cache is shared by all tasks of the process and persisted to
+  execution_output/github_metadata.json, so consecutive CLI runs benefit too.
+- invalidate() drops entries explicitly, e.g. after creating a fork or when a push
+  is rejected.
+
+Only successful lookups are cached.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+from .config import config
+
+
+class GitHubMetadataCache:
+    """TTL cache of GitHub repository and identity metadata, persisted to a JSON file"""
+
+    # Entry kinds and whether they expire with the repository or identity TTL
+    REPO = "repo"
+    FORK = "fork"  # upstream "owner/repo" -> full name of the user's fork
+    USER = "user"
+    USER_EMAIL = "user_email"
+    IDENTITY_KINDS = (USER, USER_EMAIL, FORK)
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.github_metadata_cache_path
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(kind: str, subject: str, token: Optional[str]) -> str:
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else "anonymous"
+        return f"{token_hash}:{kind}:{subject.lower()}"
+
+    def _ttl(self, kind: str) -> float:
+        if kind in self.IDENTITY_KINDS:
+            return config.github_identity_ttl_seconds
+        return config.github_repo_metadata_ttl_seconds
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Entries, read from disk on first use (caller holds the lock)"""
+        if self._entries is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f).get("entries", {})
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"WARNING: Ignoring unreadable GitHub metadata cache {self.path}: {str(e)}")
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        """Write the unexpired entries to disk (caller holds the lock)"""
+        now = time.time()
+        entries = {key: entry for key, entry in self._entries.items() if entry["expires_at"] > now}
+        self._entries = entries
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"saved_at": now, "entries": entries}, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"WARNING: Failed to save GitHub metadata cache: {str(e)}")
+
+    def get(self, kind: str, subject: str, token: Optional[str]) -> Optional[Any]:
+        """Get a cached value, or None if it is missing, expired or caching of this kind is disabled"""
+        if not self._ttl(kind):
+            return None
+        key = self._key(kind, subject, token)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is None or entry["expires_at"] <= time.time():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["value"]
+
+    def put(self, kind: str, subject: str, token: Optional[str], value: Any):
+        """Cache a JSON-serializable value for the TTL of its kind"""
+        ttl = self._ttl(kind)
+        if not ttl:
+            return
+        with self._lock:
+            self._load()[self._key(kind, subject, token)] = {"value": value, "expires_at": time.time() + ttl}
+            self._save()
+
+    def invalidate(self, kind: Optional[str] = None, subject: Optional[str] = None, token: Optional[str] = None):
+        """
+        Drop cached entries.
+
+        Args:
+            kind: Only entries of this kind (REPO, FORK, USER, USER_EMAIL); all kinds if None
+            subject: Only entries for this subject (e.g. "owner/repo"); all subjects if None
+            token: Only entries of this token; all tokens if None
+        """
+        with self._lock:
+            entries = self._load()
+            token_prefix = self._key("", "", token).split(":")[0] if token is not None else None
+            for key in list(entries):
+                key_token, key_kind, key_subject = key.split(":", 2)
+                if ((token_prefix is None or key_token == token_prefix)
+                        and (kind is None or key_kind == kind)
+                        and (subject is None or key_subject == subject.lower())):
+                    del entries[key]
+            self._save()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._entries or {}),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
+
+
+# Global metadata cache shared by all tasks in the process
+github_metadata_cache = GitHubMetadataCache()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Execution Tracing for SimulateDev
+
+Records timed spans for the phases of a run (work directory setup, opening the
+IDE, sending prompts, each IDE state check and its LLM call, reading the agent
+output, git and GitHub steps of the PR workflow) and exports them in the Chrome
+trace event format, loadable in chrome://tracing or https://ui.perfetto.dev.
+
+Each run activates its own Tracer; code anywhere in the call tree records spans
+with the module-level span() helper, which is a no-op when no tracer is active:
+
+    with span("git.push", category="git", branch=branch_name) as attrs:
+        ...
+        attrs["returncode"] = result.returncode
+
+or decorate a function or coroutine with @traced("github.create_pull_request", category="http").
+
+The active tracer is held in a context variable, so concurrent runs in one
+process (threads or asyncio tasks) never mix their spans.
+"""
+
+import os
+import json
+import time
+import asyncio
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Iterator, Callable
+
+
+class Tracer:
+    """Collects spans for one run and exports them as a Chrome trace"""
+
+    def __init__(self, name: str = "simulatedev"):
+        self.name = name
+        self._epoch = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._lanes: Dict[Any, int] = {}
+
+    def _lane(self) -> int:
+        """Get a small, stable row id for the current asyncio task or thread"""
+        try:
+            key = id(asyncio.current_task())
+        except RuntimeError:
+            key = threading.get_ident()
+        with self._lock:
+            if key not in self._lanes:
+                self._lanes[key] = len(self._lanes) + 1
+            return self._lanes[key]
+
+    def _now_us(self) -> float:
+        return (time.perf_counter() - self._epoch) * 1_000_000
+
+    @contextmanager
+    def span(self, name: str, category: str = "simulatedev", **attributes) -> Iterator[Dict[str, Any]]:
+        """Time the enclosed block; yields a dict whose contents are stored as the span's args"""
+        lane = self._lane()
+        start = self._now_us()
+        args = dict(attributes)
+        try:
+            yield args
+        except BaseException as e:
+            args["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": round(start, 1),
+                "dur": round(self._now_us() - start, 1),
+                "pid": os.getpid(),
+                "tid": lane,
+                "args": {key: value if isinstance(value, (int, float, bool, str, type(None))) else str(value)
+                         for key, value in args.items()}
+            }
+            with self._lock:
+                self._events.append(event)
+
+    @property
+    def events(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return sorted(self._events, key=lambda event: event["ts"])
+
+    def summary(self) -> Dict[str, float]:
+        """Total seconds spent per span name"""
+        totals: Dict[str, float] = {}
+        for event in self.events:
+            totals[event["name"]] = totals.get(event["name"], 0.0) + event["dur"] / 1_000_000
+        return {name: round(seconds, 3) for name, seconds in totals.items()}
+
+    def export_chrome_trace(self, path: str) -> Optional[str]:
+        """Write the spans as a Chrome trace JSON file; returns the path or None on failure"""
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            metadata = [{"name": "process_name", "ph": "M", "pid": os.getpid(), "args": {"name": self.name}}]
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}, f)
+            return path
+        except Exception as e:
+            print(f"WARNING: Failed to export execution trace: {str(e)}")
+            return None
+
+
+_current_tracer: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar("simulatedev_tracer", default=None)
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Get the tracer of the current run, if any"""
+    return _current_tracer.get()
+
+
+def set_tracer(tracer: Optional[Tracer]) -> contextvars.Token:
+    """Make a tracer current for this context; pass the returned token to reset_tracer()"""
+    return _current_tracer.set(tracer)
+
+
+def reset_tracer(token: contextvars.Token):
+    """Restore the tracer that was current before set_tracer()"""
+    _current_tracer.reset(token)
+
+
+@contextmanager
+def span(name: str, category: str = "simulatedev", **attributes) -> Iterator[Dict[str, Any]]:
+    """Record a span on the current run's tracer (no-op if tracing isn't active)"""
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield dict(attributes)
+        return
+    with tracer.span(name, category, **attributes) as args:
+        yield args
+
+
+def traced(name: str, category: str = "simulatedev") -> Callable:
+    """Decorator recording a span around every call of a function or coroutine function"""
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name, category):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -23,8 +23,10 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import SimulateDev modules
+from common.github_client import github_client, GitHubPriority
 from simulatedev import execute_task, validate_coding_agents_json, create_default_coder_agent
 from agents import CodingAgentIdeType
+from utils.clone_repo import CLONE_MODES
 
 # Load environment variables
 load_dotenv()
@@ -80,7 +82,7 @@ class GitHubIssueProcessor:
         api_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}"
         
         try:
-            response = requests.get(api_url, headers=self.headers)
+            response = github_client.get(api_url, headers=self.headers)
             
             if response.status_code == 404:
                 raise ValueError(f"Issue #{issue_number} not found in {owner}/{repo}")
@@ -93,7 +95,8 @@ class GitHubIssueProcessor:
             comments_url = issue_data.get('comments_url', '')
             comments = []
             if comments_url:
-                comments_response = requests.get(comments_url, headers=self.headers)
+                comments_response = github_client.get(comments_url, headers=self.headers,
+                                                      priority=GitHubPriority.BACKGROUND)
                 if comments_response.status_code == 200:
                     comments = comments_response.json()
             
@@ -253,6 +256,10 @@ Examples:
                        help="Skip saving execution report")
     parser.add_argument("--no-delete-existing-repo-env", action="store_true",
                        help="Keep existing repository directory")
+    parser.add_argument("--clone-mode", choices=CLONE_MODES, default=None,
+                       help="Clone mode: full, blobless (--filter=blob:none) or shallow (--depth 1). Default: CLONE_MODE from .env")
+    parser.add_argument("--sparse-checkout", action="store_true",
+                       help="Only check out the directories of files mentioned in the issue")
     
     return parser.parse_args()
 
@@ -317,6 +324,8 @@ async def main():
         simulatedev_args.output = args.output
         simulatedev_args.no_report = args.no_report
         simulatedev_args.no_delete_existing_repo_env = args.no_delete_existing_repo_env
+        simulatedev_args.clone_mode = args.clone_mode
+        simulatedev_args.sparse_checkout = args.sparse_checkout
         
         print("\nTask Summary:")
         print(f"  Issue: #{repo_info['issue_number']} - {issue_data.get('title', 'Untitled')}")
@@ -31,6 +31,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from simulatedev import execute_task, validate_coding_agents_json, create_default_coder_agent
 from agents import CodingAgentIdeType
 from src.github_integration import GitHubPRProcessor
+from utils.clone_repo import mentioned_paths, CLONE_MODES
 
 # Load environment variables
 load_dotenv()
@@ -86,6 +87,10 @@ Examples:
                        help="Output file for execution report")
     parser.add_argument("--no-report", action="store_true", 
                        help="Skip saving execution report")
+    parser.add_argument("--clone-mode", choices=CLONE_MODES, default=None,
+                       help="Clone mode: full, blobless (--filter=blob:none) or shallow (--depth 1). Default: CLONE_MODE from .env")
+    parser.add_argument("--sparse-checkout", action="store_true",
+                       help="Only check out the directories of files the PR changes or mentions")
     
     return parser.parse_args()
 
@@ -162,8 +167,15 @@ async def main():
         head_branch = pr_data.get('head', {}).get('ref', 'main')
         print(f"Cloning repository to work on branch '{head_branch}'...")
         
+        # Limit the checkout to the files the PR diff, review comments and prompt mention
+        sparse_paths = None
+        if args.sparse_checkout:
+            sparse_paths = mentioned_paths(pr_diff + "\n" + task_prompt)
+            sparse_paths += [c['path'] for c in pr_data.get('review_comments_data', []) if c.get('path')]
+        
         try:
-            processor.clone_pr_branch(repo_info['repo_url'], head_branch, target_dir)
+            processor.clone_pr_branch(repo_info['repo_url'], head_branch, target_dir,
+                                      clone_mode=args.clone_mode, sparse_paths=sparse_paths)
         except ValueError as e:
             print(f"Error cloning repository: {e}")
             return False
@@ -20,6 +20,13 @@ Usage:
         {"coding_ide":"windsurf","model":"Claude Sonnet 3.5","role":"Coder"}
     ]'
 
+     # Multi-agent with dependencies - both Coders run in parallel in their own checkouts, the Tester waits for both
+     python simulatedev.py --workflow custom --task "Add dark mode" --repo https://github.com/user/repo --coding-agents '[
+        {"coding_ide":"claude_cli","model":"Claude Sonnet 4","role":"Coder","agent_id":"coder_a","depends_on":[]},
+        {"coding_ide":"gemini_cli","model":"Gemini 2.5 Pro","role":"Coder","agent_id":"coder_b","depends_on":[]},
+        {"coding_ide":"claude_cli","model":"Claude Sonnet 4","role":"Tester","depends_on":["coder_a","coder_b"]}
+    ]'
+
 Available workflows:
 - bugs: Find and fix one high-impact bug
 - optimize: Find and implement one high-value performance optimization  
@@ -45,6 +52,7 @@ from urllib.parse import urlparse
 from src.orchestrator import Orchestrator, TaskRequest
 from agents import MultiAgentTask, AgentDefinition, AgentRole, CodingAgentIdeType
 from common.config import config
+from utils.clone_repo import mentioned_paths, CLONE_MODES
 from common.exceptions import AgentTimeoutException, WorkflowTimeoutException
 
 
@@ -80,6 +88,7 @@ def validate_coding_agents_json(json_string: str) -> List[AgentDefinition]:
     agents = []
     supported_roles = [role.value for role in AgentRole]
     used_roles = set()
+    used_ids = set()
     
     for i, agent_data in enumerate(agents_data):
         if not isinstance(agent_data, dict):
@@ -99,11 +108,17 @@ def validate_coding_agents_json(json_string: str) -> List[AgentDefinition]:
         if agent_data["role"] not in supported_roles:
             raise ValueError(f"Agent {i} has invalid role: '{agent_data['role']}'. Supported roles: {supported_roles}")
         
-        # Check for duplicate roles
+        # Check for duplicate roles (agents with an explicit agent_id may share a role)
         agent_role = agent_data["role"]
-        if agent_role in used_roles:
-            raise ValueError(f"Duplicate role '{agent_role}' found. Each role can only be assigned to one agent.")
-        used_roles.add(agent_role)
+        agent_id = agent_data.get("agent_id")
+        if agent_id:
+            if agent_id in used_ids:
+                raise ValueError(f"Duplicate agent_id '{agent_id}' found. Each agent_id must be unique.")
+            used_ids.add(agent_id)
+        elif agent_role in used_roles:
+            raise ValueError(f"Duplicate role '{agent_role}' found. Each role can only be assigned to one agent unless agents declare an explicit 'agent_id'.")
+        else:
+            used_roles.add(agent_role)
         
         # Create agent definition
         agent_def = AgentDefinition.from_dict(agent_data)
@@ -224,6 +239,11 @@ def create_task_request_from_args(args) -> TaskRequest:
             delete_existing_repo_env=delete_existing_repo_env
         )
     
+    # Clone options (sparse paths are derived from the task description)
+    task_request.clone_mode = getattr(args, 'clone_mode', None)
+    if getattr(args, 'sparse_checkout', False):
+        task_request.sparse_paths = mentioned_paths(task_request.task_description)
+    
     return task_request
 
 
@@ -260,6 +280,12 @@ Examples:
   
   # Skip GitHub preflight check (not recommended)
   python simulatedev.py --workflow bugs --repo https://github.com/user/repo --agent cursor --skip-github-check
+  
+  # Run the agents again even if the same task already completed on this commit
+  python simulatedev.py --workflow bugs --repo https://github.com/user/repo --agent cursor --no-cache
+  
+  # Resume an interrupted run (the run ID is printed at the start of every run)
+  python simulatedev.py --resume 20250101_1200_ab12cd34
 
 Note: 
 - Repository must be a valid GitHub URL (https://github.com/user/repo)
@@ -269,10 +295,10 @@ Note:
     )
     
     # Required arguments
-    parser.add_argument("--workflow", required=True, 
+    parser.add_argument("--workflow", 
                        choices=["bugs", "optimize", "refactor", "low-hanging", "custom"], 
                        help="The type of workflow to run")
-    parser.add_argument("--repo", required=True, 
+    parser.add_argument("--repo", 
                        help="GitHub repository URL (e.g., https://github.com/user/repo)")
     
     # Agent specification (either single agent or multi-agent JSON)
@@ -297,8 +323,25 @@ Note:
                        help="Keep existing repository directory (don't delete before cloning)")
     parser.add_argument("--skip-github-check", action="store_true",
                        help="Skip GitHub preflight check (not recommended)")
+    parser.add_argument("--clone-mode", choices=CLONE_MODES, default=None,
+                       help="Clone mode: full, blobless (--filter=blob:none) or shallow (--depth 1). Default: CLONE_MODE from .env")
+    parser.add_argument("--sparse-checkout", action="store_true",
+                       help="Only check out the directories of files mentioned in the task")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Always run the agents, even if an identical task already completed on the same commit")
+    parser.add_argument("--resume", metavar="RUN_ID",
+                       help="Resume an interrupted run from its checkpoint, skipping agents that already finished")
+    
+    args = parser.parse_args()
     
-    return parser.parse_args()
+    # --workflow and --repo are required unless resuming a checkpointed run
+    if not args.resume:
+        if not args.workflow:
+            parser.error("the following arguments are required: --workflow")
+        if not args.repo:
+            parser.error("the following arguments are required: --repo")
+    
+    return args
 
 
 async def execute_task(args) -> bool:
@@ -307,32 +350,43 @@ async def execute_task(args) -> bool:
         print("SimulateDev - AI Coding Assistant")
         print("=" * 40)
         
-        # Handle repository deletion if requested
-        delete_existing_repo_env = not getattr(args, 'no_delete_existing_repo_env', False)
-        if delete_existing_repo_env:
-            parsed_path = urlparse(args.repo).path.rstrip('/')
-            repo_name = os.path.splitext(os.path.basename(parsed_path))[0]
-            if repo_name.endswith('.git'):
-                repo_name = repo_name[:-4]
-            repo_path = os.path.join(config.scanned_repos_path, repo_name)
-            if os.path.exists(repo_path):
-                shutil.rmtree(repo_path)
-                print(f"Deleted existing repository folder: {repo_path}")
-        
-        # Create task request using the extracted function
-        try:
-            task_request = create_task_request_from_args(args)
-        except ValueError as e:
-            print(f"Error: {e}")
-            return False
-        
-        # Print agent information
-        if args.coding_agents:
-            agents = validate_coding_agents_json(args.coding_agents)
-            print(f"Using {len(agents)} custom agents")
+        resume_run_id = getattr(args, 'resume', None)
+        if resume_run_id:
+            # Rebuild the request of the interrupted run from its checkpoint
+            task_request = Orchestrator.load_checkpointed_request(resume_run_id)
+            if not task_request:
+                print(f"Error: Cannot resume run '{resume_run_id}'")
+                return False
+            args.repo = task_request.original_repo_url or task_request.repo_url
+            args.workflow = args.workflow or "custom"
+            print(f"Resuming run {resume_run_id} with {len(task_request.agents)} agent(s)")
         else:
-            agent_type = args.agent or "cursor"
-            print(f"Using default single {agent_type} agent")
+            # Handle repository deletion if requested
+            delete_existing_repo_env = not getattr(args, 'no_delete_existing_repo_env', False)
+            if delete_existing_repo_env:
+                parsed_path = urlparse(args.repo).path.rstrip('/')
+                repo_name = os.path.splitext(os.path.basename(parsed_path))[0]
+                if repo_name.endswith('.git'):
+                    repo_name = repo_name[:-4]
+                repo_path = os.path.join(config.scanned_repos_path, repo_name)
+                if os.path.exists(repo_path):
+                    shutil.rmtree(repo_path)
+                    print(f"Deleted existing repository folder: {repo_path}")
+            
+            # Create task request using the extracted function
+            try:
+                task_request = create_task_request_from_args(args)
+            except ValueError as e:
+                print(f"Error: {e}")
+                return False
+            
+            # Print agent information
+            if args.coding_agents:
+                agents = validate_coding_agents_json(args.coding_agents)
+                print(f"Using {len(agents)} custom agents")
+            else:
+                agent_type = args.agent or "cursor"
+                print(f"Using default single {agent_type} agent")
         
         # Print summary
         print_task_summary(task_request, args.workflow)
@@ -354,8 +408,10 @@ async def execute_task(args) -> bool:
         
         # Execute
         print(f"\nSTARTING: {args.workflow} workflow...")
+        if getattr(args, 'no_cache', False):
+            task_request.use_cache = False
         orchestrator = Orchestrator()
-        response = await orchestrator.execute_task(task_request)
+        response = await orchestrator.execute_task(task_request, resume=bool(resume_run_id))
         
         if response.success:
             print(f"\nCOMPLETED: {args.workflow.title()} workflow completed successfully!")
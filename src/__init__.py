@@ -7,9 +7,13 @@ for the SimulateDev AI coding assistant.
 
 from .orchestrator import Orchestrator, TaskRequest
 from .github_integration import GitHubIntegration
+from .checkpoint import RunCheckpoint
+from .result_cache import ResultCache
 
 __all__ = [
     'Orchestrator',
     'TaskRequest', 
-    'GitHubIntegration'
+    'GitHubIntegration',
+    'RunCheckpoint',
+    'ResultCache'
 ] 
\ No newline at end of file
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Run Checkpoints for SimulateDev
+
+Persists the state of a multi-agent run after every agent step so that a run
+interrupted by a crash can be resumed with `--resume <run-id>` (CLI) or
+TaskService.execute_task(..., resume=True) (API) without re-running the agents
+that already finished.
+
+Each run is stored as one JSON file under execution_output/checkpoints/<run-id>.json,
+written atomically (temp file + rename) so a crash mid-write never corrupts it.
+"""
+
+import os
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+from common.config import config
+
+
+class RunCheckpoint:
+    """Durable record of a run's request, work directory and finished agent steps"""
+
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+
+    def __init__(self, run_id: str, data: Optional[Dict[str, Any]] = None):
+        self.run_id = run_id
+        self.data: Dict[str, Any] = data or {
+            "run_id": run_id,
+            "status": self.STATUS_RUNNING,
+            "created_at": time.time(),
+            "updated_at": time.time(),
+            "request": None,
+            "work_directory": None,
+            "leased_workspace": None,
+            "steps": {},
+            "response": None
+        }
+
+    @staticmethod
+    def new_run_id() -> str:
+        """Generate a sortable, unique run id (e.g. 20250101_1200_ab12cd34)"""
+        return f"{datetime.now().strftime('%Y%m%d_%H%M')}_{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def path_for(run_id: str) -> str:
+        """Get the checkpoint file path for a run"""
+        return os.path.join(config.checkpoints_path, f"{run_id}.json")
+
+    @classmethod
+    def load(cls, run_id: str) -> Optional['RunCheckpoint']:
+        """Load a run's checkpoint, or None if it doesn't exist or can't be read"""
+        path = cls.path_for(run_id)
+        if not os.path.exists(path):
+            print(f"ERROR: No checkpoint found for run '{run_id}' ({path})")
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(run_id, json.load(f))
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Failed to read checkpoint for run '{run_id}': {str(e)}")
+            return None
+
+    def save(self):
+        """Atomically write the checkpoint to disk"""
+        self.data["updated_at"] = time.time()
+        path = self.path_for(self.run_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        temp_path = f"{path}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False, default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, path)
+        except Exception as e:
+            # Checkpointing must never break the run itself
+            print(f"WARNING: Failed to save checkpoint for run '{self.run_id}': {str(e)}")
+
+    @property
+    def status(self) -> str:
+        return self.data.get("status", self.STATUS_RUNNING)
+
+    @property
+    def request(self) -> Optional[Dict[str, Any]]:
+        return self.data.get("request")
+
+    @property
+    def work_directory(self) -> Optional[str]:
+        return self.data.get("work_directory")
+
+    @property
+    def leased_workspace(self) -> Optional[Tuple[str, str]]:
+        lease = self.data.get("leased_workspace")
+        return (lease[0], lease[1]) if lease else None
+
+    @property
+    def response(self) -> Optional[Dict[str, Any]]:
+        return self.data.get("response")
+
+    def start(self, request: Dict[str, Any], work_directory: str,
+              leased_workspace: Optional[Tuple[str, str]] = None):
+        """Record the (resolved) request and work directory at the start of a run"""
+        self.data["request"] = request
+        self.data["work_directory"] = work_directory
+        self.data["leased_workspace"] = list(leased_workspace) if leased_workspace else None
+        self.data["status"] = self.STATUS_RUNNING
+        self.save()
+
+    def record_step(self, index: int, agent_id: str, result: Dict[str, Any], output: Dict[str, Any]):
+        """Record a finished agent step (its execution log entry and context output)"""
+        self.data["steps"][str(index)] = {
+            "agent_id": agent_id,
+            "result": result,
+            "output": output,
+            "finished_at": time.time()
+        }
+        self.save()
+
+    def completed_steps(self, agent_ids: List[str]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get the steps that finished successfully and can be skipped on resume.
+
+        Steps are matched by position and agent id, so a checkpoint from a different
+        agent list is never applied. Failed steps are not returned and run again.
+        """
+        completed = {}
+        for key, step in self.data.get("steps", {}).items():
+            index = int(key)
+            if index < len(agent_ids) and step.get("agent_id") == agent_ids[index] \
+                    and step.get("result", {}).get("success"):
+                completed[index] = step
+        return completed
+
+    def has_completed_steps(self) -> bool:
+        """Whether any agent step finished successfully, i.e. a resume would skip work"""
+        return any(step.get("result", {}).get("success") for step in self.data.get("steps", {}).values())
+
+    def finish(self, success: bool, response: Dict[str, Any]):
+        """Mark the run as finished and store its final response"""
+        self.data["status"] = self.STATUS_COMPLETED if success else self.STATUS_FAILED
+        self.data["response"] = response
+        self.save()
@@ -13,12 +13,53 @@ This module handles GitHub API operations including:
 import os
 import subprocess
 import requests
-from typing import Optional, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 from urllib.parse import urlparse
 from dotenv import load_dotenv
 
+from common.config import config
+from common.github_client import github_client, GitHubPriority
+from common.github_metadata import github_metadata_cache
+from common.tracing import traced
+from utils.clone_repo import stage_all_changes
+
 load_dotenv()
 
+# Everything fetch_pr_data() needs in one GraphQL round-trip (100 items per list, the API maximum)
+PR_GRAPHQL_QUERY = """
+query($owner: String!, $repo: String!, $number: Int!) {
+  repository(owner: $owner, name: $repo) {
+    pullRequest(number: $number) {
+      number
+      title
+      body
+      url
+      state
+      headRefName
+      baseRefName
+      comments(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { author { login } body createdAt url }
+      }
+      reviewThreads(first: 100) {
+        pageInfo { hasNextPage }
+        nodes {
+          comments(first: 100) {
+            pageInfo { hasNextPage }
+            nodes { author { login } body path createdAt url }
+          }
+        }
+      }
+      reviews(first: 100) {
+        pageInfo { hasNextPage }
+        nodes { author { login } state body submittedAt }
+      }
+    }
+  }
+}
+"""
+
 
 class GitHubPRProcessor:
     """Processes GitHub pull requests and converts them to SimulateDev tasks"""
@@ -67,62 +108,128 @@ class GitHubPRProcessor:
             'repo_url': f"https://github.com/{path_parts[0]}/{path_parts[1]}"
         }
     
+    @traced("github.fetch_pr_data", category="http")
     def fetch_pr_data(self, owner: str, repo: str, pr_number: int) -> Dict[str, Any]:
-        """Fetch PR data from GitHub API"""
-        api_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+        """
+        Fetch PR data from GitHub API, with all its comments, review comments and reviews.
+        
+        The PR and the three comment lists are requested concurrently, and each list follows
+        every page of its Link headers. With GITHUB_PR_FETCH_MODE=graphql, one GraphQL query
+        fetches everything instead (REST is used if that query cannot return it all).
+        """
+        if config.github_pr_fetch_mode == 'graphql' and self.github_token:
+            pr_data = self._fetch_pr_data_graphql(owner, repo, pr_number)
+            if pr_data is not None:
+                return pr_data
+        
+        repo_api_url = f"{config.github_api_url}/repos/{owner}/{repo}"
         
         try:
-            response = requests.get(api_url, headers=self.headers)
-            
-            if response.status_code == 404:
-                raise ValueError(f"PR #{pr_number} not found in {owner}/{repo}")
-            elif response.status_code != 200:
-                raise ValueError(f"Failed to fetch PR: HTTP {response.status_code}")
-            
-            pr_data = response.json()
-            
-            # Also fetch PR comments
-            comments_url = pr_data.get('comments_url', '')
-            comments = []
-            if comments_url:
-                comments_response = requests.get(comments_url, headers=self.headers)
-                if comments_response.status_code == 200:
-                    comments = comments_response.json()
-            
-            # Fetch review comments
-            review_comments_url = pr_data.get('review_comments_url', '')
-            review_comments = []
-            if review_comments_url:
-                review_comments_response = requests.get(review_comments_url, headers=self.headers)
-                if review_comments_response.status_code == 200:
-                    review_comments = review_comments_response.json()
-            
-            # Fetch PR reviews
-            reviews_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}/reviews"
-            reviews = []
-            if self.headers:
-                reviews_response = requests.get(reviews_url, headers=self.headers)
-                if reviews_response.status_code == 200:
-                    reviews = reviews_response.json()
-            
-            pr_data['comments_data'] = comments
-            pr_data['review_comments_data'] = review_comments
-            pr_data['reviews_data'] = reviews
+            with ThreadPoolExecutor(max_workers=4, thread_name_prefix="github-pr") as executor:
+                pr_future = executor.submit(github_client.get, f"{repo_api_url}/pulls/{pr_number}",
+                                            headers=self.headers)
+                comments_future = executor.submit(github_client.get_all_pages,
+                                                  f"{repo_api_url}/issues/{pr_number}/comments", headers=self.headers)
+                review_comments_future = executor.submit(github_client.get_all_pages,
+                                                         f"{repo_api_url}/pulls/{pr_number}/comments",
+                                                         headers=self.headers)
+                # Reviews are only fetched with a token
+                reviews_future = executor.submit(github_client.get_all_pages, f"{repo_api_url}/pulls/{pr_number}/reviews",
+                                                 headers=self.headers) if self.headers else None
+                
+                response = pr_future.result()
+                if response.status_code == 404:
+                    raise ValueError(f"PR #{pr_number} not found in {owner}/{repo}")
+                elif response.status_code != 200:
+                    raise ValueError(f"Failed to fetch PR: HTTP {response.status_code}")
+                
+                pr_data = response.json()
+                pr_data['comments_data'] = comments_future.result() or []
+                pr_data['review_comments_data'] = review_comments_future.result() or []
+                pr_data['reviews_data'] = (reviews_future.result() or []) if reviews_future else []
             return pr_data
             
         except requests.RequestException as e:
             raise ValueError(f"Error fetching PR data: {str(e)}")
     
+    def _fetch_pr_data_graphql(self, owner: str, repo: str, pr_number: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch the PR and its discussion with a single GraphQL query.
+        
+        Returns:
+            Optional[Dict]: PR data shaped like the REST responses fetch_pr_data() returns, or
+            None if the query failed or a list has more than one page (the caller then uses REST)
+        """
+        try:
+            response = github_client.post(config.github_graphql_url, headers=self.headers, json={
+                "query": PR_GRAPHQL_QUERY,
+                "variables": {"owner": owner, "repo": repo, "number": pr_number}
+            })
+        except requests.RequestException as e:
+            print(f"WARNING: GraphQL PR query failed ({str(e)}), using the REST API")
+            return None
+        
+        if response.status_code != 200:
+            print(f"WARNING: GraphQL PR query failed (HTTP {response.status_code}), using the REST API")
+            return None
+        
+        payload = response.json()
+        pr = ((payload.get('data') or {}).get('repository') or {}).get('pullRequest')
+        if payload.get('errors') or not pr:
+            errors = "; ".join(error.get('message', '') for error in payload.get('errors') or [])
+            print(f"WARNING: GraphQL PR query failed ({errors or 'no pull request returned'}), using the REST API")
+            return None
+        
+        threads = pr['reviewThreads']
+        if (pr['comments']['pageInfo']['hasNextPage'] or pr['reviews']['pageInfo']['hasNextPage']
+                or threads['pageInfo']['hasNextPage']
+                or any(thread['comments']['pageInfo']['hasNextPage'] for thread in threads['nodes'])):
+            print("INFO: PR discussion spans more than one GraphQL page, fetching it through the REST API")
+            return None
+        
+        def user(node: Dict[str, Any]) -> Dict[str, str]:
+            # author is null for deleted accounts, which REST reports as "ghost"
+            return {'login': (node.get('author') or {}).get('login', 'ghost')}
+        
+        review_comments = [
+            {'user': user(comment), 'body': comment['body'], 'path': comment['path'],
+             'created_at': comment['createdAt'], 'html_url': comment['url']}
+            for thread in threads['nodes'] for comment in thread['comments']['nodes']
+        ]
+        review_comments.sort(key=lambda comment: comment['created_at'])
+        
+        return {
+            'number': pr['number'],
+            'title': pr['title'],
+            'body': pr['body'],
+            'html_url': pr['url'],
+            'state': 'open' if pr['state'] == 'OPEN' else 'closed',
+            'merged': pr['state'] == 'MERGED',
+            'head': {'ref': pr['headRefName']},
+            'base': {'ref': pr['baseRefName']},
+            'comments_data': [
+                {'user': user(comment), 'body': comment['body'], 'created_at': comment['createdAt'],
+                 'html_url': comment['url']}
+                for comment in pr['comments']['nodes']
+            ],
+            'review_comments_data': review_comments,
+            'reviews_data': [
+                {'user': user(review), 'state': review['state'], 'body': review['body'],
+                 'submitted_at': review['submittedAt']}
+                for review in pr['reviews']['nodes']
+            ]
+        }
+    
     def get_pr_diff(self, owner: str, repo: str, pr_number: int) -> str:
         """Fetch the PR diff"""
-        diff_url = f"https://api.github.com/repos/{owner}/{repo}/pulls/{pr_number}"
+        diff_url = f"{config.github_api_url}/repos/{owner}/{repo}/pulls/{pr_number}"
         
         try:
             # Request diff format
             headers = self.headers.copy() if self.headers else {}
             headers['Accept'] = 'application/vnd.github.v3.diff'
             
-            response = requests.get(diff_url, headers=headers)
+            response = github_client.get(diff_url, headers=headers)
             
             if response.status_code == 200:
                 return response.text
@@ -254,23 +361,39 @@ Please implement the requested changes while respecting the existing work in thi
         
         return task_prompt
     
-    def clone_pr_branch(self, repo_url: str, head_branch: str, target_dir: str) -> str:
-        """Clone the repository and checkout the PR branch"""
+    def clone_pr_branch(self, repo_url: str, head_branch: str, target_dir: str,
+                        clone_mode: Optional[str] = None, sparse_paths: Optional[List[str]] = None) -> str:
+        """
+        Clone the repository and checkout the PR branch
+        
+        Args:
+            repo_url: Repository URL
+            head_branch: PR head branch to check out
+            target_dir: Directory to clone into
+            clone_mode: "full", "blobless" or "shallow" (defaults to config.clone_mode)
+            sparse_paths: Paths the task needs (e.g. from mentioned_paths() on the PR prompt);
+                          enables sparse checkout of their directories
+        """
+        # Resolve once so later git operations on the returned path never depend on the cwd
+        target_dir = os.path.abspath(target_dir)
         try:
             # Parse repo info for cloning
             repo_info = self.github_integration.parse_repo_info(repo_url)
             
             print(f"Cloning repository and checking out branch '{head_branch}'...")
             
-            # Clone the repository
-            subprocess.run([
-                "git", "clone", repo_url, target_dir
-            ], check=True, capture_output=True)
+            from utils.clone_repo import clone_mode_args, apply_sparse_checkout
             
-            # Checkout the PR branch
+            # Clone the PR branch directly so shallow clones contain the right commit
+            clone_args = clone_mode_args(clone_mode)
+            if sparse_paths:
+                clone_args.append("--sparse")
             subprocess.run([
-                "git", "checkout", head_branch
-            ], cwd=target_dir, check=True, capture_output=True)
+                "git", "clone", "--branch", head_branch
+            ] + clone_args + [repo_url, target_dir], check=True, capture_output=True)
+            
+            if sparse_paths:
+                apply_sparse_checkout(target_dir, sparse_paths)
             
             print(f"Successfully cloned and checked out branch '{head_branch}'")
             return target_dir
@@ -297,10 +420,8 @@ Please implement the requested changes while respecting the existing work in thi
             # Configure git user if needed
             self.github_integration.setup_git_config(repo_path)
             
-            # Add all changes
-            subprocess.run([
-                "git", "add", "."
-            ], cwd=repo_path, check=True)
+            # Add all changes (also outside a sparse checkout's cone)
+            stage_all_changes(repo_path)
             
             # Create commit message
             commit_message = f"SimulateDev: {task_description[:100]}{'...' if len(task_description) > 100 else ''}"
@@ -480,10 +601,8 @@ Please implement the requested changes while respecting the existing work in thi
             # Configure git user if needed
             self.github_integration.setup_git_config(repo_path)
             
-            # Add all changes
-            subprocess.run([
-                "git", "add", "."
-            ], cwd=repo_path, check=True)
+            # Add all changes (also outside a sparse checkout's cone)
+            stage_all_changes(repo_path)
             
             # Generate descriptive commit message
             commit_message = self.generate_review_response_commit_message(pr_data)
@@ -524,22 +643,34 @@ class GitHubIntegration:
         # Track the last pushed branch name (for handling conflicts)
         self._last_pushed_branch = None
     
+    def _get_user(self, error_message: str) -> Optional[Dict[str, Any]]:
+        """Get the authenticated user's login and name (cached across tasks and runs)"""
+        user = github_metadata_cache.get(github_metadata_cache.USER, "self", self.github_token)
+        if user is not None:
+            return user
+        
+        response = github_client.get(
+            f"{config.github_api_url}/user",
+            headers=self.base_headers
+        )
+        
+        if response.status_code != 200:
+            print(f"ERROR: {error_message}: {response.status_code}")
+            return None
+        
+        user_data = response.json()
+        user = {"login": user_data.get("login"), "name": user_data.get("name")}
+        github_metadata_cache.put(github_metadata_cache.USER, "self", self.github_token, user)
+        return user
+    
     def get_authenticated_user(self) -> Optional[str]:
         """Get the authenticated user's username"""
         if not self.github_token:
             return None
         
         try:
-            response = requests.get(
-                "https://api.github.com/user",
-                headers=self.base_headers
-            )
-            
-            if response.status_code == 200:
-                return response.json().get("login")
-            else:
-                print(f"ERROR: Failed to get authenticated user: {response.status_code}")
-                return None
+            user = self._get_user("Failed to get authenticated user")
+            return user["login"] if user else None
         except Exception as e:
             print(f"ERROR: Error getting authenticated user: {str(e)}")
             return None
@@ -551,34 +682,31 @@ class GitHubIntegration:
         
         try:
             # Get basic user info
-            user_response = requests.get(
-                "https://api.github.com/user",
-                headers=self.base_headers
-            )
-            
-            if user_response.status_code != 200:
-                print(f"ERROR: Failed to get user info: {user_response.status_code}")
+            user_data = self._get_user("Failed to get user info")
+            if not user_data:
                 return None
             
-            user_data = user_response.json()
-            
             # Get user emails to find primary email
-            emails_response = requests.get(
-                "https://api.github.com/user/emails",
-                headers=self.base_headers
-            )
-            
-            primary_email = None
-            if emails_response.status_code == 200:
-                emails = emails_response.json()
-                # Find primary email
-                for email_info in emails:
-                    if email_info.get("primary", False):
-                        primary_email = email_info.get("email")
-                        break
-                # Fallback to first email if no primary found
-                if not primary_email and emails:
-                    primary_email = emails[0].get("email")
+            cached_email = github_metadata_cache.get(github_metadata_cache.USER_EMAIL, "self", self.github_token)
+            primary_email = cached_email["email"] if cached_email is not None else None
+            if cached_email is None:
+                emails_response = github_client.get(
+                    f"{config.github_api_url}/user/emails",
+                    headers=self.base_headers
+                )
+                
+                if emails_response.status_code == 200:
+                    emails = emails_response.json()
+                    # Find primary email
+                    for email_info in emails:
+                        if email_info.get("primary", False):
+                            primary_email = email_info.get("email")
+                            break
+                    # Fallback to first email if no primary found
+                    if not primary_email and emails:
+                        primary_email = emails[0].get("email")
+                    github_metadata_cache.put(github_metadata_cache.USER_EMAIL, "self", self.github_token,
+                                              {"email": primary_email})
             
             # Get the name, but be smart about fallbacks
             github_name = user_data.get("name")
@@ -606,6 +734,44 @@ class GitHubIntegration:
             print(f"ERROR: Error getting user info: {str(e)}")
             return None
     
+    def _get_repo_metadata(self, owner: str, repo: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Get a repository's push permission and default branch (cached across tasks and runs).
+        
+        Returns:
+            Tuple[Optional[Dict], int]: ({"push", "default_branch", "parent"} or None if the repository
+            could not be read, HTTP status code)
+        """
+        subject = f"{owner}/{repo}"
+        metadata = github_metadata_cache.get(github_metadata_cache.REPO, subject, self.github_token)
+        if metadata is not None:
+            return metadata, 200
+        
+        # Push permissions and the PR base branch come from here, so this may use the reserved budget
+        response = github_client.get(f"{config.github_api_url}/repos/{owner}/{repo}", headers=self.base_headers,
+                                     priority=GitHubPriority.CRITICAL)
+        if response.status_code != 200:
+            return None, response.status_code
+        
+        repo_data = response.json()
+        metadata = {
+            "push": repo_data.get("permissions", {}).get("push", False),
+            "default_branch": repo_data.get("default_branch", "main"),
+            "parent": (repo_data.get("parent") or {}).get("full_name")
+        }
+        github_metadata_cache.put(github_metadata_cache.REPO, subject, self.github_token, metadata)
+        return metadata, 200
+    
+    def invalidate_repo_metadata(self, repo_url: str):
+        """Forget cached metadata of a repository (e.g. after a push was rejected)"""
+        try:
+            repo_info = self.parse_repo_info(repo_url)
+        except ValueError:
+            return
+        github_metadata_cache.invalidate(github_metadata_cache.REPO, f"{repo_info['owner']}/{repo_info['repo']}",
+                                         self.github_token)
+    
+    @traced("github.check_push_permissions", category="http")
     def check_push_permissions(self, repo_url: str) -> bool:
         """Check if we have push permissions to the repository"""
         if not self.github_token:
@@ -614,33 +780,37 @@ class GitHubIntegration:
         
         try:
             repo_info = self.parse_repo_info(repo_url)
-            url = f"https://api.github.com/repos/{repo_info['owner']}/{repo_info['repo']}"
-            
-            response = requests.get(url, headers=self.base_headers)
+            metadata, status_code = self._get_repo_metadata(repo_info['owner'], repo_info['repo'])
             
-            if response.status_code == 200:
-                repo_data = response.json()
-                permissions = repo_data.get("permissions", {})
-                can_push = permissions.get("push", False)
+            if metadata is not None:
+                can_push = metadata["push"]
                 
                 print(f"INFO: Push permissions for {repo_info['owner']}/{repo_info['repo']}: {can_push}")
                 return can_push
             else:
-                print(f"INFO: Cannot access repository permissions (status: {response.status_code}), assuming no push access")
+                print(f"INFO: Cannot access repository permissions (status: {status_code}), assuming no push access")
                 return False
                 
         except Exception as e:
             print(f"WARNING: Error checking permissions: {str(e)}, assuming no push access")
             return False
     
+    @traced("github.fork_repository", category="http")
     def fork_repository(self, repo_url: str) -> Optional[str]:
-        """Fork the repository to the authenticated user's account"""
+        """
+        Fork the repository to the authenticated user's account.
+        
+        A fork made earlier (remembered per upstream in the metadata cache, or found under the
+        user's account) is reused without forking again. A new fork is polled with exponential
+        backoff until its default branch exists, up to GITHUB_FORK_READY_TIMEOUT_SECONDS.
+        """
         if not self.github_token:
             print("ERROR: Cannot fork repository: No GitHub token configured")
             return None
         
         try:
             repo_info = self.parse_repo_info(repo_url)
+            upstream = f"{repo_info['owner']}/{repo_info['repo']}"
             username = self.get_authenticated_user()
             
             if not username:
@@ -648,28 +818,33 @@ class GitHubIntegration:
                 return None
             
             # Check if fork already exists
-            fork_url = f"https://github.com/{username}/{repo_info['repo']}"
-            fork_api_url = f"https://api.github.com/repos/{username}/{repo_info['repo']}"
-            
-            response = requests.get(fork_api_url, headers=self.base_headers)
-            if response.status_code == 200:
+            existing_fork = self._find_existing_fork(upstream, username, repo_info['repo'])
+            if existing_fork:
+                fork_url = f"https://github.com/{existing_fork}"
                 print(f"INFO: Fork already exists: {fork_url}")
                 return fork_url
             
             # Create fork
-            fork_api_url = f"https://api.github.com/repos/{repo_info['owner']}/{repo_info['repo']}/forks"
-            response = requests.post(fork_api_url, headers=self.base_headers)
+            fork_api_url = f"{config.github_api_url}/repos/{upstream}/forks"
+            response = github_client.post(fork_api_url, headers=self.base_headers, priority=GitHubPriority.CRITICAL)
             
             if response.status_code == 202:  # 202 Accepted for fork creation
                 fork_data = response.json()
                 fork_url = fork_data["html_url"]
+                default_branch = fork_data.get("default_branch", "main")
                 print(f"SUCCESS: Repository forked: {fork_url}")
                 
-                # Wait a moment for fork to be ready
-                import time
                 print("INFO: Waiting for fork to be ready...")
-                time.sleep(3)
+                if not self._wait_for_fork_ready(fork_data["full_name"], default_branch):
+                    print(f"WARNING: Fork not ready after {config.github_fork_ready_timeout_seconds:.0f}s, continuing anyway")
                 
+                github_metadata_cache.put(github_metadata_cache.REPO, fork_data["full_name"], self.github_token, {
+                    "push": True,
+                    "default_branch": default_branch,
+                    "parent": upstream
+                })
+                github_metadata_cache.put(github_metadata_cache.FORK, upstream, self.github_token,
+                                          fork_data["full_name"])
                 return fork_url
             else:
                 print(f"ERROR: Failed to fork repository: {response.status_code} - {response.text}")
@@ -679,8 +854,48 @@ class GitHubIntegration:
             print(f"ERROR: Error forking repository: {str(e)}")
             return None
     
+    def _find_existing_fork(self, upstream: str, username: str, repo: str) -> Optional[str]:
+        """Full name of the user's fork of upstream if it exists, or None"""
+        cached_fork = github_metadata_cache.get(github_metadata_cache.FORK, upstream, self.github_token)
+        if cached_fork:
+            fork_owner, fork_repo = cached_fork.split("/", 1)
+            if self._get_repo_metadata(fork_owner, fork_repo)[0] is not None:
+                return cached_fork
+            # The fork was deleted or renamed
+            github_metadata_cache.invalidate(github_metadata_cache.FORK, upstream, self.github_token)
+        
+        metadata, _ = self._get_repo_metadata(username, repo)
+        # A same-named repository that is not a fork of upstream doesn't count
+        # (entries cached before parents were recorded have no "parent")
+        if metadata is not None and (metadata.get("parent", upstream) or "").lower() == upstream.lower():
+            fork = f"{username}/{repo}"
+            github_metadata_cache.put(github_metadata_cache.FORK, upstream, self.github_token, fork)
+            return fork
+        return None
+    
+    def _wait_for_fork_ready(self, fork_full_name: str, default_branch: str) -> bool:
+        """Poll a new fork with exponential backoff until its default branch exists; False on timeout"""
+        import time
+        branch_url = f"{config.github_api_url}/repos/{fork_full_name}/branches/{default_branch}"
+        deadline = time.monotonic() + config.github_fork_ready_timeout_seconds
+        delay = 0.5
+        while True:
+            response = github_client.get(branch_url, headers=self.base_headers, conditional=False,
+                                         priority=GitHubPriority.CRITICAL)
+            if response.status_code == 200:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 8.0)
+    
+    @traced("git.update_remote_origin", category="git")
     def update_remote_origin(self, repo_path: str, new_origin_url: str) -> bool:
-        """Update the remote origin URL"""
+        """Update the remote origin URL
+        
+        Not for pooled workspaces: their remotes live in the shared mirror's config.
+        """
         try:
             # Remove existing origin
             subprocess.run(
@@ -746,6 +961,7 @@ class GitHubIntegration:
         
         raise ValueError(f"Invalid GitHub repository URL: {repo_url}")
     
+    @traced("git.setup_git_config", category="git")
     def setup_git_config(self, repo_path: str):
         """Setup git configuration for the repository"""
         try:
@@ -789,6 +1005,7 @@ class GitHubIntegration:
             print(f"ERROR: Failed to setup git config: {e}")
             return False
     
+    @traced("git.create_branch", category="git")
     def create_branch(self, repo_path: str, branch_name: str) -> bool:
         """Create and checkout a new branch"""
         try:
@@ -804,15 +1021,43 @@ class GitHubIntegration:
             print(f"ERROR: Failed to create branch {branch_name}: {e.stderr.decode()}")
             return False
     
+    @traced("git.create_branch", category="git")
+    def _create_unique_branch(self, repo_path: str, branch_name: str) -> Optional[str]:
+        """Create and checkout a branch, adding a suffix if the name is already taken
+        
+        Pooled workspaces are worktrees of one mirror and share its branches, so
+        concurrent tasks can generate the same branch name.
+        
+        Returns:
+            Optional[str]: The branch name actually created, or None on failure
+        """
+        import uuid
+        
+        error = ""
+        for candidate in (branch_name, f"{branch_name}_{uuid.uuid4().hex[:6]}"):
+            result = subprocess.run(
+                ["git", "checkout", "-b", candidate],
+                cwd=repo_path,
+                capture_output=True,
+                text=True
+            )
+            if result.returncode == 0:
+                if candidate != branch_name:
+                    print(f"INFO: Branch {branch_name} already exists, using {candidate}")
+                return candidate
+            error = result.stderr.strip()
+            if "already exists" not in error:
+                break
+        
+        print(f"ERROR: Failed to create branch {branch_name}: {error}")
+        return None
+    
+    @traced("git.commit_changes", category="git")
     def commit_changes(self, repo_path: str, commit_message: str) -> bool:
         """Stage and commit all changes"""
         try:
-            # Stage all changes
-            subprocess.run(
-                ["git", "add", "."],
-                cwd=repo_path,
-                check=True
-            )
+            # Stage all changes, including files outside a sparse checkout's cone
+            stage_all_changes(repo_path)
             
             # Check if there are changes to commit
             result = subprocess.run(
@@ -839,27 +1084,19 @@ class GitHubIntegration:
             print(f"ERROR: Failed to commit changes: {e.stderr.decode()}")
             return False
     
+    @traced("git.push_branch", category="git")
     def push_branch(self, repo_path: str, branch_name: str, repo_url: str) -> bool:
-        """Push branch to remote repository with conflict resolution"""
+        """Push branch to remote repository with conflict resolution
+        
+        Pushes to repo_url directly rather than through a remote: pooled workspaces are
+        worktrees of a shared mirror, so adding or rewriting "origin" would change it for
+        every other workspace of the repository.
+        """
         try:
-            # Add remote origin if it doesn't exist
-            result = subprocess.run(
-                ["git", "remote", "get-url", "origin"],
-                cwd=repo_path,
-                capture_output=True
-            )
-            
-            if result.returncode != 0:
-                subprocess.run(
-                    ["git", "remote", "add", "origin", repo_url],
-                    cwd=repo_path,
-                    check=True
-                )
-            
             # Try to push the branch
             try:
                 subprocess.run(
-                    ["git", "push", "-u", "origin", branch_name],
+                    ["git", "push", repo_url, branch_name],
                     cwd=repo_path,
                     check=True,
                     capture_output=True
@@ -876,9 +1113,9 @@ class GitHubIntegration:
                     
                     # Try to fetch and merge remote changes
                     try:
-                        # Fetch the latest changes
+                        # Fetch the latest changes (into this worktree's FETCH_HEAD)
                         subprocess.run(
-                            ["git", "fetch", "origin", branch_name],
+                            ["git", "fetch", repo_url, branch_name],
                             cwd=repo_path,
                             check=True,
                             capture_output=True
@@ -886,7 +1123,7 @@ class GitHubIntegration:
                         
                         # Try to merge the remote changes
                         subprocess.run(
-                            ["git", "merge", f"origin/{branch_name}"],
+                            ["git", "merge", "FETCH_HEAD"],
                             cwd=repo_path,
                             check=True,
                             capture_output=True
@@ -894,7 +1131,7 @@ class GitHubIntegration:
                         
                         # Try pushing again after merge
                         subprocess.run(
-                            ["git", "push", "-u", "origin", branch_name],
+                            ["git", "push", repo_url, branch_name],
                             cwd=repo_path,
                             check=True,
                             capture_output=True
@@ -912,6 +1149,8 @@ class GitHubIntegration:
             
         except subprocess.CalledProcessError as e:
             print(f"ERROR: Failed to push branch {branch_name}: {e.stderr.decode()}")
+            # The cached push permission may be what sent us here
+            self.invalidate_repo_metadata(repo_url)
             return False
     
     def _create_and_push_unique_branch(self, repo_path: str, original_branch_name: str, repo_url: str) -> bool:
@@ -933,7 +1172,7 @@ class GitHubIntegration:
             
             # Push the new unique branch
             subprocess.run(
-                ["git", "push", "-u", "origin", unique_branch_name],
+                ["git", "push", repo_url, unique_branch_name],
                 cwd=repo_path,
                 check=True,
                 capture_output=True
@@ -951,6 +1190,7 @@ class GitHubIntegration:
             print(f"ERROR: Failed to create and push unique branch: {e.stderr.decode()}")
             return False
     
+    @traced("github.get_default_branch", category="http")
     def get_default_branch(self, repo_url: str) -> str:
         """Get the default branch of a repository
         
@@ -966,22 +1206,19 @@ class GitHubIntegration:
         
         try:
             repo_info = self.parse_repo_info(repo_url)
-            url = f"https://api.github.com/repos/{repo_info['owner']}/{repo_info['repo']}"
+            metadata, status_code = self._get_repo_metadata(repo_info['owner'], repo_info['repo'])
             
-            response = requests.get(url, headers=self.base_headers)
-            
-            if response.status_code == 200:
-                repo_data = response.json()
-                default_branch = repo_data.get("default_branch", "main")
-                return default_branch
+            if metadata is not None:
+                return metadata["default_branch"]
             else:
-                print(f"WARNING: Cannot detect default branch (status: {response.status_code}), using 'main'")
+                print(f"WARNING: Cannot detect default branch (status: {status_code}), using 'main'")
                 return "main"
                 
         except Exception as e:
             print(f"WARNING: Error detecting default branch: {str(e)}, using 'main'")
             return "main"
 
+    @traced("github.create_pull_request", category="http")
     def create_pull_request(
         self,
         repo_url: str,
@@ -1037,12 +1274,13 @@ class GitHubIntegration:
                 "maintainer_can_modify": True
             }
             
-            url = f"https://api.github.com/repos/{target_repo_info['owner']}/{target_repo_info['repo']}/pulls"
+            url = f"{config.github_api_url}/repos/{target_repo_info['owner']}/{target_repo_info['repo']}/pulls"
             
-            response = requests.post(
+            response = github_client.post(
                 url,
                 json=pr_data,
-                headers=self.base_headers
+                headers=self.base_headers,
+                priority=GitHubPriority.CRITICAL
             )
             
             if response.status_code == 201:
@@ -1056,10 +1294,11 @@ class GitHubIntegration:
                     print(f"INFO: Trying base branch: main")
                     pr_data["base"] = "main"
                     
-                    retry_response = requests.post(
+                    retry_response = github_client.post(
                         url,
                         json=pr_data,
-                        headers=self.base_headers
+                        headers=self.base_headers,
+                        priority=GitHubPriority.CRITICAL
                     )
                     
                     if retry_response.status_code == 201:
@@ -1080,6 +1319,7 @@ class GitHubIntegration:
             print(f"ERROR: Error creating pull request: {str(e)}")
             return None
     
+    @traced("llm.generate_commit_and_pr_content", category="llm")
     def generate_commit_and_pr_content_with_claude(self, agent_execution_report_summary: str, workflow_name: str, coding_ides_info: Optional[str] = None, execution_time_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
         Use Claude to generate both commit message and PR content in a single API call
@@ -1251,7 +1491,8 @@ class GitHubIntegration:
             )
         
         # Create branch
-        if not self.create_branch(repo_path, branch_name):
+        branch_name = self._create_unique_branch(repo_path, branch_name)
+        if not branch_name:
             return None
         
         if not self.commit_changes(repo_path, commit_message):
@@ -1277,6 +1518,7 @@ class GitHubIntegration:
         else:
             return None
     
+    @traced("github.smart_workflow", category="github")
     def smart_workflow(
         self,
         repo_path: str,
@@ -1326,12 +1568,9 @@ class GitHubIntegration:
             print("ERROR: Failed to fork repository")
             return None
         
-        # Step 2: Update remote origin to point to fork
-        print("INFO: Updating remote origin to fork...")
+        # Step 2: Push to the fork by URL; origin stays untouched, since a pooled
+        # workspace shares its remotes with every other workspace of the repository
         fork_git_url = fork_url + ".git"
-        if not self.update_remote_origin(repo_path, fork_git_url):
-            print("ERROR: Failed to update remote origin")
-            return None
         
         # Step 3: Setup git config
         if not self.setup_git_config(repo_path):
@@ -1367,7 +1606,8 @@ class GitHubIntegration:
             )
         
         # Step 5: Create branch
-        if not self.create_branch(repo_path, branch_name):
+        branch_name = self._create_unique_branch(repo_path, branch_name)
+        if not branch_name:
             return None
         
         if not self.commit_changes(repo_path, commit_message):
@@ -1376,6 +1616,11 @@ class GitHubIntegration:
         # Step 6: Push to fork - this may create a unique branch name if conflicts occur
         self._last_pushed_branch = None  # Reset before push
         if not self.push_branch(repo_path, branch_name, fork_git_url):
+            # Don't hand the same fork to the next task if it is what rejected the push
+            original_repo_info = self.parse_repo_info(original_repo_url)
+            github_metadata_cache.invalidate(github_metadata_cache.FORK,
+                                             f"{original_repo_info['owner']}/{original_repo_info['repo']}",
+                                             self.github_token)
             return None
         
         # Use the actual pushed branch name (may be different if conflicts were resolved)
@@ -1490,7 +1735,7 @@ def run_github_preflight_check(repo_url: str, create_pr: bool = True) -> bool:
     try:
         import requests
         headers = integration.base_headers if hasattr(integration, 'base_headers') else {}
-        response = requests.get("https://api.github.com/user", headers=headers, timeout=10)
+        response = github_client.get(f"{config.github_api_url}/user", headers=headers, timeout=10)
         
         if response.status_code == 401:
             print("❌ GitHub API authentication failed - check your GITHUB_TOKEN permissions")
@@ -10,9 +10,10 @@ Workflows are task type modifiers that influence role-specific prompts.
 import os
 import json
 import time
+import asyncio
 import webbrowser
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
-from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple, TYPE_CHECKING
+from dataclasses import dataclass, replace, asdict, fields
 from datetime import datetime
 
 # Import progress monitoring classes conditionally
@@ -20,30 +21,41 @@ if TYPE_CHECKING:
     from api.app.services.progress_monitor import ProgressMonitor
     from api.app.schemas.progress import PhaseType, StepType, StepStatus, AgentContext as ProgressAgentContext
 
-# Try to import progress monitoring classes for runtime use
-try:
-    import sys
-    import os
-    api_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
-    if api_path not in sys.path:
-        sys.path.insert(0, api_path)
-    
-    from app.services.progress_monitor import ProgressMonitor
-    from app.schemas.progress import PhaseType, StepType, StepStatus, AgentContext as ProgressAgentContext
-    PROGRESS_MONITORING_AVAILABLE = True
-except ImportError:
-    PROGRESS_MONITORING_AVAILABLE = False
+# Progress monitoring classes live in the API package (pydantic, sqlalchemy). They are only
+# needed when a ProgressMonitor is passed in, so they are imported on first use.
+PROGRESS_MONITORING_AVAILABLE: Optional[bool] = None
+
+
+def _progress_monitoring_available() -> bool:
+    """Import the progress schemas on first call and report whether they are available"""
+    global PROGRESS_MONITORING_AVAILABLE, PhaseType, StepType, StepStatus, ProgressAgentContext
+    if PROGRESS_MONITORING_AVAILABLE is None:
+        try:
+            import sys
+            api_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'api')
+            if api_path not in sys.path:
+                sys.path.insert(0, api_path)
+            
+            from app.schemas.progress import PhaseType, StepType, StepStatus, AgentContext as ProgressAgentContext
+            PROGRESS_MONITORING_AVAILABLE = True
+        except ImportError:
+            PROGRESS_MONITORING_AVAILABLE = False
+    return PROGRESS_MONITORING_AVAILABLE
 
-from utils.computer_use_utils import LLMComputerUse, close_ide_window_for_project
 from agents import (
     AgentFactory, CodingAgentIdeType, AgentRole, MultiAgentTask, 
     AgentDefinition, AgentContext, MultiAgentResponse
 )
-from agents.web_agent import WebAgent
 from roles import RoleFactory
-from utils.clone_repo import clone_repository
+from utils.clone_repo import clone_repository, mentioned_paths
+from utils.workspace_pool import workspace_pool
+from utils.agent_checkout import AgentCheckout
 from src.github_integration import GitHubIntegration
+from src.checkpoint import RunCheckpoint
+from src.result_cache import ResultCache, result_cache
 from common.config import config
+from common.tracing import Tracer, span, set_tracer, reset_tracer
+from utils.llm_telemetry import LLMTelemetry, set_telemetry, reset_telemetry
 
 
 @dataclass
@@ -58,15 +70,37 @@ class TaskRequest:
     work_directory: Optional[str] = None
     delete_existing_repo_env: bool = True
     original_repo_url: Optional[str] = None  # Track original repo URL before potential forking
+    clone_mode: Optional[str] = None  # full, blobless or shallow (defaults to config.clone_mode)
+    sparse_paths: Optional[List[str]] = None  # Paths the task needs; enables sparse checkout
+    run_id: Optional[str] = None  # Checkpoint id; generated on first execution
+    use_cache: bool = True  # Reuse the result of an identical earlier run on the same commit
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for JSON serialization"""
+        data = asdict(self)
+        data["agents"] = [agent.to_dict() for agent in self.agents]
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TaskRequest':
+        """Create from dictionary (JSON deserialization)"""
+        data = dict(data)
+        data["agents"] = [AgentDefinition.from_dict(agent) for agent in data.get("agents", [])]
+        known_fields = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in known_fields})
     
 
 class Orchestrator:
     """Unified orchestrator for all agent execution scenarios"""
     
     def __init__(self, github_token: Optional[str] = None):
-        self.computer_use_client = LLMComputerUse()
+        self._computer_use_client = None  # Created on first use by a GUI agent
         self.github_integration = GitHubIntegration(github_token)
         self.execution_log = []
+        self._leased_workspaces = []  # (repo_url, path) pairs leased from the workspace pool
+        self.checkpoint: Optional[RunCheckpoint] = None
+        self.tracer: Optional[Tracer] = None  # Spans of the last execute_task run
+        self.llm_telemetry: Optional[LLMTelemetry] = None  # LLM calls of the last execute_task run
         
         # Create necessary directories using config
         self.base_dir = config.scanned_repos_path
@@ -75,7 +109,16 @@ class Orchestrator:
         self.responses_dir = config.reports_path
         os.makedirs(self.responses_dir, exist_ok=True)
     
-
+    @property
+    def computer_use_client(self):
+        """Vision/computer-use client for GUI agents, created on first use
+        
+        Imported lazily so CLI, web and test agents never load pyautogui, mss or litellm.
+        """
+        if self._computer_use_client is None:
+            from utils.computer_use_utils import LLMComputerUse
+            self._computer_use_client = LLMComputerUse()
+        return self._computer_use_client
     
     @classmethod
     def create_request(cls, 
@@ -223,13 +266,10 @@ class Orchestrator:
         """Check if any of the agents are web agents"""
         for agent_def in agents:
             try:
-                agent_type = CodingAgentIdeType(agent_def.coding_ide.lower().strip())
-                # Create a temporary agent instance to check if it's a WebAgent
-                temp_agent = AgentFactory.create_agent(agent_type, self.computer_use_client)
-                if isinstance(temp_agent, WebAgent):
+                if AgentFactory.is_web_agent(agent_def.coding_ide):
                     return True
-            except Exception:
-                # If agent creation fails, skip this agent
+            except ValueError:
+                # Unknown agents are reported when they are executed
                 continue
         return False
     
@@ -282,32 +322,96 @@ class Orchestrator:
     def _setup_work_directory(self, request: TaskRequest) -> str:
         """Setup and return the work directory for the request"""
         if request.work_directory:
-            return request.work_directory
+            return os.path.abspath(request.work_directory)
         
         if request.repo_url:
+            # Derive the sparse checkout from paths mentioned in the task (issue/PR prompt)
+            if request.sparse_paths is None and config.sparse_checkout:
+                request.sparse_paths = mentioned_paths(request.task_description)
+            
             # Clone repository if URL provided
             if request.target_dir:
                 repo_path = request.target_dir
-                success = clone_repository(request.repo_url, request.target_dir, request.delete_existing_repo_env)
-                if not success:
-                    raise Exception("Failed to clone repository")
-            else:
-                # Use default cloning logic
-                repo_name = os.path.splitext(os.path.basename(request.repo_url.rstrip('/')))[0]
-                if repo_name.endswith('.git'):
-                    repo_name = repo_name[:-4]
-                
-                repo_path = os.path.join(self.base_dir, repo_name)
-                success = clone_repository(request.repo_url, repo_path, request.delete_existing_repo_env)
+                success = clone_repository(request.repo_url, request.target_dir, request.delete_existing_repo_env,
+                                           clone_mode=request.clone_mode, sparse_paths=request.sparse_paths)
                 if not success:
                     raise Exception("Failed to clone repository")
+                print(f"SUCCESS: Repository cloned to: {repo_path}")
+                return repo_path
+            
+            # Lease a dedicated worktree from the mirror cache. Mirrors are full or blobless;
+            # a shallow clone is a one-off, so it bypasses the pool.
+            clone_mode = request.clone_mode or config.clone_mode
+            if config.use_workspace_pool and clone_mode == "shallow":
+                print("INFO: Shallow clone requested, cloning directly instead of using the workspace pool")
+            elif config.use_workspace_pool:
+                repo_path = workspace_pool.acquire(request.repo_url, sparse_paths=request.sparse_paths,
+                                                   clone_mode=clone_mode)
+                if repo_path:
+                    self._leased_workspaces.append((request.repo_url, repo_path))
+                    return repo_path
+                print("WARNING: Workspace pool unavailable, falling back to a full clone")
+            
+            # Use default cloning logic
+            repo_name = os.path.splitext(os.path.basename(request.repo_url.rstrip('/')))[0]
+            if repo_name.endswith('.git'):
+                repo_name = repo_name[:-4]
+            
+            repo_path = os.path.join(self.base_dir, repo_name)
+            success = clone_repository(request.repo_url, repo_path, request.delete_existing_repo_env,
+                                       clone_mode=request.clone_mode, sparse_paths=request.sparse_paths)
+            if not success:
+                raise Exception("Failed to clone repository")
             
             print(f"SUCCESS: Repository cloned to: {repo_path}")
             return repo_path
         else:
-            # Use current directory if no repo URL
+            # Use current directory if no repo URL; resolved once here so nothing
+            # downstream depends on the process cwd
             return os.getcwd()
     
+    @staticmethod
+    def load_checkpointed_request(run_id: str) -> Optional[TaskRequest]:
+        """Rebuild the TaskRequest of a checkpointed run (for resuming it)"""
+        checkpoint = RunCheckpoint.load(run_id)
+        if not checkpoint or not checkpoint.request:
+            return None
+        
+        request = TaskRequest.from_dict(checkpoint.request)
+        request.run_id = run_id
+        return request
+    
+    def _restore_checkpoint_workspace(self, request: TaskRequest, checkpoint: RunCheckpoint):
+        """Point a resumed request at the work directory (and workspace lease) of its checkpoint"""
+        if checkpoint.request:
+            # Keep the repository resolved by the original run (e.g. a fork for web agents)
+            request.repo_url = checkpoint.request.get("repo_url") or request.repo_url
+            request.original_repo_url = checkpoint.request.get("original_repo_url") or request.original_repo_url
+        
+        work_directory = checkpoint.work_directory
+        lease = checkpoint.leased_workspace
+        # A pooled workspace is only ours if it is still kept for this run (it may have expired)
+        if work_directory and os.path.isdir(work_directory) and (
+                not lease or workspace_pool.reclaim(lease[0], lease[1], checkpoint.run_id)):
+            request.work_directory = work_directory
+            if lease:
+                # Adopt the lease so the workspace is returned to the pool when this run finishes
+                self._leased_workspaces.append(lease)
+            print(f"INFO: Resuming in work directory: {work_directory}")
+        else:
+            print(f"WARNING: Work directory of run '{checkpoint.run_id}' is no longer available; "
+                  f"changes made by finished agents are lost and a fresh checkout will be used")
+            request.work_directory = None
+    
+    def _release_workspaces(self):
+        """Return any worktrees leased for this execution to the workspace pool"""
+        while self._leased_workspaces:
+            repo_url, repo_path = self._leased_workspaces.pop()
+            try:
+                workspace_pool.release(repo_url, repo_path)
+            except Exception as e:
+                print(f"WARNING: Failed to release workspace {repo_path}: {str(e)}")
+    
     def _create_role_specific_prompt(self, role: AgentRole, context: AgentContext, 
                                    agent_definition: AgentDefinition, 
                                    workflow_type: Optional[str] = None) -> str:
@@ -346,79 +450,425 @@ class Orchestrator:
         try:
             print(f"Executing {agent_definition.coding_ide} ({agent_definition.role.value})")
             
-            # Change to work directory
-            original_cwd = os.getcwd()
-            os.chdir(work_directory)
+            # Create and execute agent (only GUI agents need the computer-use client)
+            capabilities = AgentFactory.get_capabilities(agent_type)
+            agent = AgentFactory.create_agent(
+                agent_type, self.computer_use_client if capabilities.interface == "gui" else None
+            )
             
-            try:
-                # Create and execute agent
-                agent = AgentFactory.create_agent(agent_type, self.computer_use_client)
-                
-                # Set current project for window title checking
-                agent.set_current_project(work_directory)
-                
-                # Set repository context for web agents
-                if isinstance(agent, WebAgent):
-                    if context.working_repo_url:
-                        agent.set_repository_context(context.working_repo_url, context.original_repo_url)
-                
-                # Always close any existing IDE window with this project first to ensure clean state
+            # Agents operate on the explicit work directory, never the process cwd
+            agent.set_current_project(work_directory)
+            
+            # Set repository context for web agents
+            if capabilities.is_web:
+                if context.working_repo_url:
+                    agent.set_repository_context(context.working_repo_url, context.original_repo_url)
+            
+            # Always close any existing IDE window with this project first to ensure clean state
+            if capabilities.interface == "gui":
+                from utils.computer_use_utils import close_ide_window_for_project
                 repo_name = os.path.basename(work_directory)
                 close_ide_window_for_project(agent.window_name, repo_name)
-                time.sleep(2)  # Wait for window to close completely
-                
+                await asyncio.sleep(2)  # Wait for window to close completely
+            
+            with span("open_coding_interface", category="agent", agent=agent_definition.coding_ide):
                 await agent.open_coding_interface()
-                
+            
+            with span("execute_prompt", category="agent", agent=agent_definition.coding_ide,
+                      role=agent_definition.role.value) as prompt_span:
                 response = await agent.execute_prompt(prompt)
-                
-                result = {
-                    "coding_ide": agent_definition.coding_ide,
-                    "agent_model": agent_definition.model,
-                    "role": agent_definition.role.value,
-                    "success": response.success,
-                    "output": response.content,
-                    "error": response.error_message,
-                    "timestamp": time.time()
-                }
-                
-                # Apply role-specific post-execution processing
-                if role_instance:
-                    try:
-                        result = role_instance.post_execution_hook(result, context)
-                    except Exception as e:
-                        print(f"Warning: Post-execution hook failed: {e}")
-                
-                if response.success:
-                    print(f"{agent_definition.coding_ide} completed successfully")
-                else:
-                    print(f"{agent_definition.coding_ide} failed: {response.error_message}")
-                
-                # Close the coding interface for this project after task completion
+                prompt_span["success"] = response.success
+            
+            result = {
+                "coding_ide": agent_definition.coding_ide,
+                "agent_model": agent_definition.model,
+                "role": agent_definition.role.value,
+                "success": response.success,
+                "output": response.content,
+                "error": response.error_message,
+                "timestamp": time.time()
+            }
+            
+            # Apply role-specific post-execution processing
+            if role_instance:
                 try:
-                    close_success = await agent.close_coding_interface()
-                    if not close_success:
-                        print(f"WARNING: Failed to close {agent_definition.coding_ide} interface")
+                    result = role_instance.post_execution_hook(result, context)
                 except Exception as e:
-                    print(f"WARNING: Error closing {agent_definition.coding_ide} interface: {str(e)}")
-                
-                return result
+                    print(f"Warning: Post-execution hook failed: {e}")
+            
+            if response.success:
+                print(f"{agent_definition.coding_ide} completed successfully")
+            else:
+                print(f"{agent_definition.coding_ide} failed: {response.error_message}")
             
-            finally:
-                os.chdir(original_cwd)
+            # Close the coding interface for this project after task completion
+            try:
+                with span("close_coding_interface", category="agent", agent=agent_definition.coding_ide):
+                    close_success = await agent.close_coding_interface()
+                if not close_success:
+                    print(f"WARNING: Failed to close {agent_definition.coding_ide} interface")
+            except Exception as e:
+                print(f"WARNING: Error closing {agent_definition.coding_ide} interface: {str(e)}")
+            
+            return result
                 
         except Exception as e:
             error_msg = f"Exception executing {agent_definition.coding_ide}: {str(e)}"
             print(f"{error_msg}")
             
-            return {
-                "coding_ide": agent_definition.coding_ide,
-                "agent_model": agent_definition.model,
-                "role": agent_definition.role.value,
-                "success": False,
-                "output": "",
-                "error": error_msg,
-                "timestamp": time.time()
-            }
+            return self._agent_error_result(agent_definition, error_msg)
+    
+    @staticmethod
+    def _agent_error_result(agent_definition: AgentDefinition, error_msg: str) -> Dict[str, Any]:
+        """Build the result of an agent that could not be run"""
+        return {
+            "coding_ide": agent_definition.coding_ide,
+            "agent_model": agent_definition.model,
+            "role": agent_definition.role.value,
+            "success": False,
+            "output": "",
+            "error": error_msg,
+            "timestamp": time.time()
+        }
+    
+    def _record_agent_result(self, agent_def: AgentDefinition, result: Dict[str, Any],
+                             context: AgentContext, index: int, agent_id: str) -> Dict[str, Any]:
+        """Log an agent result, add its output to the shared context and checkpoint it"""
+        self.execution_log.append(result)
+        
+        entry = context.add_agent_output(
+            agent_def.coding_ide, agent_def.role,
+            result["output"], result["success"], step=index + 1
+        )
+        
+        if self.checkpoint:
+            self.checkpoint.record_step(index, agent_id, result, entry)
+        
+        if not result["success"]:
+            print(f"WARNING: Agent {agent_def.coding_ide} failed, continuing with remaining agents...")
+        
+        return entry
+    
+    async def _report_agent_skipped(self, index: int, agent_def: AgentDefinition,
+                                    progress_monitor: Optional['ProgressMonitor'] = None):
+        """Report an agent restored from a checkpoint as finished"""
+        print(f"Step {index + 1}: {agent_def.coding_ide} ({agent_def.role.value}) already finished, skipping")
+        
+        if progress_monitor and _progress_monitoring_available():
+            agent_context = ProgressAgentContext(
+                agent_id=f"{agent_def.role.value.lower()}_{index+1}",
+                agent_ide=agent_def.coding_ide,
+                agent_role=agent_def.role.value,
+                agent_model=agent_def.model
+            )
+            for step_type in (StepType.AGENT_STARTING, StepType.AGENT_WORKING, StepType.AGENT_FINISHING):
+                await progress_monitor.mark_step_completed(
+                    PhaseType.AGENT_EXECUTION, step_type, agent_context
+                )
+    
+    async def _run_agent_step(self, index: int, agent_def: AgentDefinition,
+                              context: AgentContext, request: TaskRequest,
+                              work_directory: str,
+                              progress_monitor: Optional['ProgressMonitor'] = None) -> Dict[str, Any]:
+        """Run a single agent step with progress reporting and return its result"""
+        print(f"\n{'='*60}")
+        print(f"Step {context.current_step}/{context.total_steps}: {agent_def.coding_ide} ({agent_def.role.value})")
+        print(f"{'='*60}")
+        
+        # Create agent context for progress reporting
+        agent_context = None
+        if progress_monitor and _progress_monitoring_available():
+            # Generate agent_id matching the ProgressMonitor's generation logic
+            agent_id = f"{agent_def.role.value.lower()}_{index+1}"
+            agent_context = ProgressAgentContext(
+                agent_id=agent_id,
+                agent_ide=agent_def.coding_ide,
+                agent_role=agent_def.role.value,
+                agent_model=agent_def.model
+            )
+            
+            # Report agent starting
+            await progress_monitor.mark_step_in_progress(
+                PhaseType.AGENT_EXECUTION, 
+                StepType.AGENT_STARTING, 
+                agent_context
+            )
+        
+        # Create role-specific prompt with workflow context
+        prompt = self._create_role_specific_prompt(
+            agent_def.role, context, agent_def, request.workflow_type
+        )
+        
+        # Mark agent starting as completed
+        if progress_monitor and _progress_monitoring_available():
+            await progress_monitor.mark_step_completed(
+                PhaseType.AGENT_EXECUTION, 
+                StepType.AGENT_STARTING, 
+                agent_context
+            )
+        
+        # Report agent working
+        if progress_monitor and _progress_monitoring_available():
+            await progress_monitor.mark_step_in_progress(
+                PhaseType.AGENT_EXECUTION, 
+                StepType.AGENT_WORKING, 
+                agent_context
+            )
+        
+        # Execute agent
+        result = await self._execute_agent(
+            agent_def, prompt, context, work_directory
+        )
+        
+        # Report agent completion or failure
+        if progress_monitor and _progress_monitoring_available():
+            if result["success"]:
+                # Mark agent working as completed
+                await progress_monitor.mark_step_completed(
+                    PhaseType.AGENT_EXECUTION,
+                    StepType.AGENT_WORKING,
+                    agent_context
+                )
+                
+                # Mark agent finishing as in progress then completed
+                await progress_monitor.mark_step_in_progress(
+                    PhaseType.AGENT_EXECUTION,
+                    StepType.AGENT_FINISHING,
+                    agent_context
+                )
+                
+                await progress_monitor.mark_step_completed(
+                    PhaseType.AGENT_EXECUTION,
+                    StepType.AGENT_FINISHING,
+                    agent_context
+                )
+            else:
+                # Report the specific agent failure
+                error_message = result.get("error", "Agent execution failed")
+                full_error = f"{agent_def.coding_ide} ({agent_def.role.value}) failed: {error_message}"
+                await progress_monitor.mark_step_failed(
+                    PhaseType.AGENT_EXECUTION,
+                    StepType.AGENT_WORKING,
+                    full_error,
+                    agent_context
+                )
+        
+        return result
+    
+    @staticmethod
+    def _resolve_agent_ids(agents: List[AgentDefinition]) -> List[str]:
+        """Get the graph id of each agent (explicit agent_id or "<role>_<position>")"""
+        return [
+            agent_def.agent_id or f"{agent_def.role.value.lower()}_{i+1}"
+            for i, agent_def in enumerate(agents)
+        ]
+    
+    @staticmethod
+    def _build_dependency_graph(agents: List[AgentDefinition]) -> Tuple[List[str], Dict[str, List[str]]]:
+        """
+        Validate the declared dependencies between agents.
+        
+        Returns:
+            Tuple of (agent ids in topological order, mapping of agent id to its dependencies)
+            
+        Raises:
+            ValueError: If ids are duplicated, a dependency is unknown, or the graph has a cycle
+        """
+        agent_ids = Orchestrator._resolve_agent_ids(agents)
+        if len(set(agent_ids)) != len(agent_ids):
+            raise ValueError(f"Duplicate agent ids in dependency graph: {agent_ids}")
+        
+        dependencies = {}
+        for agent_id, agent_def in zip(agent_ids, agents):
+            deps = list(dict.fromkeys(agent_def.depends_on or []))
+            unknown = [dep for dep in deps if dep not in agent_ids]
+            if unknown:
+                raise ValueError(f"Agent '{agent_id}' depends on unknown agent(s): {', '.join(unknown)}. Known agents: {', '.join(agent_ids)}")
+            if agent_id in deps:
+                raise ValueError(f"Agent '{agent_id}' cannot depend on itself")
+            dependencies[agent_id] = deps
+        
+        # Kahn's algorithm, keeping the given order among agents that are ready together
+        ordered = []
+        remaining = list(agent_ids)
+        while remaining:
+            ready = [agent_id for agent_id in remaining
+                     if all(dep in ordered for dep in dependencies[agent_id])]
+            if not ready:
+                raise ValueError(f"Circular dependency between agents: {', '.join(remaining)}")
+            ordered.extend(ready)
+            remaining = [agent_id for agent_id in remaining if agent_id not in ready]
+        
+        return ordered, dependencies
+    
+    @staticmethod
+    def _is_local(agent_def: AgentDefinition) -> bool:
+        """Check if an agent edits the work directory locally (GUI, CLI, headless or unknown agents)"""
+        try:
+            return not AgentFactory.get_capabilities(agent_def.coding_ide).is_web
+        except ValueError:
+            return True
+    
+    @staticmethod
+    def _needs_screen_focus(agent_def: AgentDefinition) -> bool:
+        try:
+            return AgentFactory.get_capabilities(agent_def.coding_ide).needs_screen_focus
+        except ValueError:
+            return False
+    
+    @staticmethod
+    def _is_exclusive(agent_def: AgentDefinition, isolated: bool) -> bool:
+        """Check if at most one agent of this kind may run at a time (per its capabilities)"""
+        try:
+            capabilities = AgentFactory.get_capabilities(agent_def.coding_ide)
+        except ValueError:
+            return True
+        if not capabilities.is_web and not isolated:
+            return True
+        return capabilities.needs_screen_focus or not capabilities.parallel_safe
+    
+    @staticmethod
+    def _concurrency_key(agent_def: AgentDefinition, isolated: bool) -> str:
+        """Get the concurrency limit an agent runs under
+        
+        Local agents without their own checkout (isolated=False) all edit the work directory,
+        so they share one limit. Agents that need screen focus share the screen and keyboard,
+        so they share one limit; other agents are limited per IDE.
+        """
+        if Orchestrator._is_local(agent_def) and not isolated:
+            return "work_directory"
+        if Orchestrator._needs_screen_focus(agent_def):
+            return "screen"
+        return agent_def.coding_ide.lower().strip()
+    
+    def _uses_agent_checkouts(self, agents: List[AgentDefinition], agent_ids: List[str],
+                              ancestors: Dict[str, set], pending_ids: set, work_directory: str) -> bool:
+        """
+        Check if local agents should each run in their own checkout (see AgentCheckout):
+        only if two of them may run at the same time and the work directory is a git checkout.
+        """
+        if config.max_parallel_agents < 2:
+            return False
+        local_agents = [(agent_id, agent_def) for agent_id, agent_def in zip(agent_ids, agents)
+                        if agent_id in pending_ids and self._is_local(agent_def)]
+        for i, (first_id, first_def) in enumerate(local_agents):
+            for second_id, second_def in local_agents[i + 1:]:
+                independent = first_id not in ancestors[second_id] and second_id not in ancestors[first_id]
+                # Two agents that need screen focus never overlap anyway
+                share_screen = self._needs_screen_focus(first_def) and self._needs_screen_focus(second_def)
+                if independent and not share_screen:
+                    return AgentCheckout.is_supported(work_directory)
+        return False
+    
+    async def _execute_agent_graph(self, agents: List[AgentDefinition], context: AgentContext,
+                                   request: TaskRequest, work_directory: str,
+                                   progress_monitor: Optional['ProgressMonitor'] = None,
+                                   completed_steps: Optional[Dict[int, Dict[str, Any]]] = None):
+        """
+        Execute agents as a dependency graph.
+        
+        Each agent starts as soon as all of its dependencies have finished, subject to
+        config.max_parallel_agents and the agents' capabilities: agents that are not
+        parallel-safe run one at a time per IDE, and agents that need screen focus run
+        one at a time overall.
+        
+        When local agents (GUI, CLI, headless) may run at the same time, each of them works
+        in its own checkout of the work directory, which starts from the changes of the
+        agents that finished before it and is merged back into the work directory when it
+        finishes; an agent whose changes conflict with those merged meanwhile fails. If the
+        work directory is not a git checkout, local agents run one at a time in it instead.
+        
+        Every agent sees the outputs of its (transitive) dependencies in previous_outputs.
+        Agents in completed_steps (restored from a checkpoint) are not run again.
+        """
+        ordered_ids, dependencies = self._build_dependency_graph(agents)
+        agent_ids = self._resolve_agent_ids(agents)
+        index_by_id = {agent_id: i for i, agent_id in enumerate(agent_ids)}
+        
+        # Transitive dependencies of each agent (ordered_ids guarantees deps are resolved first)
+        ancestors: Dict[str, set] = {}
+        for agent_id in ordered_ids:
+            ancestors[agent_id] = set(dependencies[agent_id])
+            for dep in dependencies[agent_id]:
+                ancestors[agent_id] |= ancestors[dep]
+        
+        pending_ids = {agent_ids[i] for i in range(len(agents)) if i not in (completed_steps or {})}
+        isolated = self._uses_agent_checkouts(agents, agent_ids, ancestors, pending_ids, work_directory)
+        if isolated:
+            print("Local agents that may run at the same time each get their own checkout")
+        # Checkouts are created from and merged into the work directory one at a time
+        checkout_lock = asyncio.Lock()
+        
+        global_limit = asyncio.Semaphore(config.max_parallel_agents)
+        ide_limits: Dict[str, asyncio.Semaphore] = {}
+        for agent_def in agents:
+            limit_key = self._concurrency_key(agent_def, isolated)
+            if limit_key not in ide_limits:
+                ide_limits[limit_key] = asyncio.Semaphore(
+                    1 if self._is_exclusive(agent_def, isolated) else config.max_parallel_agents
+                )
+        
+        print(f"Executing {len(agents)} agents as a dependency graph (max {config.max_parallel_agents} in parallel)")
+        
+        outputs: Dict[str, Dict[str, Any]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+        
+        for index, step in (completed_steps or {}).items():
+            outputs[agent_ids[index]] = step["output"]
+            await self._report_agent_skipped(index, agents[index], progress_monitor)
+        
+        async def run_node(agent_id: str):
+            pending_dependencies = [tasks[dep] for dep in dependencies[agent_id] if dep in tasks]
+            if pending_dependencies:
+                await asyncio.gather(*pending_dependencies)
+            
+            index = index_by_id[agent_id]
+            agent_def = agents[index]
+            async with ide_limits[self._concurrency_key(agent_def, isolated)]:
+                async with global_limit:
+                    checkout = None
+                    if isolated and self._is_local(agent_def):
+                        async with checkout_lock:
+                            checkout = await asyncio.to_thread(AgentCheckout.create, work_directory, agent_id)
+                    
+                    if isolated and self._is_local(agent_def) and not checkout:
+                        result = self._agent_error_result(
+                            agent_def, f"Could not create a checkout of {work_directory} for {agent_id}")
+                    else:
+                        agent_directory = checkout.path if checkout else work_directory
+                        # Each agent gets its own view of the context so concurrent agents
+                        # don't see each other's step number, work directory or partial outputs
+                        step_context = replace(
+                            context,
+                            current_step=index + 1,
+                            work_directory=agent_directory,
+                            previous_outputs=[outputs[a] for a in agent_ids if a in ancestors[agent_id]]
+                        )
+                        try:
+                            result = await self._run_agent_step(
+                                index, agent_def, step_context, request, agent_directory, progress_monitor
+                            )
+                            if checkout:
+                                async with checkout_lock:
+                                    merged, error = await asyncio.to_thread(checkout.merge_back)
+                                if not merged:
+                                    print(f"WARNING: {error}")
+                                    result = dict(result, success=False, error=error)
+                        finally:
+                            if checkout:
+                                await asyncio.to_thread(checkout.remove)
+            
+            outputs[agent_id] = self._record_agent_result(agent_def, result, context, index, agent_id)
+        
+        for agent_id in ordered_ids:
+            if agent_id not in outputs:
+                tasks[agent_id] = asyncio.create_task(run_node(agent_id))
+        try:
+            await asyncio.gather(*tasks.values())
+        except Exception:
+            for task in tasks.values():
+                task.cancel()
+            raise
     
     def save_agent_response(self, repo_url: Optional[str], agent_name: str, response: str) -> Optional[str]:
         """Save the agent response to a file"""
@@ -456,18 +906,137 @@ class Orchestrator:
             print(f"WARNING: Failed to save agent response: {str(e)}")
             return None
 
-    async def execute_task(self, request: TaskRequest, progress_monitor: Optional['ProgressMonitor'] = None) -> MultiAgentResponse:
-        """Execute a task with one or more agents"""
+    async def execute_task(self, request: TaskRequest, progress_monitor: Optional['ProgressMonitor'] = None,
+                           resume: bool = False) -> MultiAgentResponse:
+        """
+        Execute a task with one or more agents
+        
+        Every finished agent step is checkpointed under request.run_id. With resume=True,
+        the checkpoint of request.run_id is loaded: agents that already finished successfully
+        are skipped, their outputs are restored into the context and execution continues
+        in the original work directory.
+        
+        Unless request.use_cache is False, a successful run (including its PR, if one was
+        requested) is cached under its commit, task, agents and workflow: an identical request
+        returns the cached response, and one that arrives while the first is still running
+        waits for and shares its response, or runs itself if the first one fails.
+        
+        Phases are traced and LLM calls are metered; save_execution_report() exports the
+        trace next to the report and adds the LLM usage to it.
+        """
+        # Named before the telemetry collector, so its usage is saved and queryable under the run id
+        if not request.run_id:
+            request.run_id = RunCheckpoint.new_run_id()
+        
+        self.tracer = Tracer(f"simulatedev {request.workflow_type or 'task'}")
+        self.llm_telemetry = LLMTelemetry(request.run_id)
+        token = set_tracer(self.tracer)
+        telemetry_token = set_telemetry(self.llm_telemetry)
+        try:
+            with span("execute_task", category="orchestrator", workflow=request.workflow_type,
+                      agents=len(request.agents), resume=resume) as task_span:
+                response = await self._execute_with_cache(request, progress_monitor, resume)
+                task_span["success"] = response.success
+                task_span["cache_hit"] = response.cache_hit
+                return response
+        finally:
+            reset_telemetry(telemetry_token)
+            reset_tracer(token)
+            self.llm_telemetry.save(request.run_id)
+    
+    async def _execute_with_cache(self, request: TaskRequest, progress_monitor: Optional['ProgressMonitor'],
+                                  resume: bool) -> MultiAgentResponse:
+        """Serve a request from the result cache or a running identical request, else run it"""
+        cache_key = None
+        if not resume and request.use_cache and config.result_cache_enabled:
+            with span("result_cache.lookup", category="orchestrator"):
+                cache_key = self._result_cache_key(request)
+        
+        while cache_key:
+            cached_entry = result_cache.get(cache_key)
+            if cached_entry:
+                response = MultiAgentResponse(**cached_entry["response"])
+                response.cache_hit = True
+                print(f"INFO: Identical task already completed in run '{cached_entry.get('run_id')}', returning cached result")
+                if cached_entry.get("artifacts", {}).get("patch"):
+                    print(f"INFO: Changes from that run: {cached_entry['artifacts']['patch']}")
+                return response
+            
+            is_leader, flight = result_cache.join_or_lead(cache_key)
+            if is_leader:
+                break
+            
+            print("INFO: Identical task is already running, waiting for its result...")
+            shared_response = await asyncio.wrap_future(flight)
+            if shared_response is not None:
+                return replace(shared_response, cache_hit=True)
+            # The identical task failed (or did not finish): run this request itself
+            print("INFO: Identical task did not succeed, running this request")
+        
+        response = None
+        try:
+            response = await self._execute_task(request, progress_monitor, resume, cache_key)
+            return response
+        finally:
+            if cache_key:
+                # Only share results that would also be cached; followers of a failed run retry
+                result_cache.complete(
+                    cache_key, response if response and self._is_cacheable(request, response) else None
+                )
+    
+    @staticmethod
+    def _is_cacheable(request: TaskRequest, response: MultiAgentResponse) -> bool:
+        """Whether a response may be reused for an identical request (it succeeded, PR included)"""
+        return response.success and (not request.create_pr or bool(response.pr_url))
+    
+    def _result_cache_key(self, request: TaskRequest) -> Optional[str]:
+        """Compute the result cache key for a request, or None if it can't be cached"""
+        head_commit = ResultCache.resolve_head_commit(
+            repo_url=request.repo_url, work_directory=request.work_directory
+        )
+        if not head_commit:
+            return None
+        
+        return ResultCache.compute_key(
+            head_commit, request.task_description, request.agents,
+            request.workflow_type, request.create_pr
+        )
+    
+    async def _execute_task(self, request: TaskRequest, progress_monitor: Optional['ProgressMonitor'],
+                            resume: bool, cache_key: Optional[str]) -> MultiAgentResponse:
+        """Run (or resume) the agents of a task; see execute_task"""
         # Record start time for timing measurement
         start_time = time.time()
         
+        # Keep a leased workspace after a run that made progress but did not complete, for resume
+        keep_workspace = False
+        self.checkpoint = None
+        
         try:
-            # Handle web agent repository setup (forking if necessary)
-            if not self._handle_web_agent_repo_setup(request):
-                raise Exception("Failed to setup repository for web agents")
+            if resume:
+                self.checkpoint = RunCheckpoint.load(request.run_id)
+                if not self.checkpoint:
+                    raise Exception(f"Cannot resume run '{request.run_id}': no checkpoint found")
+                if self.checkpoint.status == RunCheckpoint.STATUS_COMPLETED and self.checkpoint.response:
+                    print(f"INFO: Run '{request.run_id}' already completed, returning its recorded result")
+                    return MultiAgentResponse(**self.checkpoint.response)
+                self._restore_checkpoint_workspace(request, self.checkpoint)
+            else:
+                self.checkpoint = RunCheckpoint(request.run_id)
+                
+                # Handle web agent repository setup (forking if necessary)
+                if not self._handle_web_agent_repo_setup(request):
+                    raise Exception("Failed to setup repository for web agents")
+            
+            print(f"Run ID: {request.run_id}")
             
             # Setup work directory
-            work_directory = self._setup_work_directory(request)
+            with span("setup_work_directory", category="git", repo=request.repo_url):
+                work_directory = self._setup_work_directory(request)
+            self.checkpoint.start(
+                request.to_dict(), work_directory,
+                self._leased_workspaces[-1] if self._leased_workspaces else None
+            )
             
             # Sort agents by role to ensure proper execution order
             # For sequential workflows, preserve the intended order (Coder -> Tester -> Coder)
@@ -501,111 +1070,46 @@ class Orchestrator:
             )
             
             self.execution_log = []
-            successful_executions = 0
             
-            # Execute agents sequentially
-            for i, agent_def in enumerate(sorted_agents):
-                context.current_step = i + 1
-                
-                print(f"\n{'='*60}")
-                print(f"Step {context.current_step}/{context.total_steps}: {agent_def.coding_ide} ({agent_def.role.value})")
-                print(f"{'='*60}")
-                
-                # Create agent context for progress reporting
-                agent_context = None
-                if progress_monitor and PROGRESS_MONITORING_AVAILABLE:
-                    # Generate agent_id matching the ProgressMonitor's generation logic
-                    agent_id = f"{agent_def.role.value.lower()}_{i+1}"
-                    agent_context = ProgressAgentContext(
-                        agent_id=agent_id,
-                        agent_ide=agent_def.coding_ide,
-                        agent_role=agent_def.role.value,
-                        agent_model=agent_def.model
-                    )
-                    
-                    # Report agent starting
-                    await progress_monitor.mark_step_in_progress(
-                        PhaseType.AGENT_EXECUTION, 
-                        StepType.AGENT_STARTING, 
-                        agent_context
-                    )
-                
-                # Create role-specific prompt with workflow context
-                prompt = self._create_role_specific_prompt(
-                    agent_def.role, context, agent_def, request.workflow_type
+            # Restore agents that finished before an interruption
+            agent_ids = self._resolve_agent_ids(sorted_agents)
+            completed_steps = self.checkpoint.completed_steps(agent_ids) if resume else {}
+            if completed_steps:
+                print(f"INFO: Resuming run '{request.run_id}': {len(completed_steps)}/{len(sorted_agents)} agents already finished")
+            for index in sorted(completed_steps):
+                self.execution_log.append(completed_steps[index]["result"])
+                context.previous_outputs.append(completed_steps[index]["output"])
+            
+            if any(agent_def.depends_on is not None for agent_def in sorted_agents):
+                # Agents declared dependencies: run independent agents concurrently
+                await self._execute_agent_graph(
+                    sorted_agents, context, request, work_directory, progress_monitor,
+                    completed_steps
                 )
-                
-                # Mark agent starting as completed
-                if progress_monitor and PROGRESS_MONITORING_AVAILABLE:
-                    await progress_monitor.mark_step_completed(
-                        PhaseType.AGENT_EXECUTION, 
-                        StepType.AGENT_STARTING, 
-                        agent_context
-                    )
-                
-                # Report agent working
-                if progress_monitor and PROGRESS_MONITORING_AVAILABLE:
-                    await progress_monitor.mark_step_in_progress(
-                        PhaseType.AGENT_EXECUTION, 
-                        StepType.AGENT_WORKING, 
-                        agent_context
+            else:
+                # Execute agents sequentially
+                for i, agent_def in enumerate(sorted_agents):
+                    if i in completed_steps:
+                        await self._report_agent_skipped(i, agent_def, progress_monitor)
+                        continue
+                    
+                    context.current_step = i + 1
+                    result = await self._run_agent_step(
+                        i, agent_def, context, request, work_directory, progress_monitor
                     )
-                
-                # Execute agent
-                result = await self._execute_agent(
-                    agent_def, prompt, context, work_directory
-                )
-                
-                # Report agent completion or failure
-                if progress_monitor and PROGRESS_MONITORING_AVAILABLE:
-                    if result["success"]:
-                        # Mark agent working as completed
-                        await progress_monitor.mark_step_completed(
-                            PhaseType.AGENT_EXECUTION,
-                            StepType.AGENT_WORKING,
-                            agent_context
-                        )
-                        
-                        # Mark agent finishing as in progress then completed
-                        await progress_monitor.mark_step_in_progress(
-                            PhaseType.AGENT_EXECUTION,
-                            StepType.AGENT_FINISHING,
-                            agent_context
-                        )
-                        
-                        await progress_monitor.mark_step_completed(
-                            PhaseType.AGENT_EXECUTION,
-                            StepType.AGENT_FINISHING,
-                            agent_context
-                        )
-                    else:
-                        # Report the specific agent failure
-                        error_message = result.get("error", "Agent execution failed")
-                        full_error = f"{agent_def.coding_ide} ({agent_def.role.value}) failed: {error_message}"
-                        await progress_monitor.mark_step_failed(
-                            PhaseType.AGENT_EXECUTION,
-                            StepType.AGENT_WORKING,
-                            full_error,
-                            agent_context
-                        )
-                
-                # Log execution
-                self.execution_log.append(result)
-                
-                # Update context
-                context.add_agent_output(
-                    agent_def.coding_ide, agent_def.role, 
-                    result["output"], result["success"]
-                )
-                
-                if result["success"]:
-                    successful_executions += 1
-                else:
-                    print(f"WARNING: Agent {agent_def.coding_ide} failed, continuing with remaining agents...")
+                    self._record_agent_result(agent_def, result, context, i, agent_ids[i])
+            
+            successful_executions = sum(1 for result in self.execution_log if result["success"])
             
             # Determine overall success
             overall_success = successful_executions > 0
             
+            # Snapshot the agents' changes for the result cache before the PR workflow commits them
+            result_patch = None
+            if cache_key and overall_success:
+                with span("result_cache.capture_patch", category="git"):
+                    result_patch = result_cache.capture_patch(work_directory)
+            
             # Get final output (prefer Tester output, then Coder, then Planner)
             final_output = ""
             tester_output = context.get_latest_output_by_role(AgentRole.TESTER)
@@ -672,8 +1176,9 @@ class Orchestrator:
                     
                     if pr_url:
                         print(f"SUCCESS: Pull request created: {pr_url}")
-                        print("Opening pull request in your default browser...")
-                        webbrowser.open(pr_url)
+                        if config.open_pr_in_browser:
+                            print("Opening pull request in your default browser...")
+                            webbrowser.open(pr_url)
                     else:
                         print("WARNING: Pull request creation failed")
                 except Exception as e:
@@ -704,11 +1209,12 @@ class Orchestrator:
                     # Validate the PR URL format
                     if pr_url.startswith('https://github.com/') and '/pull/' in pr_url:
                         print(f"\nSUCCESS: Web agent created PR: {pr_url}")
-                        print("Opening pull request in your default browser...")
-                        try:
-                            webbrowser.open(pr_url)
-                        except Exception as e:
-                            print(f"WARNING: Could not open browser: {e}")
+                        if config.open_pr_in_browser:
+                            print("Opening pull request in your default browser...")
+                            try:
+                                webbrowser.open(pr_url)
+                            except Exception as e:
+                                print(f"WARNING: Could not open browser: {e}")
                     else:
                         print(f"\nWARNING: Invalid PR URL format detected: {pr_url}")
                         pr_url = None
@@ -738,9 +1244,22 @@ class Orchestrator:
                 execution_log=self.execution_log,
                 test_results=test_results,
                 pr_url=pr_url,
-                execution_time_seconds=execution_time_seconds
+                execution_time_seconds=execution_time_seconds,
+                run_id=request.run_id
             )
             
+            # A run whose requested PR wasn't created is not complete: resuming it retries the PR
+            pr_missing = bool(request.create_pr and request.repo_url and not has_web_agents and not pr_url)
+            run_completed = overall_success and not pr_missing
+            self.checkpoint.finish(run_completed, asdict(response))
+            if cache_key and self._is_cacheable(request, response):
+                result_cache.put(cache_key, asdict(response), run_id=request.run_id, patch=result_patch)
+            if not overall_success:
+                print(f"INFO: Retry the failed agents with: python simulatedev.py --resume {request.run_id}")
+            elif pr_missing:
+                keep_workspace = True
+                print(f"INFO: Retry the pull request with: python simulatedev.py --resume {request.run_id}")
+            
             return response
             
         except Exception as e:
@@ -757,7 +1276,20 @@ class Orchestrator:
             )
             response.execution_time_seconds = execution_time_seconds
             
+            if self.checkpoint and self.checkpoint.request:
+                # The run got far enough to be resumable; its workspace is only worth keeping
+                # if an agent already finished
+                keep_workspace = self.checkpoint.has_completed_steps()
+                self.checkpoint.finish(False, asdict(response))
+                print(f"INFO: Resume this run with: python simulatedev.py --resume {request.run_id}")
+            
             return response
+        
+        finally:
+            if keep_workspace and self._leased_workspaces:
+                repo_url, repo_path = self._leased_workspaces.pop()
+                workspace_pool.keep(repo_url, repo_path, request.run_id)
+            self._release_workspaces()
     
     def save_execution_report(self, response: MultiAgentResponse, 
                             output_file: str = "execution_report.json") -> str:
@@ -779,6 +1311,12 @@ class Orchestrator:
         if hasattr(response, 'execution_time_seconds') and response.execution_time_seconds is not None:
             report["execution_time_seconds"] = response.execution_time_seconds
         
+        # Add run id and whether the result came from the result cache
+        if response.run_id:
+            report["run_id"] = response.run_id
+        if response.cache_hit:
+            report["cache_hit"] = True
+        
         # If output_file is a relative path (no directory separator), 
         # save it in the execution output directory
         if not os.path.dirname(output_file):
@@ -789,6 +1327,17 @@ class Orchestrator:
         if output_dir and not os.path.exists(output_dir):
             os.makedirs(output_dir, exist_ok=True)
         
+        # Export the run's phase spans as a Chrome trace next to the report
+        if self.tracer:
+            trace_file = self.tracer.export_chrome_trace(f"{os.path.splitext(output_file)[0]}_trace.json")
+            if trace_file:
+                report["trace_file"] = trace_file
+                report["phase_seconds"] = self.tracer.summary()
+        
+        # Tokens, latency and cost of the run's LLM calls, per caller and model
+        if self.llm_telemetry:
+            report["llm_usage"] = self.llm_telemetry.summary()
+        
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(report, f, indent=2, ensure_ascii=False)
         
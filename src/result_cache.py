@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Result Cache for SimulateDev
+
+Content-addressed cache of successful runs. A run is keyed by the repository
+commit it started from, the task description, the agent list, the workflow type
+and whether a PR was requested. Re-submitting the same task against an unchanged
+commit returns the recorded MultiAgentResponse (and the patch the agents produced)
+instead of running the agents again.
+
+Identical requests that arrive while the first one is still running attach to it
+(single-flight) and receive its response. Single-flight is per process; the on-disk
+cache is shared by every process using the same execution_output directory.
+"""
+
+import os
+import json
+import hashlib
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional, Dict, Any, Tuple
+
+from common.config import config
+
+
+class ResultCache:
+    """On-disk result cache plus in-process single-flight for identical runs"""
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or config.result_cache_path
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @staticmethod
+    def resolve_head_commit(repo_url: Optional[str] = None, work_directory: Optional[str] = None) -> Optional[str]:
+        """
+        Get the commit a run would start from.
+
+        Uses the local HEAD for an existing work directory (None if it has uncommitted
+        changes, since those are not part of the key) and `git ls-remote` otherwise.
+        """
+        try:
+            if work_directory:
+                status = subprocess.run(["git", "status", "--porcelain"], cwd=work_directory,
+                                        capture_output=True, text=True, timeout=30)
+                if status.returncode != 0 or status.stdout.strip():
+                    return None
+                head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=work_directory,
+                                      capture_output=True, text=True, timeout=30)
+                return head.stdout.strip() if head.returncode == 0 else None
+
+            if repo_url:
+                result = subprocess.run(["git", "ls-remote", repo_url, "HEAD"],
+                                        capture_output=True, text=True, timeout=60)
+                if result.returncode == 0 and result.stdout.strip():
+                    return result.stdout.split()[0]
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"WARNING: Could not resolve repository commit for result cache: {str(e)}")
+
+        return None
+
+    @staticmethod
+    def compute_key(head_commit: str, task_description: str, agents: list,
+                    workflow_type: Optional[str], create_pr: bool) -> str:
+        """Build the content-addressed cache key for a run"""
+        payload = {
+            "head_commit": head_commit,
+            "task_sha256": hashlib.sha256(task_description.encode("utf-8")).hexdigest(),
+            "agents": [agent.to_dict() for agent in agents],
+            "workflow_type": workflow_type,
+            "create_pr": create_pr
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _patch_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.patch")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached entry (response, run_id, artifacts) or None"""
+        path = self._entry_path(key)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable result cache entry {path}: {str(e)}")
+            return None
+
+    def put(self, key: str, response: Dict[str, Any], run_id: Optional[str] = None,
+            patch: Optional[str] = None, artifacts: Optional[Dict[str, str]] = None):
+        """Store a successful run's response and artifacts under its key"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            artifacts = dict(artifacts or {})
+            if patch:
+                with open(self._patch_path(key), 'w', encoding='utf-8') as f:
+                    f.write(patch)
+                artifacts["patch"] = self._patch_path(key)
+
+            entry = {
+                "key": key,
+                "run_id": run_id,
+                "created_at": time.time(),
+                "response": response,
+                "artifacts": artifacts
+            }
+            temp_path = f"{self._entry_path(key)}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, indent=2, ensure_ascii=False, default=str)
+            os.replace(temp_path, self._entry_path(key))
+        except Exception as e:
+            print(f"WARNING: Failed to store result cache entry: {str(e)}")
+
+    def join_or_lead(self, key: str) -> Tuple[bool, Future]:
+        """
+        Register interest in running the given key.
+
+        Returns:
+            Tuple of (is_leader, future). The leader must call complete() when done;
+            followers wait on the future for the leader's response.
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return False, future
+            future = Future()
+            self._inflight[key] = future
+            return True, future
+
+    def complete(self, key: str, response: Any):
+        """Publish the leader's response to any attached followers"""
+        with self._inflight_lock:
+            future = self._inflight.pop(key, None)
+        if future is not None and not future.done():
+            future.set_result(response)
+
+    @staticmethod
+    def capture_patch(repo_path: str) -> Optional[str]:
+        """
+        Capture the agents' changes (tracked and untracked) as a binary git patch
+        against HEAD, without touching the repository's own index.
+        """
+        temp_dir = tempfile.mkdtemp(prefix="simulatedev_index_")
+        try:
+            index_path = subprocess.run(["git", "rev-parse", "--git-path", "index"], cwd=repo_path,
+                                        capture_output=True, text=True, check=True).stdout.strip()
+            index_path = os.path.join(repo_path, index_path)
+            temp_index = os.path.join(temp_dir, "index")
+            if os.path.exists(index_path):
+                shutil.copyfile(index_path, temp_index)
+
+            env = dict(os.environ, GIT_INDEX_FILE=temp_index)
+            subprocess.run(["git", "add", "-A"], cwd=repo_path, env=env,
+                           capture_output=True, check=True)
+            diff = subprocess.run(["git", "diff", "--cached", "--binary", "HEAD"], cwd=repo_path, env=env,
+                                  capture_output=True, text=True, check=True)
+            return diff.stdout or None
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"WARNING: Could not capture workspace patch: {str(e)}")
+            return None
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# Global result cache instance
+result_cache = ResultCache()
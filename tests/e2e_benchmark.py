@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark for SimulateDev
+
+Drives Orchestrator.execute_task end to end with the TestAgent, fully offline, to
+measure SimulateDev's own overhead (cloning, workspace setup, agent plumbing,
+commit/push and the GitHub REST calls) without real IDEs or real GitHub:
+
+1. A local bare repository stands in for the GitHub remote. Git is pointed at it
+   through a url.<path>.insteadOf rewrite for https://github.com/<BENCH_REPO>.
+2. A local HTTP server stands in for the GitHub REST API (GITHUB_API_URL). It
+   answers the user, repository and pull request calls GitHubIntegration makes.
+3. The LLM-written commit/PR text is replaced by GitHubIntegration's default
+   content, so no model is called.
+
+Reports, per scenario, the median total time and the median time per traced phase
+(see common/tracing.py), plus throughput for N tasks run concurrently the way
+TaskService runs them (one thread and event loop per task). Results are written
+as JSON tagged with the current commit; pass --compare to diff against a previous
+result file.
+
+Usage:
+    python tests/e2e_benchmark.py
+    python tests/e2e_benchmark.py --iterations 5 --concurrency 1 4 8
+    python tests/e2e_benchmark.py --compare execution_output/benchmarks/<previous>.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+sys.path.insert(0, str(project_root))
+
+BENCH_REPO = "simulatedev-bench/bench-repo"
+BENCH_REPO_URL = f"https://github.com/{BENCH_REPO}"
+
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the GitHub REST endpoints used by GitHubIntegration"""
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    def _send_json(self, status: int, payload: Any):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _count(self):
+        with self.server.lock:
+            key = f"{self.command} {self.path.split('?')[0]}"
+            self.server.request_counts[key] = self.server.request_counts.get(key, 0) + 1
+
+    def do_GET(self):
+        self._count()
+        path = self.path.split("?")[0].rstrip("/")
+        if path == "/user":
+            self._send_json(200, {"login": "bench-bot", "name": "Bench Bot", "email": "bench@example.com"})
+        elif path == "/user/emails":
+            self._send_json(200, [{"email": "bench@example.com", "primary": True, "verified": True}])
+        elif path == f"/repos/{BENCH_REPO}":
+            self._send_json(200, {
+                "full_name": BENCH_REPO,
+                "default_branch": "main",
+                "private": False,
+                "permissions": {"admin": False, "push": True, "pull": True}
+            })
+        else:
+            self._send_json(404, {"message": "Not Found"})
+
+    def do_POST(self):
+        self._count()
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        path = self.path.split("?")[0].rstrip("/")
+        if path == f"/repos/{BENCH_REPO}/pulls":
+            with self.server.lock:
+                self.server.pr_count += 1
+                number = self.server.pr_count
+            self._send_json(201, {
+                "number": number,
+                "html_url": f"{BENCH_REPO_URL}/pull/{number}",
+                "head": {"ref": payload.get("head")},
+                "base": {"ref": payload.get("base")}
+            })
+        else:
+            self._send_json(404, {"message": "Not Found"})
+
+
+def start_fake_github() -> ThreadingHTTPServer:
+    """Start the fake GitHub API on a free local port"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGitHubHandler)
+    server.lock = threading.Lock()
+    server.request_counts = {}
+    server.pr_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_git(args: List[str], cwd: Optional[str] = None):
+    subprocess.run(["git"] + args, cwd=cwd, check=True, capture_output=True)
+
+
+def create_bare_remote(root: str, files: int) -> str:
+    """Create a small repository and return the path of its bare clone (the fake remote)"""
+    source = os.path.join(root, "source")
+    os.makedirs(os.path.join(source, "src"))
+    with open(os.path.join(source, "README.md"), "w") as f:
+        f.write("# Bench Repo\n\nRepository used by the SimulateDev end-to-end benchmark.\n")
+    for i in range(files):
+        with open(os.path.join(source, "src", f"module_{i}.py"), "w") as f:
+            f.write(f'"""Module {i}"""\n\n\ndef value_{i}():\n    return {i}\n')
+
+    run_git(["init", "-q", "-b", "main"], cwd=source)
+    run_git(["add", "-A"], cwd=source)
+    run_git(["-c", "user.name=Bench", "-c", "user.email=bench@example.com",
+             "commit", "-q", "-m", "Initial commit"], cwd=source)
+
+    remote = os.path.join(root, "remote.git")
+    run_git(["clone", "-q", "--bare", source, remote])
+    return remote
+
+
+def configure_environment(root: str, remote: str, api_url: str):
+    """Point SimulateDev at the fake remote and API; must run before SimulateDev is imported"""
+    os.environ.update({
+        "EXECUTION_OUTPUT_PATH": os.path.join(root, "execution_output"),
+        "GITHUB_API_URL": api_url,
+        "GITHUB_TOKEN": "bench-token",
+        "GIT_USER_NAME": "Bench Bot",
+        "GIT_USER_EMAIL": "bench@example.com",
+        "OPEN_PR_IN_BROWSER": "false",
+        "RESULT_CACHE_ENABLED": "false",
+        "GIT_TERMINAL_PROMPT": "0",
+        # Rewrite the GitHub URL to the local bare repository for clone, fetch and push
+        "GIT_CONFIG_COUNT": "1",
+        "GIT_CONFIG_KEY_0": f"url.{remote}.insteadOf",
+        "GIT_CONFIG_VALUE_0": BENCH_REPO_URL,
+    })
+
+
+def run_one_task(task_number: int) -> Dict[str, Any]:
+    """Run one task in its own event loop (as TaskService does) and return its timings"""
+    from src.orchestrator import Orchestrator, TaskRequest
+    from agents import AgentDefinition, AgentRole
+
+    request = TaskRequest(
+        task_description=f"Benchmark task {task_number}: review the repository for inconsistencies",
+        agents=[AgentDefinition(coding_ide="test", model="test", role=AgentRole.CODER)],
+        workflow_type="custom_coding",
+        repo_url=BENCH_REPO_URL,
+        create_pr=True,
+        use_cache=False
+    )
+
+    orchestrator = Orchestrator()
+    start = time.perf_counter()
+    response = asyncio.run(orchestrator.execute_task(request))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "success": response.success,
+        "pr_url": response.pr_url,
+        "total_seconds": elapsed,
+        "phases": orchestrator.tracer.summary() if orchestrator.tracer else {}
+    }
+
+
+def run_scenario(concurrency: int, iterations: int) -> Dict[str, Any]:
+    """Run `iterations` rounds of `concurrency` simultaneous tasks"""
+    rounds = []
+    tasks = []
+    for iteration in range(iterations):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(run_one_task, range(iteration * concurrency, (iteration + 1) * concurrency)))
+        rounds.append(time.perf_counter() - start)
+        tasks.extend(results)
+
+    phase_names = sorted({name for task in tasks for name in task["phases"]})
+    median_round = statistics.median(rounds)
+    return {
+        "concurrency": concurrency,
+        "iterations": iterations,
+        "succeeded": sum(1 for task in tasks if task["success"]),
+        "prs_created": sum(1 for task in tasks if task["pr_url"]),
+        "tasks": len(tasks),
+        "median_task_seconds": statistics.median(task["total_seconds"] for task in tasks),
+        "median_round_seconds": median_round,
+        "throughput_tasks_per_minute": concurrency * 60 / median_round if median_round else None,
+        "median_phase_seconds": {
+            name: statistics.median(task["phases"].get(name, 0.0) for task in tasks)
+            for name in phase_names
+        }
+    }
+
+
+def print_scenario(scenario: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    def delta(key: str, value: float, base: Optional[Dict[str, Any]]) -> str:
+        if not base or base.get(key) in (None, 0):
+            return ""
+        return f"  ({(value - base[key]) / base[key] * 100:+.0f}%)"
+
+    print(f"\nConcurrency {scenario['concurrency']}: {scenario['succeeded']}/{scenario['tasks']} succeeded, "
+          f"{scenario['prs_created']} PRs")
+    print(f"  Median task time:  {scenario['median_task_seconds']:.2f}s"
+          f"{delta('median_task_seconds', scenario['median_task_seconds'], baseline)}")
+    print(f"  Throughput:        {scenario['throughput_tasks_per_minute']:.1f} tasks/min"
+          f"{delta('throughput_tasks_per_minute', scenario['throughput_tasks_per_minute'], baseline)}")
+    print("  Median time per phase:")
+    base_phases = (baseline or {}).get("median_phase_seconds")
+    for name, seconds in sorted(scenario["median_phase_seconds"].items(), key=lambda item: -item[1]):
+        print(f"    {name:<40} {seconds:8.3f}s{delta(name, seconds, base_phases)}")
+
+
+def current_commit() -> Optional[str]:
+    result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=str(project_root),
+                            capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end benchmark of SimulateDev orchestration overhead")
+    parser.add_argument("--iterations", type=int, default=3, help="Rounds per concurrency level (default: 3)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4],
+                        help="Numbers of simultaneous tasks to measure (default: 1 4)")
+    parser.add_argument("--files", type=int, default=50, help="Python files in the benchmark repository (default: 50)")
+    parser.add_argument("--output", help="Result JSON path (default: execution_output/benchmarks/<timestamp>_<commit>.json)")
+    parser.add_argument("--compare", help="Previous result JSON to compare against")
+    parser.add_argument("--keep-temp", action="store_true", help="Keep the temporary repositories and output")
+    args = parser.parse_args()
+
+    print("SimulateDev End-to-End Benchmark")
+    print("=" * 40)
+
+    root = tempfile.mkdtemp(prefix="simulatedev_bench_")
+    server = start_fake_github()
+    try:
+        remote = create_bare_remote(root, args.files)
+        configure_environment(root, remote, f"http://127.0.0.1:{server.server_address[1]}")
+
+        # The LLM is out of scope for this benchmark; use the built-in default PR text
+        from src.github_integration import GitHubIntegration
+        GitHubIntegration.generate_commit_and_pr_content_with_claude = (
+            lambda self, summary, workflow_name, *rest, **kwargs:
+            self._generate_default_commit_and_pr_content(workflow_name)
+        )
+
+        scenarios = []
+        for concurrency in args.concurrency:
+            print(f"\nRunning {args.iterations} round(s) of {concurrency} concurrent task(s)...")
+            scenarios.append(run_scenario(concurrency, args.iterations))
+
+        commit = current_commit()
+        result = {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {"iterations": args.iterations, "files": args.files},
+            "github_requests": dict(sorted(server.request_counts.items())),
+            "scenarios": scenarios
+        }
+    finally:
+        server.shutdown()
+        if not args.keep_temp:
+            shutil.rmtree(root, ignore_errors=True)
+
+    baseline_scenarios = {}
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        baseline_scenarios = {s["concurrency"]: s for s in baseline.get("scenarios", [])}
+        print(f"\nComparing against {args.compare} (commit {baseline.get('commit')})")
+
+    print("\n" + "=" * 40)
+    print(f"RESULTS (commit {commit})")
+    print("=" * 40)
+    for scenario in scenarios:
+        print_scenario(scenario, baseline_scenarios.get(scenario["concurrency"]))
+
+    output = args.output or os.path.join(
+        str(project_root), "execution_output", "benchmarks",
+        f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{commit or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, indent=2)
+    print(f"\nResults saved to: {output}")
+
+    all_succeeded = all(s["succeeded"] == s["tasks"] for s in scenarios)
+    sys.exit(0 if all_succeeded else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Startup Benchmark for SimulateDev
+
+Measures the cold-start cost of the CLI entry point (importing simulatedev.py and
+loading one agent backend) in fresh interpreter processes, and guards against
+regressions:
+
+1. Heavy GUI/browser/LLM/API stacks (pyautogui, mss, PIL, litellm, playwright,
+   sqlalchemy, fastapi) must not be imported when running a CLI agent
+2. The median import time must stay below --max-seconds
+
+Usage:
+    python tests/startup_benchmark.py
+    python tests/startup_benchmark.py --agent claude_cli --runs 10 --max-seconds 1.0
+
+Exits with status 1 if either check fails.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+
+# Modules that only GUI agents, web agents, LLM calls or the API server need
+HEAVY_MODULES = ["pyautogui", "pyperclip", "mss", "PIL", "litellm", "playwright", "sqlalchemy", "fastapi"]
+
+# Runs in a fresh interpreter so nothing is already cached in sys.modules
+PROBE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+import simulatedev
+from agents import AgentFactory
+AgentFactory.load_agent_class({agent!r})
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split('.')[0] for name in sys.modules}} & set({heavy!r}))
+print(json.dumps({{"seconds": elapsed, "heavy_modules": heavy}}))
+"""
+
+
+def run_probe(agent: str) -> dict:
+    """Import the CLI in a fresh interpreter and return its timing and loaded heavy modules"""
+    script = PROBE_SCRIPT.format(agent=agent, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", script], cwd=str(project_root),
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup probe failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SimulateDev CLI startup time")
+    parser.add_argument("--agent", default="claude_cli", help="Agent backend to load (default: claude_cli)")
+    parser.add_argument("--runs", type=int, default=5, help="Number of cold starts to measure (default: 5)")
+    parser.add_argument("--max-seconds", type=float, default=1.5,
+                        help="Fail if the median import time exceeds this (default: 1.5)")
+    args = parser.parse_args()
+
+    print("SimulateDev Startup Benchmark")
+    print("=" * 40)
+    print(f"Agent: {args.agent}, runs: {args.runs}")
+
+    try:
+        results = [run_probe(args.agent) for _ in range(args.runs)]
+    except RuntimeError as e:
+        print(f"❌ FAILED - {e}")
+        sys.exit(1)
+
+    timings = [result["seconds"] for result in results]
+    heavy_modules = sorted({name for result in results for name in result["heavy_modules"]})
+    median = statistics.median(timings)
+
+    print(f"Import time: median {median * 1000:.0f}ms, min {min(timings) * 1000:.0f}ms, max {max(timings) * 1000:.0f}ms")
+
+    passed = True
+    if heavy_modules:
+        print(f"❌ FAILED - Heavy modules imported at startup: {', '.join(heavy_modules)}")
+        passed = False
+    if median > args.max_seconds:
+        print(f"❌ FAILED - Median import time {median:.2f}s exceeds {args.max_seconds:.2f}s")
+        passed = False
+
+    if passed:
+        print("✅ PASSED")
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for dependency-graph execution in Orchestrator._execute_agent_graph
+
+Runs real TestAgents on a local git repository: two independent Coders and a
+Tester that depends on both. Orchestrator._execute_agent is wrapped to record what
+each agent was given (context, directory and the files in it) and when it started
+and ended, and to write a file named after the agent into its directory.
+
+Usage:
+    python -m pytest tests/test_agent_graph.py
+    python tests/test_agent_graph.py
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+sys.path.insert(0, str(project_root))
+
+from agents import AgentDefinition, AgentContext, AgentRole
+from src.orchestrator import Orchestrator, TaskRequest
+
+
+def _make_repo():
+    """Create a git repository with one commit and return its path"""
+    repo_path = tempfile.mkdtemp(prefix="simulatedev_graph_")
+    with open(os.path.join(repo_path, "README.md"), 'w', encoding='utf-8') as f:
+        f.write("# Graph test\n")
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "--quiet"], cwd=repo_path, check=True)
+    subprocess.run(git + ["add", "-A"], cwd=repo_path, check=True)
+    subprocess.run(git + ["commit", "--quiet", "-m", "init"], cwd=repo_path, check=True)
+    return repo_path
+
+
+def _run_graph(agents, work_directory):
+    """Execute agents as a graph; returns (orchestrator, events, contexts, directories, files)
+
+    contexts, directories and files (found in the directory at the start) are keyed by agent id.
+    """
+    orchestrator = Orchestrator()
+    original_execute_agent = orchestrator._execute_agent
+    events = []
+    contexts = {}
+    directories = {}
+    files = {}
+
+    async def recording_execute_agent(agent_definition, prompt, context, agent_directory):
+        agent_id = agent_definition.agent_id
+        contexts[agent_id] = context
+        directories[agent_id] = agent_directory
+        files[agent_id] = sorted(os.listdir(agent_directory))
+        events.append(("start", agent_id, time.monotonic()))
+        with open(os.path.join(agent_directory, f"{agent_id}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"written by {agent_id}\n")
+        result = await original_execute_agent(agent_definition, prompt, context, agent_directory)
+        events.append(("end", agent_id, time.monotonic()))
+        return result
+
+    context = AgentContext(
+        task_description="Analyze the repository",
+        previous_outputs=[],
+        current_step=0,
+        total_steps=len(agents),
+        work_directory=work_directory
+    )
+    request = TaskRequest(task_description="Analyze the repository", agents=agents,
+                          work_directory=work_directory, create_pr=False)
+
+    with mock.patch.object(orchestrator, "_execute_agent", recording_execute_agent):
+        asyncio.run(orchestrator._execute_agent_graph(agents, context, request, work_directory))
+    return orchestrator, events, contexts, directories, files
+
+
+def _coders_and_tester():
+    return [
+        AgentDefinition(coding_ide="test", model="test", role=AgentRole.CODER, agent_id="coder_a", depends_on=[]),
+        AgentDefinition(coding_ide="test", model="test", role=AgentRole.CODER, agent_id="coder_b", depends_on=[]),
+        AgentDefinition(coding_ide="test", model="test", role=AgentRole.TESTER, agent_id="tester",
+                        depends_on=["coder_a", "coder_b"]),
+    ]
+
+
+def test_independent_agents_overlap_and_feed_their_dependent():
+    work_directory = _make_repo()
+    orchestrator, events, contexts, directories, _ = _run_graph(_coders_and_tester(), work_directory)
+
+    assert all(result["success"] for result in orchestrator.execution_log)
+
+    times = {(event, agent_id): at for event, agent_id, at in events}
+    # Both Coders started before either of them finished
+    assert max(times[("start", "coder_a")], times[("start", "coder_b")]) < \
+        min(times[("end", "coder_a")], times[("end", "coder_b")])
+    # The Tester started only after both Coders finished
+    assert times[("start", "tester")] >= max(times[("end", "coder_a")], times[("end", "coder_b")])
+
+    # The Tester sees the outputs of both Coders
+    previous_outputs = contexts["tester"].previous_outputs
+    assert sorted(output["role"] for output in previous_outputs) == ["Coder", "Coder"]
+    assert all(output["success"] and output["output"] for output in previous_outputs)
+    assert contexts["coder_a"].previous_outputs == [] and contexts["coder_b"].previous_outputs == []
+
+
+def test_concurrent_agents_work_in_their_own_checkouts():
+    work_directory = _make_repo()
+    _, _, _, directories, _ = _run_graph(_coders_and_tester(), work_directory)
+
+    assert len(set(directories.values())) == 3
+    assert work_directory not in directories.values()
+    # The checkouts are gone and their changes are merged into the work directory
+    assert not any(os.path.exists(directory) for directory in directories.values())
+    for agent_id in ("coder_a", "coder_b", "tester"):
+        assert os.path.exists(os.path.join(work_directory, f"{agent_id}.txt"))
+
+
+def test_dependent_agent_starts_from_the_changes_of_its_dependencies():
+    work_directory = _make_repo()
+    _, _, _, _, files = _run_graph(_coders_and_tester(), work_directory)
+
+    assert "coder_a.txt" not in files["coder_b"] and "coder_b.txt" not in files["coder_a"]
+    assert "coder_a.txt" in files["tester"] and "coder_b.txt" in files["tester"]
+
+
+def test_chain_runs_in_the_work_directory():
+    work_directory = _make_repo()
+    agents = [
+        AgentDefinition(coding_ide="test", model="test", role=AgentRole.CODER, agent_id="coder", depends_on=[]),
+        AgentDefinition(coding_ide="test", model="test", role=AgentRole.TESTER, agent_id="tester",
+                        depends_on=["coder"]),
+    ]
+    _, _, contexts, directories, _ = _run_graph(agents, work_directory)
+
+    assert set(directories.values()) == {work_directory}
+    assert [output["role"] for output in contexts["tester"].previous_outputs] == ["Coder"]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test()
+                print(f"PASS: {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL: {name}: {e}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for CLIAgent._wait_for_completion in agents/base.py
+
+Drives a CLIAgent subclass with a fake tmux service in a temporary work directory.
+The agent counts as finished when its output file appears or its tmux session shows
+it idle; files that stop changing alone must not end the wait.
+
+Usage:
+    python -m pytest tests/test_cli_agent_completion.py
+    python tests/test_cli_agent_completion.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+sys.path.insert(0, str(project_root))
+
+from agents.base import CLIAgent, CLIAgentConfig, ReadyIndicatorMode
+
+BUSY_OUTPUT = "Working on it... (esc to interrupt)"
+IDLE_OUTPUT = "> "
+
+
+class FakeTmuxService:
+    """Returns whatever the test puts in output for every session"""
+
+    def __init__(self, output: str):
+        self.output = output
+
+    async def capture_session_output(self, session_id: str) -> str:
+        return self.output
+
+
+class BusyIndicatorAgent(CLIAgent):
+    """Shows a busy indicator while working, like Claude CLI"""
+
+    COMPLETION_CHECK_SECONDS = 0.2
+
+    @classmethod
+    def get_config(cls) -> CLIAgentConfig:
+        return CLIAgentConfig(command=["fake"], supports_yolo=False, pre_commands=[],
+                              ready_indicators=["esc to interrupt"],
+                              ready_indicator_mode=ReadyIndicatorMode.EXCLUSIVE)
+
+    @property
+    def keyboard_shortcut(self):
+        return None
+
+
+class ReadyIndicatorAgent(BusyIndicatorAgent):
+    """Shows a prompt when ready for input, like Gemini CLI"""
+
+    @classmethod
+    def get_config(cls) -> CLIAgentConfig:
+        return CLIAgentConfig(command=["fake"], supports_yolo=False, pre_commands=[],
+                              ready_indicators=["Type your message"],
+                              ready_indicator_mode=ReadyIndicatorMode.INCLUSIVE)
+
+
+def _make_agent(agent_class, output: str):
+    agent = agent_class(None)
+    agent.set_current_project(tempfile.mkdtemp(prefix="simulatedev_cli_"))
+    tmux_service = FakeTmuxService(output)
+    agent.set_tmux_service(tmux_service)
+    agent.set_session_id("session")
+    return agent, tmux_service
+
+
+def _write(agent, name: str):
+    with open(os.path.join(agent.project_path, name), 'w', encoding='utf-8') as f:
+        f.write(name)
+
+
+def _wait(agent, scenario, timeout_seconds: float) -> float:
+    """Run _wait_for_completion alongside a scenario coroutine; returns the seconds waited"""
+    async def run():
+        scenario_task = asyncio.create_task(scenario())
+        start_time = time.monotonic()
+        await agent._wait_for_completion(timeout_seconds=timeout_seconds)
+        waited = time.monotonic() - start_time
+        scenario_task.cancel()
+        return waited
+
+    with mock.patch.dict(os.environ, {"WORKSPACE_QUIET_SECONDS": "1"}):
+        return asyncio.run(run())
+
+
+def test_output_file_ends_the_wait_while_the_session_is_busy():
+    agent, _ = _make_agent(BusyIndicatorAgent, BUSY_OUTPUT)
+
+    async def scenario():
+        await asyncio.sleep(0.5)
+        _write(agent, agent.output_file)
+
+    assert _wait(agent, scenario, timeout_seconds=10) < 3
+
+
+def test_quiet_work_directory_does_not_end_the_wait_while_the_session_is_busy():
+    agent, _ = _make_agent(BusyIndicatorAgent, BUSY_OUTPUT)
+
+    async def scenario():
+        await asyncio.sleep(0.3)
+        _write(agent, "module.py")  # Then quiet, e.g. while running a test suite
+
+    assert _wait(agent, scenario, timeout_seconds=3) >= 3
+
+
+def test_idle_session_ends_the_wait_once_files_stop_changing():
+    agent, tmux_service = _make_agent(BusyIndicatorAgent, BUSY_OUTPUT)
+
+    async def scenario():
+        await asyncio.sleep(0.3)
+        _write(agent, "module.py")
+        await asyncio.sleep(2.5)
+        tmux_service.output = IDLE_OUTPUT
+
+    waited = _wait(agent, scenario, timeout_seconds=10)
+    assert 2.8 <= waited < 5
+
+
+def test_ready_indicator_ends_the_wait():
+    agent, tmux_service = _make_agent(ReadyIndicatorAgent, "Thinking...")
+
+    async def scenario():
+        await asyncio.sleep(1.5)
+        tmux_service.output = "Type your message or @path/to/file"
+
+    waited = _wait(agent, scenario, timeout_seconds=10)
+    assert 1.5 <= waited < 4
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test()
+                print(f"PASS: {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL: {name}: {e}")
+    sys.exit(1 if failures else 0)
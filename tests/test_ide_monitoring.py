@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for monitoring several IDE windows at once in utils/ide_completion_detector.py
+
+wait_until_ides_finish() runs one wait_until_ide_finishes() loop per IDEWatch on the
+same event loop. The IDE state analysis is replaced by a fake that takes a while, so
+the tests can check that the watches progress concurrently instead of one after the
+other.
+
+Usage:
+    python -m pytest tests/test_ide_monitoring.py
+    python tests/test_ide_monitoring.py
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+sys.path.insert(0, str(project_root))
+
+from utils import ide_completion_detector
+from utils.ide_completion_detector import IDEWatch, wait_until_ides_finish
+
+ANALYSIS_SECONDS = 0.3
+
+
+def _monitor(watches, states_by_project):
+    """Run wait_until_ides_finish with a fake state analysis and return (results, events, seconds)
+
+    states_by_project maps each project to the states its successive checks report.
+    """
+    events = []
+
+    async def fake_analyze_ide_state(prompt, ide_name=None, project_name=None, *args, **kwargs):
+        events.append(("start", project_name, kwargs.get("focus_window")))
+        await asyncio.sleep(ANALYSIS_SECONDS)
+        events.append(("end", project_name, kwargs.get("focus_window")))
+        state = states_by_project[project_name].pop(0)
+        return state == "done", state, f"fake {state}"
+
+    with mock.patch.object(ide_completion_detector, "initialize_llm_client", return_value=True), \
+            mock.patch.object(ide_completion_detector, "analyze_ide_state", fake_analyze_ide_state):
+        start_time = time.monotonic()
+        results = asyncio.run(wait_until_ides_finish(watches))
+        return results, events, time.monotonic() - start_time
+
+
+def test_watches_are_checked_concurrently():
+    watches = [IDEWatch("Cursor", "repo-a", "prompt", 30), IDEWatch("Cursor", "repo-b", "prompt", 30)]
+    results, events, seconds = _monitor(watches, {"repo-a": ["done"], "repo-b": ["done"]})
+
+    assert results == {("Cursor", "repo-a"): True, ("Cursor", "repo-b"): True}
+    # Both checks started before either finished
+    assert [event[0] for event in events] == ["start", "start", "end", "end"]
+    assert seconds < 2 * ANALYSIS_SECONDS
+
+
+def test_several_watches_raise_their_window_before_each_capture():
+    watches = [IDEWatch("Cursor", "repo-a", "prompt", 30), IDEWatch("Windsurf", "repo-b", "prompt", 30)]
+    _, events, _ = _monitor(watches, {"repo-a": ["done"], "repo-b": ["done"]})
+    assert all(focus_window for _, _, focus_window in events)
+
+
+def test_double_check_of_one_watch_does_not_hold_up_the_other():
+    watches = [
+        IDEWatch("Cursor", "repo-a", "prompt", 30, require_two_subsequent_done_states=True),
+        IDEWatch("Cursor", "repo-b", "prompt", 30),
+    ]
+    results, events, seconds = _monitor(watches, {"repo-a": ["done", "done"], "repo-b": ["done"]})
+
+    assert results == {("Cursor", "repo-a"): True, ("Cursor", "repo-b"): True}
+    assert [event[1] for event in events if event[0] == "end"] == ["repo-a", "repo-b", "repo-a"]
+    assert seconds < 3 * ANALYSIS_SECONDS
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test()
+                print(f"PASS: {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL: {name}: {e}")
+    sys.exit(1 if failures else 0)
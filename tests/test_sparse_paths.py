@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the sparse checkout path helpers in utils/clone_repo.py
+
+Covers mentioned_paths() (extracting path candidates from task text) and
+resolve_sparse_directories() (matching them against a repository tree), in
+particular dot-directories such as .github/ and abbreviations such as "e.g.",
+and committing changes made outside a sparse checkout's cone.
+
+Usage:
+    python -m pytest tests/test_sparse_paths.py
+    python tests/test_sparse_paths.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent  # Go up one level from tests/ to project root
+sys.path.insert(0, str(project_root))
+
+from utils.clone_repo import mentioned_paths, resolve_sparse_directories, apply_sparse_checkout, stage_all_changes
+
+
+def _make_repo(files):
+    """Create a git repository with the given files committed, and return its path"""
+    repo_path = tempfile.mkdtemp(prefix="simulatedev_sparse_")
+    for name in files:
+        file_path = os.path.join(repo_path, name)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(name)
+    git = ["git", "-c", "user.name=test", "-c", "user.email=test@example.com"]
+    subprocess.run(git + ["init", "--quiet"], cwd=repo_path, check=True)
+    subprocess.run(git + ["add", "-A"], cwd=repo_path, check=True)
+    subprocess.run(git + ["commit", "--quiet", "-m", "init"], cwd=repo_path, check=True)
+    return repo_path
+
+
+def test_dot_directories_keep_their_leading_dot():
+    paths = mentioned_paths("The job in .github/workflows/ci.yml fails; see .vscode/settings.json and .circleci/")
+    assert paths == [".github/workflows/ci.yml", ".vscode/settings.json", ".circleci"]
+
+
+def test_only_a_leading_dot_slash_is_removed():
+    assert mentioned_paths("Update ./src/app.py.") == ["src/app.py"]
+    assert mentioned_paths("diff --git a/.github/labeler.yml b/.github/labeler.yml") == [".github/labeler.yml"]
+
+
+def test_abbreviations_are_not_paths():
+    paths = mentioned_paths("Cache the results, e.g. in utils/cache.py, i.e. not in memory (cf. config.py)")
+    assert paths == ["utils/cache.py", "config.py"]
+
+
+def test_urls_and_implausible_tokens_are_ignored():
+    assert mentioned_paths("See https://github.com/owner/repo/blob/main/src/app.py and ../outside/file.py") == []
+
+
+def test_dot_directories_resolve_to_sparse_directories():
+    repo_path = _make_repo([".github/workflows/ci.yml", "src/app.py", "README.md", "docs/README.md"])
+    paths = mentioned_paths("Fix .github/workflows/ci.yml, e.g. the README.md badge")
+    assert resolve_sparse_directories(repo_path, paths) == [".github/workflows"]
+
+
+
+def _make_sparse_repo_with_changes_outside_the_cone():
+    """Create a repository checked out sparsely to src/, then modify src/ and add files outside it"""
+    repo_path = _make_repo(["src/app.py", "tests/test_app.py", "docs/guide.md", "README.md"])
+    subprocess.run(["git", "config", "user.name", "test"], cwd=repo_path, check=True)
+    subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=repo_path, check=True)
+    assert apply_sparse_checkout(repo_path, ["src/app.py"])
+    assert not os.path.exists(os.path.join(repo_path, "docs"))
+    
+    with open(os.path.join(repo_path, "src", "app.py"), 'a', encoding='utf-8') as f:
+        f.write("\nchanged")
+    for name in ["tests/test_new.py", "new_dir/module.py"]:
+        os.makedirs(os.path.join(repo_path, os.path.dirname(name)), exist_ok=True)
+        with open(os.path.join(repo_path, name), 'w', encoding='utf-8') as f:
+            f.write(name)
+    return repo_path
+
+
+def _committed_files(repo_path):
+    changed = subprocess.run(["git", "show", "--name-status", "--format=", "HEAD"], cwd=repo_path,
+                             capture_output=True, text=True, check=True).stdout.split("\n")
+    tracked = subprocess.run(["git", "ls-files"], cwd=repo_path,
+                             capture_output=True, text=True, check=True).stdout.split()
+    return sorted(line for line in changed if line), tracked
+
+
+def test_changes_outside_the_sparse_cone_are_staged():
+    repo_path = _make_sparse_repo_with_changes_outside_the_cone()
+    stage_all_changes(repo_path)
+    subprocess.run(["git", "commit", "--quiet", "-m", "change"], cwd=repo_path, check=True)
+    
+    changed, tracked = _committed_files(repo_path)
+    assert changed == ["A\tnew_dir/module.py", "A\ttests/test_new.py", "M\tsrc/app.py"]
+    # Files that are not checked out are not staged as deleted
+    assert "docs/guide.md" in tracked and "tests/test_app.py" in tracked
+
+
+def test_commit_changes_commits_files_outside_the_sparse_cone():
+    from src.github_integration import GitHubIntegration
+    
+    repo_path = _make_sparse_repo_with_changes_outside_the_cone()
+    assert GitHubIntegration("test-token").commit_changes(repo_path, "Change files outside the cone")
+    
+    changed, tracked = _committed_files(repo_path)
+    assert changed == ["A\tnew_dir/module.py", "A\ttests/test_new.py", "M\tsrc/app.py"]
+    assert "docs/guide.md" in tracked
+
+if __name__ == "__main__":
+    failures = 0
+    for name, test in sorted(globals().items()):
+        if name.startswith("test_") and callable(test):
+            try:
+                test()
+                print(f"PASS: {name}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL: {name}: {e}")
+    sys.exit(1 if failures else 0)
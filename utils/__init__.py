@@ -5,16 +5,41 @@ This package contains utility functions and helper scripts
 for the SimulateDev AI coding assistant.
 """
 
-from .clone_repo import clone_repository, parse_repo_name
-from .computer_use_utils import LLMComputerUse, take_screenshot, take_ide_window_screenshot, bring_to_front_window, is_project_window_visible, play_beep_sound
-from .ide_completion_detector import (
-    get_window_list, find_window_by_title, capture_screen, 
-    initialize_llm_client, analyze_ide_state, wait_until_ide_finishes
-)
+from .clone_repo import clone_repository, parse_repo_name, mentioned_paths
+
+# Screen/LLM helpers pull in pyautogui, mss, PIL and litellm, so they are imported on first access
+_LAZY_EXPORTS = {
+    'LLMComputerUse': '.computer_use_utils',
+    'take_screenshot': '.computer_use_utils',
+    'take_ide_window_screenshot': '.computer_use_utils',
+    'bring_to_front_window': '.computer_use_utils',
+    'is_project_window_visible': '.computer_use_utils',
+    'play_beep_sound': '.computer_use_utils',
+    'get_window_list': '.ide_completion_detector',
+    'find_window_by_title': '.ide_completion_detector',
+    'capture_screen': '.ide_completion_detector',
+    'initialize_llm_client': '.ide_completion_detector',
+    'analyze_ide_state': '.ide_completion_detector',
+    'wait_until_ide_finishes': '.ide_completion_detector',
+    'wait_until_ides_finish': '.ide_completion_detector',
+    'IDEWatch': '.ide_completion_detector',
+    'ScreenChangeDetector': '.screen_change_detector',
+    'LLMResponseCache': '.llm_cache',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 __all__ = [
     'clone_repository',
     'parse_repo_name',
+    'mentioned_paths',
     'LLMComputerUse',
     'take_screenshot', 
     'take_ide_window_screenshot',
@@ -26,5 +51,9 @@ __all__ = [
     'capture_screen',
     'initialize_llm_client',
     'analyze_ide_state',
-    'wait_until_ide_finishes'
+    'wait_until_ide_finishes',
+    'wait_until_ides_finish',
+    'IDEWatch',
+    'ScreenChangeDetector',
+    'LLMResponseCache'
 ] 
\ No newline at end of file
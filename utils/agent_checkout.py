@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Agent Checkouts for SimulateDev
+
+Gives an agent of a dependency graph its own git worktree, so local agents (CLI,
+headless, GUI) that run at the same time never edit the same files. The task's
+work directory stays the integration point:
+
+    checkout = AgentCheckout.create(work_directory, "coder_a")
+    ... the agent works in checkout.path ...
+    merged, error = checkout.merge_back()
+    checkout.remove()
+
+create() snapshots the work directory, including uncommitted changes of agents that
+already finished, and checks the snapshot out as a detached worktree next to it.
+merge_back() commits the agent's changes on top of that snapshot, merges in the
+current state of the work directory (changes other agents merged meanwhile), and
+applies the result to the work directory as plain file changes. The work directory's
+HEAD and index are never touched, so the PR step commits everything as before.
+
+Snapshots are built in a temporary index, so files outside a sparse-checkout cone
+are kept as they are. Git copies the work directory's sparse-checkout patterns into
+the new worktree.
+
+create() and merge_back() read and write the work directory; callers serialize them
+per work directory.
+"""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Optional, Tuple, List, Dict
+
+# Identity for the snapshot and merge commits, which only live in the object database
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "SimulateDev",
+    "GIT_AUTHOR_EMAIL": "simulatedev@localhost",
+    "GIT_COMMITTER_NAME": "SimulateDev",
+    "GIT_COMMITTER_EMAIL": "simulatedev@localhost",
+}
+
+
+def _run_git(args: List[str], cwd: str, env: Optional[Dict[str, str]] = None,
+             check: bool = True, text: bool = True, input=None) -> subprocess.CompletedProcess:
+    return subprocess.run(["git"] + args, cwd=cwd, env=env, check=check,
+                          capture_output=True, text=text, input=input)
+
+
+def _git_env(**extra) -> Dict[str, str]:
+    # Internal commits are never signed, whatever commit.gpgSign says
+    return dict(os.environ, **GIT_IDENTITY, GIT_CONFIG_COUNT="1", GIT_CONFIG_KEY_0="commit.gpgSign",
+                GIT_CONFIG_VALUE_0="false", **extra)
+
+
+def snapshot_commit(repo_path: str, parent: Optional[str] = None) -> str:
+    """
+    Record the working tree of a checkout (tracked and untracked files) as a commit,
+    without touching the checkout's own index, HEAD or branches.
+
+    Args:
+        repo_path: Path to a clone or worktree
+        parent: Parent of the snapshot commit (defaults to HEAD)
+
+    Returns:
+        str: Id of the snapshot commit
+    """
+    temp_dir = tempfile.mkdtemp(prefix="simulatedev_index_")
+    try:
+        index_path = os.path.join(repo_path, _run_git(["rev-parse", "--git-path", "index"], repo_path).stdout.strip())
+        temp_index = os.path.join(temp_dir, "index")
+        if os.path.exists(index_path):
+            shutil.copyfile(index_path, temp_index)
+
+        env = _git_env(GIT_INDEX_FILE=temp_index)
+        _run_git(["add", "-A", "--sparse"], repo_path, env=env)
+        tree = _run_git(["write-tree"], repo_path, env=env).stdout.strip()
+        parent = parent or _run_git(["rev-parse", "HEAD"], repo_path).stdout.strip()
+        return _run_git(["commit-tree", tree, "-p", parent, "-m", "SimulateDev work directory snapshot"],
+                        repo_path, env=env).stdout.strip()
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+class AgentCheckout:
+    """A private worktree for one agent, merged back into the task's work directory"""
+
+    def __init__(self, work_directory: str, path: str, base_commit: str, name: str):
+        self.work_directory = work_directory
+        self.path = path
+        self.base_commit = base_commit  # Snapshot of the work directory the agent started from
+        self.name = name
+
+    @staticmethod
+    def is_supported(work_directory: str) -> bool:
+        """Whether the work directory is the top level of a git checkout with at least one commit"""
+        toplevel = _run_git(["rev-parse", "--show-toplevel"], work_directory, check=False)
+        if toplevel.returncode != 0:
+            return False
+        if os.path.realpath(toplevel.stdout.strip()) != os.path.realpath(work_directory):
+            return False
+        return _run_git(["rev-parse", "--verify", "--quiet", "HEAD"], work_directory, check=False).returncode == 0
+
+    @classmethod
+    def create(cls, work_directory: str, name: str) -> Optional['AgentCheckout']:
+        """
+        Check out the current state of the work directory into a new worktree for an agent.
+
+        The worktree directory is named "<work directory name>-<name>", so e.g. IDE windows
+        of concurrent agents can be told apart by their project name.
+
+        Returns:
+            AgentCheckout, or None if the worktree could not be created
+        """
+        parent_dir = tempfile.mkdtemp(prefix="simulatedev_agent_")
+        path = os.path.join(parent_dir, f"{os.path.basename(os.path.normpath(work_directory))}-{name}")
+        try:
+            base_commit = snapshot_commit(work_directory)
+            _run_git(["worktree", "add", "--quiet", "--detach", path, base_commit], work_directory)
+            print(f"Created checkout for {name}: {path}")
+            return cls(work_directory, path, base_commit, name)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"ERROR: Failed to create checkout for {name}: {e.stderr.strip() if getattr(e, 'stderr', None) else e}")
+            shutil.rmtree(parent_dir, ignore_errors=True)
+            return None
+
+    def merge_back(self) -> Tuple[bool, Optional[str]]:
+        """
+        Apply the agent's changes to the work directory, combined with changes that
+        other agents merged since this checkout was created.
+
+        Returns:
+            Tuple of (success, error message). On a conflict nothing is applied.
+        """
+        env = _git_env()
+        try:
+            _run_git(["add", "-A", "--sparse"], self.path)
+            if _run_git(["diff", "--cached", "--quiet", self.base_commit], self.path, check=False).returncode == 0:
+                print(f"INFO: {self.name} made no changes to merge")
+                return True, None
+            _run_git(["commit", "--quiet", "--no-verify", "-m", f"SimulateDev changes of {self.name}"],
+                     self.path, env=env)
+
+            # The work directory only changed through merges since the snapshot, so the
+            # snapshot is the merge base of its current state and the agent's changes
+            current_commit = snapshot_commit(self.work_directory, parent=self.base_commit)
+            merge = _run_git(["merge", "--quiet", "--no-edit", current_commit], self.path, env=env, check=False)
+            if merge.returncode != 0:
+                conflicts = _run_git(["diff", "--name-only", "--diff-filter=U"], self.path, check=False).stdout.split()
+                _run_git(["merge", "--abort"], self.path, check=False)
+                return False, (f"Changes of {self.name} conflict with changes of other agents"
+                               f"{': ' + ', '.join(conflicts) if conflicts else ''}")
+
+            patch = _run_git(["diff", "--binary", current_commit, "HEAD"], self.path, text=False).stdout
+            if patch:
+                _run_git(["apply", "--whitespace=nowarn"], self.work_directory, text=False, input=patch)
+            print(f"SUCCESS: Merged changes of {self.name} into {self.work_directory}")
+            return True, None
+
+        except subprocess.CalledProcessError as e:
+            stderr = e.stderr.decode(errors="replace") if isinstance(e.stderr, bytes) else (e.stderr or "")
+            return False, f"Failed to merge changes of {self.name}: {stderr.strip() or e}"
+
+    def remove(self):
+        """Delete the worktree"""
+        result = _run_git(["worktree", "remove", "--force", self.path], self.work_directory, check=False)
+        if result.returncode != 0:
+            print(f"WARNING: Failed to remove checkout {self.path}: {result.stderr.strip()}")
+        shutil.rmtree(os.path.dirname(self.path), ignore_errors=True)
+        _run_git(["worktree", "prune"], self.work_directory, check=False)
@@ -6,18 +6,37 @@ This script clones a git repository into a specified local directory.
 It's designed to help prepare repositories for AI-powered bug discovery.
 
 Usage:
-    python clone_repo.py <repository_url> [target_directory]
+    python clone_repo.py <repository_url> [target_directory] [--clone-mode full|blobless|shallow]
 
 If target_directory is not specified, the repository will be cloned into 
 a directory named after the repository in the current working directory.
+
+Clone modes:
+    full      - regular clone with complete history and all file contents
+    blobless  - partial clone (--filter=blob:none); file contents are fetched on demand
+    shallow   - single-commit clone (--depth 1) of the checked out branch
+
+When sparse paths are given, only the directories containing those paths are
+checked out (cone-mode sparse checkout, which always includes top-level files).
 """
 
 import argparse
 import os
+import re
 import subprocess
 import sys
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 
+CLONE_MODES = ("full", "blobless", "shallow")
+
+# Path-like tokens in free text: "src/app/main.py", "docs/", "setup.cfg"
+_PATH_PATTERN = re.compile(r"(?<![\w/.:@-])((?:[\w.-]+/)+[\w.-]*|[\w-]+\.[A-Za-z][\w]{0,9})(?![\w/-])")
+# File names in unified diff headers: "diff --git a/x b/x", "+++ b/x", "--- a/x"
+_DIFF_PATH_PATTERN = re.compile(r"^(?:diff --git a/(\S+) b/(\S+)|(?:\+\+\+|---) [ab]/(\S+))", re.MULTILINE)
+# Abbreviations that look like file names to _PATH_PATTERN ("e.g" in "e.g. the parser")
+_ABBREVIATIONS = frozenset(["e.g", "i.e", "a.k.a", "n.b", "cf", "etc", "vs", "approx"])
+
 
 def parse_repo_name(repo_url):
     """Extract repository name from URL."""
@@ -31,7 +50,183 @@ def parse_repo_name(repo_url):
     return repo_name
 
 
-def clone_repository(repo_url, target_dir=None, delete_existing_repo_env=True):
+def clone_mode_args(clone_mode=None):
+    """
+    Get the extra `git clone` arguments for a clone mode.
+    
+    Args:
+        clone_mode (str, optional): One of CLONE_MODES. Defaults to the configured mode.
+    
+    Returns:
+        list: Arguments to pass to `git clone`
+    """
+    if clone_mode is None:
+        from common.config import config
+        clone_mode = config.clone_mode
+    
+    if clone_mode == "blobless":
+        return ["--filter=blob:none"]
+    if clone_mode == "shallow":
+        return ["--depth", "1"]
+    if clone_mode != "full":
+        print(f"WARNING: Unknown clone mode '{clone_mode}', using full clone")
+    return []
+
+
+def _clean_path_candidate(candidate: str) -> Optional[str]:
+    """Normalize a path-like token, or return None if it is not a plausible repository path"""
+    candidate = candidate.strip()
+    if candidate.startswith("./"):
+        candidate = candidate[2:]
+    # Trailing slashes of directories and the full stop of a sentence, but keep leading
+    # dots: ".github/workflows" is a real directory
+    candidate = candidate.rstrip("./")
+    if not candidate or candidate.lower() in _ABBREVIATIONS:
+        return None
+    if any(segment in ("", ".", "..") for segment in candidate.split("/")):
+        return None
+    if not re.search(r"[A-Za-z0-9]", candidate):
+        return None
+    return candidate
+
+
+def mentioned_paths(text: Optional[str], max_paths: int = 100) -> List[str]:
+    """
+    Extract repository paths mentioned in an issue, PR or task description.
+    
+    Picks up file names from diff headers and path-like tokens in the prose
+    (URLs are ignored). The result is a list of candidates; use
+    resolve_sparse_directories() to match them against the repository tree.
+    
+    Args:
+        text: Free text such as a synthesized task prompt
+        max_paths: Maximum number of candidates to return
+    
+    Returns:
+        list: Candidate paths, in order of first mention
+    """
+    if not text:
+        return []
+    
+    candidates = []
+    for match in _DIFF_PATH_PATTERN.finditer(text):
+        candidates.extend(group for group in match.groups() if group)
+    
+    for line in text.splitlines():
+        # Skip URLs entirely - their path segments are not repository paths
+        line = re.sub(r"\w+://\S+", " ", line)
+        candidates.extend(match.group(1) for match in _PATH_PATTERN.finditer(line))
+    
+    paths = []
+    for candidate in candidates:
+        candidate = _clean_path_candidate(candidate)
+        if not candidate:
+            continue
+        if candidate.startswith(("a/", "b/")) and candidate[2:] in paths:
+            continue
+        if candidate not in paths:
+            paths.append(candidate)
+        if len(paths) >= max_paths:
+            break
+    return paths
+
+
+def resolve_sparse_directories(repo_path: str, paths: List[str]) -> List[str]:
+    """
+    Map mentioned paths to the directories a sparse checkout should include.
+    
+    A mention matches a tracked file if it is the file's path or a suffix of it
+    with at least one directory (e.g. "utils/helpers.py"), or a directory of the
+    repository. A bare file name (e.g. "helpers.py") only counts if exactly one
+    tracked file has it, so names like README.md or __init__.py don't pull in
+    every directory. Each matched file contributes its containing directory, so
+    the agent also sees the file's neighbours.
+    
+    Args:
+        repo_path: Path to a clone (the tree must be readable, blobs are not needed)
+        paths: Candidate paths, e.g. from mentioned_paths()
+    
+    Returns:
+        list: Sorted directories relative to the repository root ("" entries dropped)
+    """
+    if not paths:
+        return []
+    
+    result = subprocess.run(["git", "ls-tree", "-r", "--name-only", "HEAD"],
+                            cwd=repo_path, capture_output=True, text=True)
+    if result.returncode != 0:
+        return []
+    
+    # Index the tree once: every path suffix (and bare file name) -> containing directories
+    tracked_directories = set()
+    suffix_directories: Dict[str, List[str]] = {}
+    for tracked in result.stdout.splitlines():
+        directory = os.path.dirname(tracked)
+        parts = tracked.split("/")
+        for i in range(len(parts)):
+            suffix_directories.setdefault("/".join(parts[i:]), []).append(directory)
+        for i in range(1, len(parts)):
+            tracked_directories.add("/".join(parts[:i]))
+    
+    directories = set()
+    for path in paths:
+        path = path.rstrip("/")
+        if path in tracked_directories:
+            directories.add(path)
+        matches = suffix_directories.get(path, [])
+        if "/" in path or len(matches) == 1:
+            directories.update(matches)
+    
+    directories.discard("")
+    return sorted(directories)
+
+
+def apply_sparse_checkout(repo_path: str, paths: Optional[List[str]]) -> bool:
+    """
+    Restrict a clone's working tree to the directories around the given paths.
+    
+    Falls back to a full checkout when none of the paths match the repository,
+    so an unhelpful task description never leaves the agent with an empty tree.
+    
+    Args:
+        repo_path: Path to a clone or worktree
+        paths: Candidate paths, e.g. from mentioned_paths()
+    
+    Returns:
+        bool: True if a sparse checkout is active, False if the full tree is checked out
+    """
+    directories = resolve_sparse_directories(repo_path, paths or [])
+    
+    if not directories:
+        if paths:
+            print("INFO: No mentioned paths matched the repository, checking out the full tree")
+        subprocess.run(["git", "sparse-checkout", "disable"], cwd=repo_path,
+                       check=True, capture_output=True)
+        return False
+    
+    subprocess.run(["git", "sparse-checkout", "set", "--cone"] + directories,
+                   cwd=repo_path, check=True, capture_output=True)
+    print(f"Sparse checkout limited to {len(directories)} director{'y' if len(directories) == 1 else 'ies'}: {', '.join(directories[:10])}{'...' if len(directories) > 10 else ''}")
+    return True
+
+
+def stage_all_changes(repo_path: str):
+    """
+    Stage every change in a clone, including files outside its sparse-checkout cone.
+    
+    Agents routinely touch files outside the directories a task mentions (tests, new
+    directories); plain `git add .` refuses to stage those in a sparse checkout and
+    exits with an error. --sparse stages them without touching the entries outside
+    the cone that are not checked out.
+    
+    Raises:
+        subprocess.CalledProcessError: If staging fails
+    """
+    subprocess.run(["git", "add", "-A", "--sparse"], cwd=repo_path, check=True, capture_output=True)
+
+
+def clone_repository(repo_url, target_dir=None, delete_existing_repo_env=True,
+                     clone_mode=None, sparse_paths=None):
     """
     Clone a git repository to a local directory.
     
@@ -40,6 +235,8 @@ def clone_repository(repo_url, target_dir=None, delete_existing_repo_env=True):
         target_dir (str, optional): Directory to clone into. If not specified,
                                   uses the repository name in the current directory.
         delete_existing_repo_env (bool): If True, delete existing directory before cloning
+        clone_mode (str, optional): "full", "blobless" or "shallow". Defaults to the configured mode.
+        sparse_paths (list, optional): Paths the task needs; enables sparse checkout of their directories
     
     Returns:
         bool: True if successful, False otherwise
@@ -63,16 +260,24 @@ def clone_repository(repo_url, target_dir=None, delete_existing_repo_env=True):
         
         # Clone the repository
         print(f"Cloning {repo_url} into {target_dir}...")
-        subprocess.run(["git", "clone", repo_url, target_dir], 
+        clone_args = clone_mode_args(clone_mode)
+        if sparse_paths:
+            # Start with only top-level files checked out, then widen to the task's directories
+            clone_args.append("--sparse")
+        subprocess.run(["git", "clone"] + clone_args + [repo_url, target_dir], 
                       check=True, 
                       stdout=subprocess.PIPE, 
                       stderr=subprocess.PIPE)
         
+        if sparse_paths:
+            apply_sparse_checkout(target_dir, sparse_paths)
+        
         print(f"Repository successfully cloned to {target_dir}")
         return True
     
     except subprocess.CalledProcessError as e:
-        print(f"Error cloning repository: {e.stderr.decode()}")
+        stderr = e.stderr.decode() if isinstance(e.stderr, bytes) else (e.stderr or "")
+        print(f"Error cloning repository: {stderr}")
         return False
     
     except Exception as e:
@@ -94,10 +299,16 @@ def main():
         default=None,
         help="Directory to clone the repository into (optional)"
     )
+    parser.add_argument(
+        "--clone-mode",
+        choices=CLONE_MODES,
+        default="full",
+        help="Clone mode: full, blobless (--filter=blob:none) or shallow (--depth 1)"
+    )
     
     args = parser.parse_args()
     
-    success = clone_repository(args.repo_url, args.target_dir)
+    success = clone_repository(args.repo_url, args.target_dir, clone_mode=args.clone_mode)
     
     if success:
         print("Ready for AI bug hunting!")
@@ -1,4 +1,4 @@
-import os
+import asyncio
 import base64
 import io
 import subprocess
@@ -13,6 +13,11 @@ from mss import mss
 from PIL import Image
 from functools import wraps
 from .llm_client import llm_client, ActionResponse
+from .llm_rate_limiter import LLMPriority
+from .llm_telemetry import llm_caller
+from .coordinate_cache import coordinate_cache
+from common.config import config
+from common.tracing import span
 
 load_dotenv()
 
@@ -203,14 +208,35 @@ class ImageProcessor:
     
     @staticmethod
     def process_image_to_buffer(image: Image.Image, target_width: int, target_height: int, 
-                              encode_base64: bool = False) -> Union[str, io.BytesIO]:
-        """Process image and return as base64 string or BytesIO buffer"""
-        # Resize to target dimensions
-        image = image.resize((target_width, target_height))
-        
-        # Save to in-memory buffer
-        img_buffer = io.BytesIO()
-        image.save(img_buffer, format="PNG", optimize=True)
+                              encode_base64: bool = False, image_format: Optional[str] = None,
+                              quality: Optional[int] = None) -> Union[str, io.BytesIO]:
+        """Process image and return as base64 string or BytesIO buffer
+        
+        Encodes with SCREENSHOT_FORMAT/SCREENSHOT_QUALITY unless given. Each frame's encoded
+        size and encode time are recorded as a "screenshot.encode" trace span.
+        """
+        image_format = (image_format or config.screenshot_format).upper()
+        quality = quality or config.screenshot_quality
+        
+        with span("screenshot.encode", category="screenshot", format=image_format.lower(),
+                  source_size=f"{image.width}x{image.height}") as encode_span:
+            # Shrink Retina-sized captures by an integer factor first; much cheaper than a full resample
+            factor = min(image.width // target_width, image.height // target_height)
+            if factor >= 2:
+                image = image.reduce(factor)
+            
+            # Resize to target dimensions
+            image = image.resize((target_width, target_height))
+            
+            # Save to in-memory buffer
+            img_buffer = io.BytesIO()
+            if image_format == "PNG":
+                image.save(img_buffer, format="PNG")
+            else:
+                if image.mode != "RGB":
+                    image = image.convert("RGB")
+                image.save(img_buffer, format=image_format, quality=quality)
+            encode_span["bytes"] = img_buffer.tell()
         img_buffer.seek(0)
         
         if encode_base64:
@@ -285,115 +311,152 @@ class LLMComputerUse:
                 return round(x / x_scaling_factor), round(y / y_scaling_factor)
     
     async def get_coordinates_from_vision_model(self, prompt: str, support_non_existing_elements: bool = False, 
-                                               ide_name: str = None, project_name: str = None) -> Optional[ComputerUseAction]:
+                                               ide_name: str = None, project_name: str = None,
+                                               use_cache: bool = True) -> Optional[ComputerUseAction]:
         """Get coordinates and action type from vision model based on a natural language prompt
         
         This method prioritizes IDE window screenshots when IDE parameters are provided to avoid
         confusion from multiple windows. It then calculates absolute screen coordinates from
         the relative window coordinates for accurate clicking.
         
+        For IDE windows, a previous hit for the same prompt in the same window is reused
+        (skipping the model call) if the screen around it still looks the same.
+        
+        Screen capture and window scripting block, so they run in a worker thread; the
+        model call goes through the async LLM client and never holds a thread.
+        
         Args:
             prompt: Natural language prompt describing the UI element to find
             support_non_existing_elements: Whether to allow non-existing elements in response
             ide_name: Optional IDE name - when provided with project_name, uses IDE window screenshot
             project_name: Optional project name - when provided with ide_name, uses IDE window screenshot
+            use_cache: Whether to reuse a verified cached location for this element
         """
-        try:
-            # Check if LLM client is available
-            if not llm_client.is_available():
-                print("Error: LLM client not available")
-                return None
-            
-            image_buffer = None
-            screenshot_metadata = None
-            
-            # Try to use IDE window screenshot if both IDE name and project name are provided
-            if ide_name and project_name:
-                # Ensure the window is visible
-                if is_project_window_visible(ide_name, project_name, auto_focus=True):
-                    # Take IDE window screenshot with metadata
-                    ide_screenshot_result = take_ide_window_screenshot(
-                        ide_name, 
-                        project_name, 
-                        target_width=self.target_width, 
-                        target_height=self.target_height, 
-                        encode_base64=False, 
-                        verbose=False, 
-                        return_metadata=True
-                    )
-                    
-                    if ide_screenshot_result:
-                        image_buffer, screenshot_metadata = ide_screenshot_result
-                        self.last_screenshot_metadata = screenshot_metadata
+        with llm_caller("get_coordinates_from_vision_model"):
+            try:
+                # Check if LLM client is available
+                if not llm_client.is_available():
+                    print("Error: LLM client not available")
+                    return None
+                
+                cached_action, image_buffer, screenshot_metadata, cache_key = await asyncio.to_thread(
+                    self._capture_for_element, prompt, ide_name, project_name, use_cache)
+                if cached_action is not None:
+                    return cached_action
+                
+                # Create enhanced prompt - simpler for IDE screenshots since they're already focused
+                enhanced_prompt = prompt
+                if screenshot_metadata and screenshot_metadata.screenshot_type == ScreenshotType.WINDOW_SPECIFIC:
+                    # For window screenshots, the prompt can be more direct since we're already focused on the right window
+                    enhanced_prompt = f"{prompt}. This screenshot shows the {ide_name} IDE window for project '{project_name}'."
+                elif ide_name and project_name:
+                    # For full screen fallback, add window context
+                    window_title = await asyncio.to_thread(get_ide_window_title_for_project, ide_name, project_name)
+                    if window_title:
+                        enhanced_prompt = f"{prompt}. Focus on the window titled '{window_title}' if multiple {ide_name} windows are visible."
                     else:
-                        print(f"WARNING: Failed to capture IDE window screenshot, falling back to full screen")
-                else:
-                    print(f"WARNING: Could not make {ide_name} window for project '{project_name}' visible, falling back to full screen")
-            
-            # Fallback to full screen screenshot if IDE screenshot failed or wasn't requested
-            if image_buffer is None:
-                base64_image_data = take_screenshot(self.target_width, self.target_height, encode_base64=True)
-                screenshot_metadata = ScreenshotMetadata(ScreenshotType.FULL_SCREEN)
-                self.last_screenshot_metadata = screenshot_metadata
+                        enhanced_prompt = f"{prompt}. Focus on the {ide_name} window for project '{project_name}' if multiple {ide_name} windows are visible."
                 
-                # Convert base64 string to BytesIO for llm_client
-                image_data = base64.b64decode(base64_image_data)
-                image_buffer = io.BytesIO(image_data)
-            
-            # Create enhanced prompt - simpler for IDE screenshots since they're already focused
-            enhanced_prompt = prompt
-            if screenshot_metadata and screenshot_metadata.screenshot_type == ScreenshotType.WINDOW_SPECIFIC:
-                # For window screenshots, the prompt can be more direct since we're already focused on the right window
-                enhanced_prompt = f"{prompt}. This screenshot shows the {ide_name} IDE window for project '{project_name}'."
-            elif ide_name and project_name:
-                # For full screen fallback, add window context
-                window_title = get_ide_window_title_for_project(ide_name, project_name)
-                if window_title:
-                    enhanced_prompt = f"{prompt}. Focus on the window titled '{window_title}' if multiple {ide_name} windows are visible."
-                else:
-                    enhanced_prompt = f"{prompt}. Focus on the {ide_name} window for project '{project_name}' if multiple {ide_name} windows are visible."
-            
-            # Create the system prompt
-            system_prompt = """You are a UI Element Detection AI. Analyze the attached screenshot to locate UI elements.
+                # Create the system prompt
+                system_prompt = """You are a UI Element Detection AI. Analyze the attached screenshot to locate UI elements.
 
 IMPORTANT: If there is more than one element that matches the prompt, choose the one that is more prominent, for example, the one that is more visible, or the one in the focused and front window.
 
 Use "click" for buttons/links and "type" for text inputs."""
 
-            if support_non_existing_elements:
-                system_prompt += """ If the requested UI element is not found in the screenshot, you may indicate this in your response."""
-            
-            # Use llm_client with structured response
-            result = llm_client.analyze_image_with_structured_response(
-                image_input=image_buffer,
-                prompt=enhanced_prompt,
-                response_model=ActionResponse,
-                system_prompt=system_prompt,
-                max_tokens=1024
-            )
-            
-            if not result:
-                print("Error getting response from LLM: No response received")
+                if support_non_existing_elements:
+                    system_prompt += """ If the requested UI element is not found in the screenshot, you may indicate this in your response."""
+                
+                # Use llm_client with structured response
+                result = await llm_client.aanalyze_image_with_structured_response(
+                    image_input=image_buffer,
+                    prompt=enhanced_prompt,
+                    response_model=ActionResponse,
+                    system_prompt=system_prompt,
+                    max_tokens=1024,
+                    priority=LLMPriority.INTERACTIVE  # The agent is waiting to act on it
+                )
+                
+                if not result:
+                    print("Error getting response from LLM: No response received")
+                    return None
+                
+                # Extract action type and coordinates from the Pydantic model
+                action_type_str = result.action.type
+                action_type = ActionType.CLICK if action_type_str == "click" else ActionType.TYPE
+                
+                x = result.action.coordinates.x
+                y = result.action.coordinates.y
+                
+                # Scale coordinates using the appropriate metadata
+                real_x, real_y = self.scale_coordinates(ScalingSource.API, x, y, screenshot_metadata)
+                
+                # Only window-specific hits are cached; their key includes the window bounds
+                if screenshot_metadata.screenshot_type == ScreenshotType.WINDOW_SPECIFIC:
+                    coordinate_cache.put(cache_key, real_x, real_y, action_type)
+                
+                return ComputerUseAction(
+                    action_type=action_type,
+                    coordinates=Coordinates(real_x, real_y)
+                )
+                    
+            except Exception as e:
+                print(f"Error getting coordinates from LLM: {e}")
                 return None
-            
-            # Extract action type and coordinates from the Pydantic model
-            action_type_str = result.action.type
-            action_type = ActionType.CLICK if action_type_str == "click" else ActionType.TYPE
-            
-            x = result.action.coordinates.x
-            y = result.action.coordinates.y
-            
-            # Scale coordinates using the appropriate metadata
-            real_x, real_y = self.scale_coordinates(ScalingSource.API, x, y, screenshot_metadata)
-            
-            return ComputerUseAction(
-                action_type=action_type,
-                coordinates=Coordinates(real_x, real_y)
-            )
+    
+    def _capture_for_element(self, prompt: str, ide_name: str = None, project_name: str = None,
+                             use_cache: bool = True) -> Tuple[Optional[ComputerUseAction], Optional[io.BytesIO],
+                                                              Optional[ScreenshotMetadata], Optional[str]]:
+        """Screenshot to locate a UI element in (blocking)
+        
+        Returns:
+            (cached_action, image_buffer, screenshot_metadata, cache_key): cached_action is set, and
+            nothing is captured, when a verified cached location of the element can be reused
+        """
+        image_buffer = None
+        screenshot_metadata = None
+        cache_key = None
+        
+        # Try to use IDE window screenshot if both IDE name and project name are provided
+        if ide_name and project_name:
+            # Ensure the window is visible
+            if is_project_window_visible(ide_name, project_name, auto_focus=True):
+                # Reuse the last location of this element if the window and its surroundings are unchanged
+                if use_cache:
+                    cache_key = coordinate_cache.make_key(ide_name, project_name, prompt,
+                                                          get_window_bounds(ide_name, project_name))
+                    cached = coordinate_cache.get(cache_key)
+                    if cached:
+                        print(f"Using cached location ({cached.x}, {cached.y}) for UI element in {ide_name}")
+                        return (ComputerUseAction(action_type=cached.action_type,
+                                                  coordinates=Coordinates(cached.x, cached.y)), None, None, None)
                 
-        except Exception as e:
-            print(f"Error getting coordinates from LLM: {e}")
-            return None
+                # Take IDE window screenshot with metadata
+                ide_screenshot_result = take_ide_window_screenshot(
+                    ide_name, 
+                    project_name, 
+                    target_width=self.target_width, 
+                    target_height=self.target_height, 
+                    encode_base64=False, 
+                    verbose=False, 
+                    return_metadata=True
+                )
+                
+                if ide_screenshot_result:
+                    image_buffer, screenshot_metadata = ide_screenshot_result
+                    self.last_screenshot_metadata = screenshot_metadata
+                else:
+                    print(f"WARNING: Failed to capture IDE window screenshot, falling back to full screen")
+            else:
+                print(f"WARNING: Could not make {ide_name} window for project '{project_name}' visible, falling back to full screen")
+        
+        # Fallback to full screen screenshot if IDE screenshot failed or wasn't requested
+        if image_buffer is None:
+            image_buffer = take_screenshot(self.target_width, self.target_height)
+            screenshot_metadata = ScreenshotMetadata(ScreenshotType.FULL_SCREEN)
+            self.last_screenshot_metadata = screenshot_metadata
+        
+        return None, image_buffer, screenshot_metadata, cache_key
 
     async def get_ide_input_coordinates(self, prompt: str, ide_name: str, project_name: str, 
                                        support_non_existing_elements: bool = False) -> Optional[ComputerUseAction]:
@@ -477,7 +540,7 @@ Use "click" for buttons/links and "type" for text inputs."""
                     print("Error: text_to_type is required for TYPE actions")
                     return False
                 pyautogui.click(action.coordinates.x, action.coordinates.y)
-                time.sleep(0.1)  # Brief pause to ensure focus
+                await asyncio.sleep(0.1)  # Brief pause to ensure focus
                 pyautogui.typewrite(text_to_type)
                 return True
             else:
@@ -816,7 +879,8 @@ def take_screenshot(target_width, target_height, encode_base64: bool = False, mo
 @darwin_only("IDE window screenshot")
 def take_ide_window_screenshot(ide_name: str, project_name: str, target_width: int = None, target_height: int = None, 
                               encode_base64: bool = False, verbose: bool = False, 
-                              return_metadata: bool = False) -> Optional[Union[Union[str, io.BytesIO], Tuple[Union[str, io.BytesIO], ScreenshotMetadata]]]:
+                              return_metadata: bool = False,
+                              crop_region: Optional[Tuple[float, float, float, float]] = None) -> Optional[Union[Union[str, io.BytesIO], Tuple[Union[str, io.BytesIO], ScreenshotMetadata]]]:
     """
     Capture a screenshot of the specific IDE window that contains the project name.
     
@@ -832,6 +896,8 @@ def take_ide_window_screenshot(ide_name: str, project_name: str, target_width: i
         encode_base64: Whether to return base64 encoded string instead of BytesIO
         verbose: Whether to print detailed error messages
         return_metadata: Whether to return metadata along with the image (required for coordinate detection)
+        crop_region: Optional (left, top, right, bottom) fractions of the window to keep, e.g. the
+            agent chat panel. The metadata then describes the cropped region.
         
     Returns:
         If return_metadata=False: Image data as string (base64) or BytesIO
@@ -866,29 +932,24 @@ def take_ide_window_screenshot(ide_name: str, project_name: str, target_width: i
         
         x, y, width, height = bounds
         
-        # Create a temporary file for the screenshot
-        import tempfile
-        fd, path = tempfile.mkstemp(suffix='.png')
-        os.close(fd)
-        
-        # Take screenshot using screencapture with window bounds
-        cmd = [
-            'screencapture',
-            '-x',  # suppress sound
-            '-R', f'{x},{y},{width},{height}',
-            path
-        ]
+        # Keep only part of the window (e.g. the chat panel), in logical window coordinates
+        if crop_region:
+            left, top, right, bottom = crop_region
+            target_width = max(1, round(target_width * (right - left)))
+            target_height = max(1, round(target_height * (bottom - top)))
+            x, y = x + round(width * left), y + round(height * top)
+            width, height = round(width * (right - left)), round(height * (bottom - top))
         
+        # Capture the window region straight into memory
         try:
-            subprocess.run(cmd, check=True)
-        except subprocess.CalledProcessError as e:
+            with mss() as sct:
+                shot = sct.grab({"left": x, "top": y, "width": width, "height": height})
+        except Exception as e:
             if verbose:
                 print(f"Error taking screenshot: {e}")
-            os.unlink(path)
             return None
         
-        # Open and process the image
-        image = Image.open(path)
+        image = Image.frombytes('RGB', shot.size, shot.rgb)
         captured_width, captured_height = image.size
         
         # IMPORTANT: Use the window dimensions from AppleScript, not the captured image dimensions
@@ -902,9 +963,6 @@ def take_ide_window_screenshot(ide_name: str, project_name: str, target_width: i
             original_height=height  # Use window height from AppleScript
         )
         
-        # Delete the temporary file
-        os.unlink(path)
-        
         # Process the image using the calculated target dimensions
         processed_image = ImageProcessor.process_image_to_buffer(image, target_width, target_height, encode_base64)
         
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+UI Element Coordinate Cache
+
+Remembers where the vision model found a UI element (the chat input box, the
+resume button, ...) so the next lookup of the same element in the same IDE window
+can skip the model call. An entry is keyed by the IDE, the project, the element
+prompt and the window bounds, and stores the screen coordinates of the hit plus a
+perceptual hash (dHash) of the screen region around it.
+
+A cached location is only used after a cheap local check: the region around it is
+captured again and its hash must be within a small Hamming distance of the stored
+one. If the window moved or was resized the key no longer matches; if the panel
+layout changed or the element disappeared the check fails and the entry is dropped.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Any
+
+from mss import mss
+from PIL import Image
+
+
+@dataclass
+class CachedCoordinates:
+    """A previous vision-model hit and the fingerprint of the screen around it"""
+    x: int
+    y: int
+    action_type: Any
+    region_hash: int
+
+
+class CoordinateCache:
+    """In-process cache of UI element coordinates, verified against the live screen"""
+
+    # Screen region (in screen points) captured around a hit for verification
+    REGION_WIDTH = 160
+    REGION_HEIGHT = 80
+
+    # dHash grid: HASH_WIDTH x HASH_HEIGHT bits
+    HASH_WIDTH = 16
+    HASH_HEIGHT = 8
+
+    # Maximum number of differing hash bits for the region to count as unchanged
+    MAX_HAMMING_DISTANCE = 10
+
+    def __init__(self):
+        self._entries: Dict[Tuple, CachedCoordinates] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(ide_name: str, project_name: str, prompt: str,
+                 window_bounds: Optional[Tuple[int, int, int, int]]) -> Optional[Tuple]:
+        """Build a cache key; None if the window bounds are unknown (nothing is cached then)"""
+        if not ide_name or not project_name or not window_bounds:
+            return None
+        return (ide_name.lower(), project_name, prompt, tuple(window_bounds))
+
+    @classmethod
+    def region_hash(cls, x: int, y: int) -> Optional[int]:
+        """Capture the screen region centred on (x, y) and return its difference hash"""
+        try:
+            left = max(0, x - cls.REGION_WIDTH // 2)
+            top = max(0, y - cls.REGION_HEIGHT // 2)
+            with mss() as sct:
+                shot = sct.grab({"left": left, "top": top, "width": cls.REGION_WIDTH, "height": cls.REGION_HEIGHT})
+            image = Image.frombytes('RGB', shot.size, shot.rgb)
+        except Exception as e:
+            print(f"WARNING: Could not capture screen region for coordinate cache: {e}")
+            return None
+
+        # Difference hash: one bit per horizontally adjacent pixel pair of a tiny grayscale image
+        pixels = list(image.convert("L").resize((cls.HASH_WIDTH + 1, cls.HASH_HEIGHT), Image.BILINEAR).getdata())
+        value = 0
+        for row in range(cls.HASH_HEIGHT):
+            offset = row * (cls.HASH_WIDTH + 1)
+            for column in range(cls.HASH_WIDTH):
+                value = (value << 1) | (pixels[offset + column] > pixels[offset + column + 1])
+        return value
+
+    def get(self, key: Optional[Tuple]) -> Optional[CachedCoordinates]:
+        """Get a cached location if the screen around it still looks the same"""
+        if key is None:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        current_hash = self.region_hash(entry.x, entry.y)
+        if current_hash is None or bin(current_hash ^ entry.region_hash).count("1") > self.MAX_HAMMING_DISTANCE:
+            self.invalidate(key)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry
+
+    def put(self, key: Optional[Tuple], x: int, y: int, action_type: Any):
+        """Remember a vision-model hit, fingerprinting the screen around it now"""
+        if key is None:
+            return
+        region_hash = self.region_hash(x, y)
+        if region_hash is None:
+            return
+        with self._lock:
+            self._entries[key] = CachedCoordinates(x=x, y=y, action_type=action_type, region_hash=region_hash)
+
+    def invalidate(self, key: Optional[Tuple]):
+        """Drop one entry (e.g. after a click on it did not have the expected effect)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop all entries"""
+        with self._lock:
+            self._entries.clear()
+
+
+# Global coordinate cache instance
+coordinate_cache = CoordinateCache()
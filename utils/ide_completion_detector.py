@@ -9,14 +9,27 @@ workflows that depend on IDE operations completing.
 import os
 import sys
 import time
+import asyncio
+import threading
 import subprocess
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Tuple
 from PIL import Image
 from dotenv import load_dotenv
 
-from utils.computer_use_utils import take_screenshot, LLMComputerUse, take_ide_window_screenshot
+from utils.computer_use_utils import take_screenshot, LLMComputerUse, take_ide_window_screenshot, bring_to_front_window
 from utils.llm_client import analyze_ide_state_with_llm
+from utils.screen_change_detector import ScreenChangeDetector
+from common.config import config
+from common.tracing import span
 import pyautogui
 
+# Screen capture and window focusing are serialized when several IDEs are monitored
+# at once: each monitor raises its window and captures it while holding the lock, so
+# it never captures another IDE's window covering its own. The LLM calls themselves
+# run concurrently.
+_screen_lock = threading.Lock()
+
 def get_window_list():
     """
     Get a list of all open windows using osascript (macOS only).
@@ -250,48 +263,121 @@ def initialize_llm_client():
         print(f"Error initializing LLM client: {e}")
         return False
 
-def analyze_ide_state(interface_state_analysis_prompt, ide_name=None, project_name=None, save_debug_screenshot=False, screenshot_count=None):
+async def analyze_ide_state(interface_state_analysis_prompt, ide_name=None, project_name=None, save_debug_screenshot=False, screenshot_count=None, change_detector=None, crop_region=None, state_classifier=None, use_llm_cache=True, focus_window=False):
     """
     Analyze a screenshot to determine if the IDE has finished processing.
     This function handles screenshot capture internally and will try IDE window screenshot first,
     falling back to full screen if the IDE window is not available.
     
+    Capture and the local checks block, so they run in a worker thread; the LLM call goes
+    through the async LLM client.
+    
     Args:
         interface_state_analysis_prompt (str): Prompt for IDE state analysis.
         ide_name (str, optional): Name of the IDE for enhanced visibility detection.
         project_name (str, optional): Name of the project for enhanced visibility detection.
         save_debug_screenshot (bool, optional): Whether to save screenshot for debugging.
         screenshot_count (int, optional): Counter for debug screenshot naming.
+        change_detector (ScreenChangeDetector, optional): If given, the previous verdict is
+            reused instead of calling the LLM while the window is effectively unchanged.
+        crop_region (tuple, optional): (left, top, right, bottom) fractions of the IDE window
+            to capture, e.g. the agent chat panel.
+        state_classifier (TemplateStateClassifier, optional): Local classifier tried before the
+            LLM; the LLM is only called when it is not confident (or to audit it).
+        use_llm_cache (bool, optional): Whether a byte-identical screenshot may be answered
+            from the LLM response cache.
+        focus_window (bool, optional): Raise the IDE window right before capturing it, so a
+            window of another monitored IDE can't cover it.
         
     Returns:
         tuple: (bool, str, str) - (Whether the IDE is done, State, Reasoning)
     """
     try:
-        # If we have IDE info, try to take an IDE window screenshot first
-        image_input = None
+        image_input, thumbnail, local_state, confident, scores, local_result = await asyncio.to_thread(
+            _check_ide_state_locally, ide_name, project_name, save_debug_screenshot, screenshot_count,
+            change_detector, crop_region, state_classifier, focus_window)
+        if local_result is not None:
+            return local_result
+        
+        # Use the shared Claude client for IDE state analysis
+        with span("llm.analyze_ide_state", category="llm", ide=ide_name) as llm_span:
+            result = await analyze_ide_state_with_llm(image_input, interface_state_analysis_prompt, ide_name,
+                                                      project_name, use_cache=use_llm_cache)
+            llm_span["state"] = result[1]
+        
+        if state_classifier is not None and scores and not result[1].startswith("error"):
+            state_classifier.stats.record_comparison(state_classifier.agent_name, local_state, confident, scores, result[1])
+        if change_detector is not None:
+            change_detector.record(thumbnail, result)
+        return result
+    except Exception as e:
+        print(f"Error analyzing IDE state: {e}")
+        return False, f"error: {str(e)}", str(e)
+
+
+def _check_ide_state_locally(ide_name, project_name, save_debug_screenshot, screenshot_count,
+                             change_detector, crop_region, state_classifier, focus_window):
+    """
+    Capture the IDE and try to answer without the LLM (blocking), see analyze_ide_state.
+    
+    Returns:
+        tuple: (image_input, thumbnail, local_state, confident, scores, result), where result
+            is the verdict if the unchanged screen or the local classifier already answered
+    """
+    # If we have IDE info, try to take an IDE window screenshot first
+    image_input = None
+    with _screen_lock, span("ide_check.screenshot", category="screenshot", ide=ide_name) as screenshot_span:
         if ide_name and project_name:
+            if focus_window and bring_to_front_window(ide_name, project_name):
+                # Give the window manager a moment to finish raising the window
+                time.sleep(0.3)
             # Try to capture IDE window screenshot
-            image_input = take_ide_window_screenshot(ide_name, project_name, verbose=False)
+            image_input = take_ide_window_screenshot(ide_name, project_name, verbose=False, crop_region=crop_region)
+            screenshot_span["source"] = "window"
             
         # If IDE window screenshot failed or we don't have IDE info, use full screen
         if image_input is None:
             from utils.computer_use_utils import get_llm_target_dimensions
             target_width, target_height = get_llm_target_dimensions()
             image_input = take_screenshot(target_width, target_height)
+            screenshot_span["source"] = "full_screen"
             
             # If we tried IDE window but fell back to full screen, this likely means IDE is not visible
             if ide_name and project_name:
                 print(f"Could not capture {ide_name} window screenshot, using full screen (IDE may not be visible)")
-        
-        # Save debug screenshot if requested
-        if save_debug_screenshot and screenshot_count is not None and ide_name and project_name:
-            save_image_to_file(image_input, ide_name, project_name, screenshot_count)
-        
-        # Use the shared Claude client for IDE state analysis
-        return analyze_ide_state_with_llm(image_input, interface_state_analysis_prompt, ide_name, project_name)
-    except Exception as e:
-        print(f"Error analyzing IDE state: {e}")
-        return False, f"error: {str(e)}", str(e)
+    
+    # Save debug screenshot if requested
+    if save_debug_screenshot and screenshot_count is not None and ide_name and project_name:
+        save_image_to_file(image_input, ide_name, project_name, screenshot_count)
+    
+    # Skip the LLM if the window looks the same as when it was last analyzed
+    thumbnail = None
+    if change_detector is not None:
+        thumbnail = change_detector.thumbnail(image_input)
+        cached_result = change_detector.reusable_verdict(thumbnail)
+        if cached_result is not None:
+            print(f"   Screen unchanged since last analysis, reusing verdict: {cached_result[1]}")
+            return image_input, thumbnail, None, False, {}, cached_result
+    
+    # Try the local template classifier before paying for a vision call
+    local_state, confident, scores = None, False, {}
+    if state_classifier is not None:
+        with span("ide_check.local_classifier", category="classifier", ide=ide_name) as classifier_span:
+            try:
+                local_state, confident, scores = state_classifier.classify(image_input)
+            except Exception as e:
+                print(f"WARNING: Local IDE state classifier failed: {e}")
+            classifier_span["state"] = local_state
+            classifier_span["confident"] = confident
+        if confident and not state_classifier.should_audit():
+            print(f"   Local classifier: {local_state} (match {scores[local_state]:.2f})")
+            state_classifier.stats.record_local_answer(state_classifier.agent_name)
+            result = (local_state == "done", local_state, f"Matched {local_state} markers locally (score {scores[local_state]:.2f})")
+            if change_detector is not None:
+                change_detector.record(thumbnail, result)
+            return image_input, thumbnail, local_state, confident, scores, result
+    
+    return image_input, thumbnail, local_state, confident, scores, None
 
 async def click_ide_resume_button(resume_button_prompt, ide_name=None, project_name=None):
     """
@@ -324,9 +410,9 @@ async def click_ide_resume_button(resume_button_prompt, ide_name=None, project_n
             
             # Click the resume button
             pyautogui.moveTo(result.coordinates.x, result.coordinates.y, duration=0.5)
-            time.sleep(0.5)
+            await asyncio.sleep(0.5)
             pyautogui.click(result.coordinates.x, result.coordinates.y)
-            time.sleep(2.0)  # Wait a bit for the resume to take effect
+            await asyncio.sleep(2.0)  # Wait a bit for the resume to take effect
             print("Successfully clicked resume button")
             return True
         else:
@@ -373,7 +459,13 @@ def save_image_to_file(image, ide_name, project_name, screenshot_count):
         print(f"Error saving image to file: {e}")
 
 
-async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, timeout_in_seconds, resume_button_prompt=None, require_two_subsequent_done_states=False, project_name=None, save_screenshots_for_debug=False):
+def _bring_to_front_locked(ide_name, project_name):
+    """Focus an IDE window while holding the screen lock"""
+    with _screen_lock:
+        return bring_to_front_window(ide_name, project_name)
+
+
+async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, timeout_in_seconds, resume_button_prompt=None, require_two_subsequent_done_states=False, project_name=None, save_screenshots_for_debug=False, crop_region=None, state_classifier=None, activity_monitor=None, focus_before_capture=False):
     """
     Wait until the specified IDE finishes processing.
     
@@ -384,6 +476,12 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
         resume_button_prompt (str, optional): Prompt for finding the resume button.
         require_two_subsequent_done_states (bool): Whether to require two consecutive "done" states.
         project_name (str, optional): Name of the project to verify correct window is focused.
+        crop_region (tuple, optional): Part of the IDE window to capture, see analyze_ide_state.
+        state_classifier (TemplateStateClassifier, optional): Local classifier, see analyze_ide_state.
+        activity_monitor (WorkspaceActivityMonitor, optional): Work directory watcher. Checks are
+            skipped while files are still changing, and sleeps end early once writes stop or
+            the output file appears.
+        focus_before_capture (bool): Raise the IDE window before every capture, see analyze_ide_state.
     """
     try:
         # Create a temporary directory for screenshots
@@ -407,6 +505,9 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
         check_interval = 30.0  # Start with 30 seconds
         screenshot_count = 0
         last_state = None
+        change_detector = ScreenChangeDetector()
+        last_analysis_time = 0.0
+        quiet_seconds = config.workspace_quiet_seconds
         
         while True:
             # Calculate elapsed and remaining time
@@ -416,6 +517,14 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
             # Check if we've exceeded the timeout
             if remaining <= 0:
                 break
+            
+            # Files still being written means the agent is still working; no need to look at the screen
+            # (but look at least every SCREEN_MAX_STALENESS_SECONDS in case it is waiting for input)
+            if (activity_monitor is not None and activity_monitor.is_active(quiet_seconds)
+                    and time.time() - last_analysis_time < config.screen_max_staleness_seconds):
+                print(f"\nWorkspace files changed {int(activity_monitor.seconds_since_change())}s ago, {ide_name} is still working. Skipping screenshot.")
+                await activity_monitor.wait_for_signal(min(check_interval, remaining), quiet_seconds)
+                continue
                 
             screenshot_count += 1
             
@@ -427,27 +536,34 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
             print("-" * 50)
             
             # Analyze IDE state (screenshot capture handled internally)
-            is_done, state, reasoning = analyze_ide_state(interface_state_analysis_prompt, ide_name, project_name, save_screenshots_for_debug, screenshot_count)
+            with span("ide_check", category="ide", ide=ide_name, check=screenshot_count) as check_span:
+                reused_before = change_detector.reused_count
+                is_done, state, reasoning = await analyze_ide_state(
+                    interface_state_analysis_prompt, ide_name, project_name,
+                    save_screenshots_for_debug, screenshot_count, change_detector, crop_region, state_classifier,
+                    focus_window=focus_before_capture)
+                last_analysis_time = time.time()
+                check_span["state"] = state
+                check_span["reused_verdict"] = change_detector.reused_count > reused_before
             
             # Handle IDE not visible state
             if state == "ide_not_visible":
                 print(f"\nIDE VISIBILITY ISSUE")
                 print(f"   IDE {ide_name} with project '{project_name}' is not visible")
                 print(f"   Attempting to bring window to focus...")
-                from utils.computer_use_utils import bring_to_front_window
-                
-                focus_success = bring_to_front_window(ide_name, project_name)
+                change_detector.reset()
+                focus_success = await asyncio.to_thread(_bring_to_front_locked, ide_name, project_name)
                 if focus_success:
                     print(f"   Successfully brought window to focus")
                     # Wait a moment for window to come to focus, then continue to next iteration
-                    time.sleep(1.0)
+                    await asyncio.sleep(1.0)
                     continue
                 else:
                     print(f"   ERROR: Could not bring {ide_name} window to focus")
                     from utils.computer_use_utils import play_beep_sound
                     play_beep_sound()
                     # Sleep for a shorter interval before checking again
-                    time.sleep(min(10.0, actual_sleep_time if 'actual_sleep_time' in locals() else 10.0))
+                    await asyncio.sleep(min(10.0, actual_sleep_time if 'actual_sleep_time' in locals() else 10.0))
                     continue
             
             # Report state change with clear formatting
@@ -464,10 +580,18 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
                 if require_two_subsequent_done_states:
                     print(f"\nVERIFICATION CHECK")
                     print(f"   Double-checking completion to avoid false positives...")
-                    is_done, state, reasoning = analyze_ide_state(interface_state_analysis_prompt, ide_name, project_name, save_screenshots_for_debug, screenshot_count)
+                    # Always a fresh LLM call with no local classifier; reusing either verdict would
+                    # defeat the double-check
+                    with span("ide_check", category="ide", ide=ide_name, check=screenshot_count, verification=True) as check_span:
+                        is_done, state, reasoning = await analyze_ide_state(
+                            interface_state_analysis_prompt, ide_name, project_name,
+                            save_screenshots_for_debug, screenshot_count, None, crop_region, None,
+                            use_llm_cache=False, focus_window=focus_before_capture)
+                        check_span["state"] = state
                     if state == "done":
                         print(f"\nSUCCESS: {ide_name} has completed its task!")
                         print(f"   Final reasoning: {reasoning}")
+                        print(f"   IDE checks: {change_detector.analyzed_count} analyzed, {change_detector.reused_count} reused")
                         print("=" * 60)
                         return True
                     else:
@@ -476,6 +600,7 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
                         print(f"   Reasoning: {reasoning}")
                 else:
                     print(f"\nSUCCESS: {ide_name} has completed its task!")
+                    print(f"   IDE checks: {change_detector.analyzed_count} analyzed, {change_detector.reused_count} reused")
                     print("=" * 60)
                     return True
             
@@ -487,6 +612,7 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
                 if resume_button_prompt:
                     resume_success = await click_ide_resume_button(resume_button_prompt, ide_name, project_name)
                     if resume_success:
+                        change_detector.reset()
                         print(f"   Successfully resumed {ide_name}")
                         print(f"   Continuing to monitor...")
                         # Continue monitoring - don't reset the timeout, just continue
@@ -520,7 +646,14 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
             print("." * 50 + " END CYCLE " + "." * 50)
             
             # Wait before next check (but don't sleep longer than remaining time)
-            time.sleep(actual_sleep_time)
+            if activity_monitor is not None:
+                signal = await activity_monitor.wait_for_signal(actual_sleep_time, quiet_seconds)
+                if signal == "output_file":
+                    print(f"Output file appeared, checking {ide_name} now")
+                elif signal == "quiescent":
+                    print(f"Workspace files stopped changing, checking {ide_name} now")
+            else:
+                await asyncio.sleep(actual_sleep_time)
             
             # Update check interval: decrease by 2 seconds, minimum 10 seconds
             check_interval = max(10.0, check_interval - 2.0)
@@ -530,6 +663,7 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
         print(f"\nTIMEOUT REACHED")
         print(f"   {ide_name} did not finish within {timeout_in_seconds} seconds")
         print(f"   Actual elapsed time: {int(final_elapsed)}s")
+        print(f"   IDE checks: {change_detector.analyzed_count} analyzed, {change_detector.reused_count} reused")
         print("=" * 60)
         return False
     except KeyboardInterrupt:
@@ -551,26 +685,79 @@ async def wait_until_ide_finishes(ide_name, interface_state_analysis_prompt, tim
         except Exception as e:
             print(f"Error cleaning up temporary files: {e}")
 
+@dataclass
+class IDEWatch:
+    """One (IDE, project) pair for wait_until_ides_finish to monitor"""
+    ide_name: str
+    project_name: str
+    interface_state_analysis_prompt: str
+    timeout_in_seconds: int
+    resume_button_prompt: Optional[str] = None
+    require_two_subsequent_done_states: bool = False
+    crop_region: Optional[Tuple[float, float, float, float]] = None
+    state_classifier: Optional[object] = None
+    activity_monitor: Optional[object] = None
+
+
+async def wait_until_ides_finish(watches: List[IDEWatch], save_screenshots_for_debug=False) -> Dict[Tuple[str, str], bool]:
+    """
+    Monitor several IDE windows at once until each finishes or times out.
+    
+    Each watch runs its own wait_until_ide_finishes loop on the current event loop.
+    With more than one watch, every check raises its IDE window and captures it under a
+    shared lock, while the LLM analyses overlap, so N IDEs cost about as much wall time
+    as the slowest one.
+    
+    Returns:
+        dict: (ide_name, project_name) -> whether that IDE finished within its timeout
+    """
+    results = await asyncio.gather(*(
+        wait_until_ide_finishes(
+            watch.ide_name,
+            watch.interface_state_analysis_prompt,
+            watch.timeout_in_seconds,
+            watch.resume_button_prompt,
+            require_two_subsequent_done_states=watch.require_two_subsequent_done_states,
+            project_name=watch.project_name,
+            save_screenshots_for_debug=save_screenshots_for_debug,
+            crop_region=watch.crop_region,
+            state_classifier=watch.state_classifier,
+            activity_monitor=watch.activity_monitor,
+            focus_before_capture=len(watches) > 1
+        )
+        for watch in watches
+    ))
+    return {(watch.ide_name, watch.project_name): result for watch, result in zip(watches, results)}
+
 if __name__ == "__main__":    
     import argparse
-    import asyncio
     
     parser = argparse.ArgumentParser(description="Wait for an IDE to finish processing")
     parser.add_argument("--ide", required=True, help="Name of the IDE to monitor")
     parser.add_argument("--timeout", type=int, default=600, help="Maximum time to wait in seconds")
     parser.add_argument("--interface_state_analysis_prompt", required=True, help="Prompt for IDE state analysis")
     parser.add_argument("--resume_button_prompt", help="Prompt for finding the resume button (optional)")
-    parser.add_argument("--project_name", help="Name of the project to verify correct window is focused (optional)")
+    parser.add_argument("--project_name", action="append",
+                        help="Name of the project to verify correct window is focused (optional; repeat to monitor several windows of the IDE at once)")
     
     args = parser.parse_args()
     
-    result = asyncio.run(wait_until_ide_finishes(
-        args.ide, 
-        args.interface_state_analysis_prompt, 
-        args.timeout, 
-        args.resume_button_prompt,
-        require_two_subsequent_done_states=False,
-        project_name=args.project_name,
-        save_screenshots_for_debug=True
-    ))
+    if args.project_name and len(args.project_name) > 1:
+        results = asyncio.run(wait_until_ides_finish(
+            [IDEWatch(args.ide, project_name, args.interface_state_analysis_prompt, args.timeout,
+                      args.resume_button_prompt)
+             for project_name in args.project_name],
+            save_screenshots_for_debug=True
+        ))
+        result = all(results.values())
+    else:
+        result = asyncio.run(wait_until_ide_finishes(
+            args.ide, 
+            args.interface_state_analysis_prompt, 
+            args.timeout, 
+            args.resume_button_prompt,
+            require_two_subsequent_done_states=False,
+            project_name=args.project_name[0] if args.project_name else None,
+            save_screenshots_for_debug=True
+        ))
     sys.exit(0 if result else 1)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+Local IDE State Classifier
+
+Recognizes the IDE state from stable visual markers (the stop button and spinner
+while the agent works, the resume button when it pauses, the feedback icons when it
+is done) by template matching, so most IDE checks are answered locally in
+milliseconds instead of by a multi-second vision LLM call.
+
+Reference templates come from the agent classes (CodingAgent.state_templates_dir):
+one sub-directory per state holding small PNG crops of that state's markers, e.g.
+
+    agents/templates/cursor/still_working/stop_button.png
+    agents/templates/cursor/done/thumbs_up.png
+
+Templates must be cropped at the scale of the monitor's screenshots (save a few with
+SAVE_SCREENSHOTS_FOR_DEBUG=true and crop the markers from those).
+
+The classifier only answers when it is confident; otherwise the caller falls back to
+analyze_ide_state_with_llm. Whenever both ran on the same frame (fallbacks plus a
+sampled fraction of confident answers) the outcome is recorded in classifier stats,
+so the match threshold can be tuned from real runs.
+
+No templates ship with the repository yet: until marker crops are added for an
+agent, for_agent() returns None and its checks go straight to the LLM.
+
+Template matching needs numpy (optional, not in requirements.txt); without it the
+classifier never answers.
+"""
+
+import io
+import os
+import json
+import random
+import threading
+import time
+from typing import Optional, Dict, List, Tuple, Union
+
+from PIL import Image
+
+from common.config import config
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# States in the order their markers take precedence: a resume prompt or a stop button
+# on screen overrides a "done" marker left over from an earlier turn
+STATE_PRIORITY = ["paused_and_wanting_to_resume", "still_working", "done"]
+
+
+class ClassifierStats:
+    """Agreement between the local classifier and the LLM, persisted for threshold tuning"""
+
+    MAX_SAMPLES = 500
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(config.execution_output_path, "ide_state_classifier_stats.json")
+        self._lock = threading.Lock()
+        self._data: Optional[Dict] = None
+
+    def _load(self) -> Dict:
+        if self._data is None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._data = json.load(f)
+            except (OSError, ValueError):
+                self._data = {"agents": {}}
+        return self._data
+
+    def _agent_stats(self, agent_name: str) -> Dict:
+        return self._load()["agents"].setdefault(agent_name, {
+            "local_answers": 0, "llm_fallbacks": 0, "compared": 0, "agreed": 0, "samples": []
+        })
+
+    def record_local_answer(self, agent_name: str):
+        with self._lock:
+            self._agent_stats(agent_name)["local_answers"] += 1
+
+    def record_comparison(self, agent_name: str, local_state: Optional[str], confident: bool,
+                          scores: Dict[str, float], llm_state: str):
+        """Record the local guess (confident or not) next to the LLM's verdict for the same frame"""
+        with self._lock:
+            stats = self._agent_stats(agent_name)
+            if not confident:
+                stats["llm_fallbacks"] += 1
+            if local_state is not None:
+                stats["compared"] += 1
+                stats["agreed"] += int(local_state == llm_state)
+            stats["samples"].append({
+                "time": time.time(),
+                "local_state": local_state,
+                "confident": confident,
+                "llm_state": llm_state,
+                "scores": {state: round(score, 3) for state, score in scores.items()}
+            })
+            del stats["samples"][:-self.MAX_SAMPLES]
+            self._save()
+
+    def summary(self, agent_name: str) -> Dict:
+        with self._lock:
+            stats = dict(self._agent_stats(agent_name))
+        stats.pop("samples", None)
+        stats["agreement_rate"] = round(stats["agreed"] / stats["compared"], 3) if stats["compared"] else None
+        return stats
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"WARNING: Failed to save IDE state classifier stats: {e}")
+
+
+class TemplateStateClassifier:
+    """Classifies IDE screenshots by normalized cross-correlation against per-state marker templates"""
+
+    # Frames and templates are matched at 1/MATCH_SCALE resolution; markers stay recognizable
+    # and matching is about MATCH_SCALE^2 times faster
+    MATCH_SCALE = 2
+
+    def __init__(self, agent_name: str, templates_dir: str, match_threshold: Optional[float] = None,
+                 audit_rate: Optional[float] = None, stats: Optional[ClassifierStats] = None):
+        self.agent_name = agent_name
+        self.match_threshold = config.local_classifier_threshold if match_threshold is None else match_threshold
+        self.audit_rate = config.local_classifier_audit_rate if audit_rate is None else audit_rate
+        self.stats = stats or classifier_stats
+        self.templates: Dict[str, List[Tuple[str, "np.ndarray"]]] = self._load_templates(templates_dir)
+        self._fft_cache: Dict = {}
+
+    @classmethod
+    def for_agent(cls, agent_name: str, templates_dir: Optional[str]) -> Optional["TemplateStateClassifier"]:
+        """Build a classifier for an agent, or None if it is disabled or has no templates"""
+        if not config.local_classifier_enabled or not templates_dir or not NUMPY_AVAILABLE:
+            return None
+        classifier = cls(agent_name, templates_dir)
+        return classifier if classifier.templates else None
+
+    @classmethod
+    def _to_grayscale_array(cls, image: Union[Image.Image, io.BytesIO]) -> "np.ndarray":
+        if isinstance(image, io.BytesIO):
+            image.seek(0)
+            pil_image = Image.open(image)
+            pil_image.load()
+            image.seek(0)
+        else:
+            pil_image = image
+        grayscale = pil_image.convert("L")
+        if min(grayscale.size) >= 8 * cls.MATCH_SCALE:
+            grayscale = grayscale.reduce(cls.MATCH_SCALE)
+        return np.asarray(grayscale, dtype=np.float64)
+
+    def _load_templates(self, templates_dir: str) -> Dict[str, List[Tuple[str, "np.ndarray"]]]:
+        templates = {}
+        for state in STATE_PRIORITY:
+            state_dir = os.path.join(templates_dir, state)
+            if not os.path.isdir(state_dir):
+                continue
+            for filename in sorted(os.listdir(state_dir)):
+                if not filename.lower().endswith((".png", ".jpg", ".jpeg", ".webp")):
+                    continue
+                try:
+                    with Image.open(os.path.join(state_dir, filename)) as template_image:
+                        template_image.load()
+                    # The marker can sit at any pixel offset relative to the downscaling grid,
+                    # so keep one downscaled variant per offset
+                    for dx in range(self.MATCH_SCALE):
+                        for dy in range(self.MATCH_SCALE):
+                            shifted = template_image.crop((dx, dy, template_image.width, template_image.height))
+                            templates.setdefault(state, []).append((filename, self._to_grayscale_array(shifted)))
+                except Exception as e:
+                    print(f"WARNING: Skipping unreadable IDE state template {filename}: {e}")
+        return templates
+
+    @staticmethod
+    def _fft_size(length: int) -> int:
+        """Round an FFT length up to a multiple of 64; prime lengths make numpy's FFT very slow"""
+        return -(-length // 64) * 64
+
+    @classmethod
+    def match_scores(cls, image: "np.ndarray", templates: List["np.ndarray"],
+                     fft_cache: Optional[Dict] = None) -> List[float]:
+        """Best normalized cross-correlation (-1..1) of each template anywhere in the image
+
+        fft_cache, if given, keeps the templates' FFTs between frames of the same size.
+        """
+        image_height, image_width = image.shape
+        fitting = [template for template in templates
+                   if template.shape[0] <= image_height and template.shape[1] <= image_width]
+        if not fitting:
+            return [0.0] * len(templates)
+
+        # One FFT of the frame is shared by all templates
+        fft_shape = (cls._fft_size(image_height + max(t.shape[0] for t in fitting)),
+                     cls._fft_size(image_width + max(t.shape[1] for t in fitting)))
+        image_fft = np.fft.rfft2(image, fft_shape)
+        integral = np.pad(image.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+        integral_squares = np.pad((image ** 2).cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+
+        scores = []
+        for template in templates:
+            height, width = template.shape
+            zero_mean_template = template - template.mean()
+            template_norm = np.sqrt((zero_mean_template ** 2).sum())
+            if height > image_height or width > image_width or template_norm == 0:
+                scores.append(0.0)
+                continue
+
+            cache_key = (id(template), fft_shape)
+            template_fft = fft_cache.get(cache_key) if fft_cache is not None else None
+            if template_fft is None:
+                template_fft = np.fft.rfft2(zero_mean_template[::-1, ::-1], fft_shape)
+                if fft_cache is not None:
+                    fft_cache[cache_key] = template_fft
+
+            # Sum of image * template for every placement, via FFT convolution with the flipped template
+            correlation = np.fft.irfft2(image_fft * template_fft, fft_shape)[height - 1:image_height, width - 1:image_width]
+
+            # Per-placement image energy around its mean, via integral images
+            def window_sums(table):
+                return (table[height:, width:] - table[:-height, width:]
+                        - table[height:, :-width] + table[:-height, :-width])
+
+            sums = window_sums(integral)
+            variance = window_sums(integral_squares) - sums ** 2 / (height * width)
+            denominator = np.sqrt(np.maximum(variance, 1e-6)) * template_norm
+            scores.append(float((correlation / denominator).max()))
+        return scores
+
+    def scores(self, image: Union[Image.Image, io.BytesIO]) -> Dict[str, float]:
+        """Best template score per state"""
+        frame = self._to_grayscale_array(image)
+        states = [state for state, state_templates in self.templates.items() for _ in state_templates]
+        templates = [template for state_templates in self.templates.values() for _, template in state_templates]
+        best: Dict[str, float] = {}
+        for state, score in zip(states, self.match_scores(frame, templates, self._fft_cache)):
+            best[state] = max(best.get(state, -1.0), score)
+        return best
+
+    def classify(self, image: Union[Image.Image, io.BytesIO]) -> Tuple[Optional[str], bool, Dict[str, float]]:
+        """
+        Classify a frame.
+
+        Returns:
+            tuple: (state, confident, scores). state is the highest-priority state whose markers
+            match above the threshold (or the best-scoring state as a guess if none do);
+            confident is False when the LLM should decide.
+        """
+        scores = self.scores(image)
+        if not scores:
+            return None, False, scores
+
+        for state in STATE_PRIORITY:
+            if scores.get(state, 0.0) >= self.match_threshold:
+                return state, True, scores
+
+        return max(scores, key=scores.get), False, scores
+
+    def should_audit(self) -> bool:
+        """Whether to also ask the LLM about a confident answer, to keep measuring agreement"""
+        return random.random() < self.audit_rate
+
+
+# Global stats instance shared by all classifiers in this process
+classifier_stats = ClassifierStats()
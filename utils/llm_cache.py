@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache
+
+Persistent cache for LLMClient calls. A call is keyed by everything that determines
+its answer: the model, the system prompt, the prompt, the SHA-256 of the image (if
+any), the JSON schema of the structured response model and the sampling parameters.
+Identical calls are then answered from disk instead of by the provider, e.g.:
+
+- PR content regenerated for the same agent report when a workflow is retried
+- IDE state analysis of a byte-identical screenshot on a later poll
+- Replaying a recorded session (point EXECUTION_OUTPUT_PATH at the recording and
+  set LLM_CACHE_TTL_SECONDS=0) so tests get the same answers every time
+
+Each entry is one JSON file under execution_output/llm_cache/. Entries expire after
+the TTL; when the cache holds more than the maximum number of entries the least
+recently used ones (by file mtime, refreshed on every hit) are evicted. Writes are
+atomic, so several processes can share the directory.
+
+The cache is off unless LLM_CACHE_ENABLED is set to true: a cached answer to a state
+question about an unchanged screenshot can hide that an IDE has moved on.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from typing import Optional, Dict, Any
+
+from common.config import config
+
+
+class LLMResponseCache:
+    """On-disk LRU/TTL cache of LLM responses"""
+
+    def __init__(self, cache_dir: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl_seconds: Optional[float] = None):
+        self.cache_dir = cache_dir or config.llm_cache_path
+        self.max_entries = config.llm_cache_max_entries if max_entries is None else max_entries
+        self.ttl_seconds = config.llm_cache_ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._entry_count: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, system_prompt: Optional[str], prompt: str, image_sha256: Optional[str] = None,
+                 response_schema: Optional[Dict[str, Any]] = None, **parameters) -> str:
+        """Build the cache key for a call from its inputs"""
+        payload = {
+            "model": model,
+            "system_prompt": system_prompt,
+            "prompt": prompt,
+            "image_sha256": image_sha256,
+            "response_schema": response_schema,
+            "parameters": parameters
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get the cached value for a key, or None if it is missing or expired"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self._count_miss()
+            return None
+        except (OSError, ValueError) as e:
+            print(f"WARNING: Ignoring unreadable LLM cache entry {path}: {str(e)}")
+            self._remove(path)
+            self._count_miss()
+            return None
+
+        if self.ttl_seconds and time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(path)
+            self._count_miss()
+            return None
+
+        try:
+            os.utime(path)  # Mark as recently used
+        except OSError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return entry.get("value")
+
+    def put(self, key: str, value: Any, model: Optional[str] = None):
+        """Store a JSON-serializable value under a key, evicting old entries if the cache is full"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._entry_path(key)
+            is_new = not os.path.exists(path)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"key": key, "model": model, "created_at": time.time(), "value": value},
+                          f, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"WARNING: Failed to store LLM cache entry: {str(e)}")
+            return
+
+        with self._lock:
+            if self._entry_count is None:
+                self._entry_count = self._count_entries()
+            elif is_new:
+                self._entry_count += 1
+            needs_eviction = self._entry_count > self.max_entries
+        if needs_eviction:
+            self._evict()
+
+    def _count_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def _count_entries(self) -> int:
+        try:
+            return sum(1 for name in os.listdir(self.cache_dir) if name.endswith(".json"))
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict(self):
+        """Drop expired entries, then the least recently used ones down to max_entries"""
+        entries = []
+        try:
+            with os.scandir(self.cache_dir) as scan:
+                for entry in scan:
+                    if entry.name.endswith(".json"):
+                        try:
+                            entries.append((entry.stat().st_mtime, entry.path))
+                        except OSError:
+                            continue
+        except OSError:
+            return
+
+        entries.sort()
+        now = time.time()
+        excess = len(entries) - self.max_entries
+        removed = 0
+        for mtime, path in entries:
+            # mtime is at least the creation time, so an entry whose mtime is past the TTL is expired
+            if removed < excess or (self.ttl_seconds and now - mtime > self.ttl_seconds):
+                self._remove(path)
+                removed += 1
+
+        with self._lock:
+            self.evictions += removed
+            self._entry_count = len(entries) - removed
+
+    def clear(self):
+        """Remove all entries"""
+        try:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith(".json"):
+                    self._remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+        with self._lock:
+            self._entry_count = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss statistics for this process"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None
+            }
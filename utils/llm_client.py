@@ -15,7 +15,10 @@ OpenAI-compatible format for responses.
 
 import os
 import json
+import time
 import base64
+import asyncio
+import hashlib
 import warnings
 from typing import Optional, Dict, Any, Union, Literal, List
 from PIL import Image
@@ -23,6 +26,10 @@ from io import BytesIO
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 
+from common.config import config
+from utils.llm_rate_limiter import LLMPriority, get_rate_limiter
+from utils.llm_telemetry import LLMCallRecord, record_call, current_caller, llm_caller, image_bytes_in_messages
+
 load_dotenv()
 
 # Supported LLM providers
@@ -68,6 +75,10 @@ class LLMClient:
         "openai": "openai/gpt-4o"
     }
     
+    # Transient provider errors worth retrying (litellm exception class names)
+    RETRYABLE_ERRORS = ("RateLimitError", "APIConnectionError", "Timeout", "InternalServerError",
+                        "ServiceUnavailableError")
+    
     def __init__(self, provider: Optional[LLMProvider] = None):
         """
         Initialize the LLM client with LiteLLM
@@ -104,6 +115,13 @@ class LLMClient:
         
         self._litellm = None
         self._check_dependencies()
+        
+        # Process-wide admission control shared by all clients of this provider
+        self.rate_limiter = get_rate_limiter(self.provider)
+        
+        # Optional on-disk response cache, created on first use
+        self.cache_enabled = config.llm_cache_enabled
+        self._cache = None
     
     def _check_dependencies(self):
         """Check if required dependencies are available"""
@@ -131,6 +149,19 @@ class LLMClient:
         
         return True
     
+    def _response_cache(self, use_cache: bool):
+        """Get the response cache, or None if caching is disabled or bypassed for this call"""
+        if not use_cache or not self.cache_enabled:
+            return None
+        if self._cache is None:
+            from .llm_cache import LLMResponseCache
+            self._cache = LLMResponseCache()
+        return self._cache
+    
+    def cache_stats(self) -> Optional[Dict[str, Any]]:
+        """Hit/miss statistics of the response cache, or None if it was never used"""
+        return self._cache.stats() if self._cache else None
+    
     def get_model_name(self, model: Optional[str] = None) -> str:
         """Get the full model name with provider prefix"""
         if model:
@@ -148,7 +179,8 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         model: Optional[str] = None,
         max_tokens: int = 2000,
-        expect_json: bool = False
+        expect_json: bool = False,
+        priority: LLMPriority = LLMPriority.NORMAL
     ) -> Optional[Dict[str, Any]]:
         """
         Analyze an image with a text prompt using LiteLLM
@@ -160,6 +192,7 @@ class LLMClient:
             model: Model to use (uses default if not specified)
             max_tokens: Maximum tokens in response
             expect_json: Whether to expect and parse JSON response
+            priority: Admission priority in the process-wide rate limiter
             
         Returns:
             Dict containing the analysis result, or None if failed
@@ -174,34 +207,10 @@ class LLMClient:
             if not base64_image:
                 return None
             
-            # Prepare message content for vision
-            message_content = [
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{base64_image}"
-                    }
-                },
-                {
-                    "type": "text",
-                    "text": prompt
-                }
-            ]
-            
-            # Create messages
-            messages = [{"role": "user", "content": message_content}]
-            
-            # Add system message if provided
-            if system_prompt:
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            
-            # Get model name
-            model_name = self.get_model_name(model)
-            
             # Prepare completion parameters
             completion_params = {
-                "model": model_name,
-                "messages": messages,
+                "model": self.get_model_name(model),
+                "messages": self._build_messages(prompt, system_prompt, base64_image),
                 "max_tokens": max_tokens,
                 "num_retries": 3  # Add retry mechanism
             }
@@ -211,7 +220,7 @@ class LLMClient:
                 completion_params["response_format"] = {"type": "json_object"}
             
             # Make the completion call using LiteLLM with retries
-            response = self._litellm.completion(**completion_params)
+            response = self._complete(completion_params, priority)
             
             # Extract response text from the response object
             response_text = response["choices"][0]["message"]["content"].strip()
@@ -232,7 +241,9 @@ class LLMClient:
         model: Optional[str] = None,
         max_tokens: int = 2000,
         expect_json: bool = False,
-        temperature: float = 0.0
+        temperature: float = 0.0,
+        use_cache: bool = True,
+        priority: LLMPriority = LLMPriority.NORMAL
     ) -> Optional[Dict[str, Any]]:
         """
         Generate text using LiteLLM
@@ -244,6 +255,8 @@ class LLMClient:
             max_tokens: Maximum tokens in response
             expect_json: Whether to expect and parse JSON response
             temperature: Sampling temperature (0.0 to 1.0)
+            use_cache: Whether an identical earlier call may answer from the response cache
+            priority: Admission priority in the process-wide rate limiter
             
         Returns:
             Dict containing the generated text, or None if failed
@@ -253,44 +266,200 @@ class LLMClient:
             return None
         
         try:
-            # Create messages
-            messages = [{"role": "user", "content": prompt}]
-            
-            # Add system message if provided
-            if system_prompt:
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            
-            # Get model name
-            model_name = self.get_model_name(model)
-            
-            # Prepare completion parameters
-            completion_params = {
-                "model": model_name,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "num_retries": 3
-            }
-            
-            # Add response_format if expecting JSON
-            if expect_json:
-                completion_params["response_format"] = {"type": "json_object"}
+            completion_params, cache, cache_key, cached_result = self._prepare_text_call(
+                prompt, system_prompt, model, max_tokens, expect_json, temperature, use_cache)
+            if cached_result is not None:
+                return cached_result
             
             # Make the completion call using LiteLLM with retries
-            response = self._litellm.completion(**completion_params)
-            
-            # Extract response text from the response object
-            response_text = response["choices"][0]["message"]["content"].strip()
-            
-            if expect_json:
-                return self._parse_json_response(response_text)
-            else:
-                return {"response": response_text, "success": True}
+            response = self._complete(completion_params, priority)
+            return self._text_result(response, expect_json, cache, cache_key, completion_params["model"])
                 
         except Exception as e:
             print(f"Error generating text with LLM: {e}")
             return {"error": str(e), "success": False}
     
+    def _prepare_text_call(self, prompt: str, system_prompt: Optional[str], model: Optional[str],
+                           max_tokens: int, expect_json: bool, temperature: float, use_cache: bool):
+        """Build completion parameters for a text call; returns (params, cache, cache_key, cached_result)"""
+        model_name = self.get_model_name(model)
+        
+        cache = self._response_cache(use_cache)
+        cache_key, cached_result = None, None
+        if cache:
+            cache_key = cache.make_key(model_name, system_prompt, prompt, max_tokens=max_tokens,
+                                       expect_json=expect_json, temperature=temperature)
+            cached_result = cache.get(cache_key)
+            if cached_result is not None:
+                self._record_cache_hit(model_name)
+        
+        # Prepare completion parameters
+        completion_params = {
+            "model": model_name,
+            "messages": self._build_messages(prompt, system_prompt),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "num_retries": 3
+        }
+        
+        # Add response_format if expecting JSON
+        if expect_json:
+            completion_params["response_format"] = {"type": "json_object"}
+        
+        return completion_params, cache, cache_key, cached_result
+    
+    def _text_result(self, response, expect_json: bool, cache, cache_key: Optional[str],
+                     model_name: str) -> Dict[str, Any]:
+        """Extract (and cache) the result of a text call"""
+        response_text = response["choices"][0]["message"]["content"].strip()
+        
+        if expect_json:
+            result = self._parse_json_response(response_text)
+        else:
+            result = {"response": response_text, "success": True}
+        
+        if cache and result.get("success"):
+            cache.put(cache_key, result, model_name)
+        return result
+    
+    def _build_messages(self, prompt: str, system_prompt: Optional[str] = None,
+                        base64_image: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Build the chat messages for a prompt, optionally with an image attached"""
+        if base64_image:
+            # Prepare message content for vision
+            content = [
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:{self._image_media_type(base64_image)};base64,{base64_image}"
+                    }
+                },
+                {
+                    "type": "text",
+                    "text": prompt
+                }
+            ]
+        else:
+            content = prompt
+        
+        messages = [{"role": "user", "content": content}]
+        
+        # Add system message if provided
+        if system_prompt:
+            messages.insert(0, {"role": "system", "content": system_prompt})
+        return messages
+    
+    def _complete(self, completion_params: Dict[str, Any], priority: LLMPriority):
+        """Make a completion call once the process-wide rate limiter admits it, retrying transient errors"""
+        params, max_retries = self._split_retries(completion_params)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                with self.rate_limiter.acquire(priority):
+                    response = self._litellm.completion(**params)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    self._record_call(params, started, attempt, error=e)
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._record_call(params, started, attempt, response=response)
+            return response
+    
+    async def _acomplete(self, completion_params: Dict[str, Any], priority: LLMPriority):
+        """Async completion call; litellm reuses its pooled async HTTP client across calls"""
+        params, max_retries = self._split_retries(completion_params)
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            try:
+                async with self.rate_limiter.acquire_async(priority):
+                    response = await self._litellm.acompletion(**params)
+            except Exception as e:
+                delay = self._retry_delay(e, attempt, max_retries)
+                if delay is None:
+                    self._record_call(params, started, attempt, error=e)
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            self._record_call(params, started, attempt, response=response)
+            return response
+    
+    @staticmethod
+    def _split_retries(completion_params: Dict[str, Any]):
+        """Take num_retries out of the parameters; retries go back through the rate limiter and are counted"""
+        params = dict(completion_params)
+        max_retries = params.pop("num_retries", 0)
+        params["num_retries"] = 0
+        return params, max_retries
+    
+    def _retry_delay(self, error: Exception, attempt: int, max_retries: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed call, or None if it should not be retried"""
+        rate_limited = self._note_rate_limit(error)
+        transient = type(error).__name__ in self.RETRYABLE_ERRORS or "overloaded" in str(error).lower()
+        if attempt >= max_retries or not (rate_limited or transient):
+            return None
+        # A rate-limited retry waits out the limiter's cooldown when it queues again
+        return 0.0 if rate_limited else min(8.0, 2.0 ** attempt)
+    
+    def _note_rate_limit(self, error: Exception) -> bool:
+        """Pause all callers if the provider rejected a call for exceeding its rate limit"""
+        if not self._is_rate_limit_error(error):
+            return False
+        retry_after = None
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if headers:
+            try:
+                retry_after = float(headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        self.rate_limiter.report_rate_limited(retry_after)
+        return True
+    
+    def _record_call(self, params: Dict[str, Any], started: float, retries: int,
+                     response=None, error: Optional[Exception] = None):
+        """Record a provider call (tokens, image bytes, latency, retries, outcome, cost) in LLM telemetry"""
+        input_tokens = output_tokens = 0
+        cost_usd = None
+        if response is not None:
+            usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+            if usage is not None:
+                input_tokens = (usage.get("prompt_tokens") if isinstance(usage, dict) else getattr(usage, "prompt_tokens", 0)) or 0
+                output_tokens = (usage.get("completion_tokens") if isinstance(usage, dict) else getattr(usage, "completion_tokens", 0)) or 0
+            try:
+                cost_usd = self._litellm.completion_cost(completion_response=response)
+            except Exception:
+                cost_usd = None  # Unknown model price
+        
+        if error is None:
+            outcome = "success"
+        else:
+            outcome = "rate_limited" if self._is_rate_limit_error(error) else "error"
+        
+        record_call(LLMCallRecord(
+            caller=current_caller(),
+            model=params.get("model", self.default_model),
+            outcome=outcome,
+            latency_seconds=time.monotonic() - started,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            image_bytes=image_bytes_in_messages(params.get("messages", [])),
+            retries=retries,
+            cost_usd=cost_usd
+        ))
+    
+    def _is_rate_limit_error(self, error: Exception) -> bool:
+        rate_limit_error = getattr(self._litellm, "RateLimitError", None)
+        return bool(rate_limit_error and isinstance(error, rate_limit_error)) or "rate limit" in str(error).lower()
+    
+    @staticmethod
+    def _record_cache_hit(model_name: str):
+        record_call(LLMCallRecord(caller=current_caller(), model=model_name, outcome="cache_hit"))
+    
     def _image_to_base64(self, image_input: Union[str, BytesIO, Image.Image]) -> Optional[str]:
         """Convert various image inputs to base64 string"""
         try:
@@ -324,6 +493,15 @@ class LLMClient:
             print(f"Error converting image to base64: {e}")
             return None
     
+    @staticmethod
+    def _image_media_type(base64_image: str) -> str:
+        """Detect the media type of a base64-encoded image from its leading bytes"""
+        if base64_image.startswith("/9j/"):
+            return "image/jpeg"
+        if base64_image.startswith("UklGR"):
+            return "image/webp"
+        return "image/png"
+    
     def _parse_json_response(self, response_text: str) -> Dict[str, Any]:
         """Parse JSON response from LLM, handling code blocks"""
         try:
@@ -381,7 +559,9 @@ class LLMClient:
         response_model: BaseModel,
         system_prompt: Optional[str] = None,
         model: Optional[str] = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        use_cache: bool = True,
+        priority: LLMPriority = LLMPriority.NORMAL
     ) -> Optional[BaseModel]:
         """
         Analyze an image with a text prompt using LiteLLM and return structured Pydantic response
@@ -393,6 +573,8 @@ class LLMClient:
             system_prompt: Optional system prompt for context
             model: Model to use (uses default if not specified)
             max_tokens: Maximum tokens in response
+            use_cache: Whether an identical earlier call (same image bytes) may answer from the response cache
+            priority: Admission priority in the process-wide rate limiter
             
         Returns:
             Instance of the response_model, or None if failed
@@ -402,68 +584,97 @@ class LLMClient:
             return None
         
         try:
-            # Convert image to base64
-            base64_image = self._image_to_base64(image_input)
-            if not base64_image:
+            prepared = self._prepare_image_structured_call(image_input, prompt, response_model, system_prompt,
+                                                           model, max_tokens, use_cache)
+            if prepared is None:
                 return None
-            
-            # Prepare message content for vision
-            message_content = [
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:image/png;base64,{base64_image}"
-                    }
-                },
-                {
-                    "type": "text",
-                    "text": prompt
-                }
-            ]
-            
-            # Create messages
-            messages = [{"role": "user", "content": message_content}]
-            
-            # Add system message if provided
-            if system_prompt:
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            
-            # Get model name
-            model_name = self.get_model_name(model)
-            
-            # Prepare completion parameters with Pydantic model
-            completion_params = {
-                "model": model_name,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "response_format": response_model,
-                "num_retries": 3
-            }
+            completion_params, cache, cache_key, cached_result = prepared
+            if cached_result is not None:
+                return cached_result
             
             # Make the completion call using LiteLLM with retries
-            response = self._litellm.completion(**completion_params)
-            
-            # Extract and parse the structured response
-            if hasattr(response.choices[0].message, 'parsed') and response.choices[0].message.parsed:
-                return response.choices[0].message.parsed
-            else:
-                # Fallback to manual parsing if parsed attribute not available
-                response_text = response.choices[0].message.content.strip()
-                return response_model.model_validate_json(response_text)
+            response = self._complete(completion_params, priority)
+            return self._structured_result(response, response_model, cache, cache_key, completion_params["model"])
                 
         except Exception as e:
             print(f"Error analyzing image with structured response: {e}")
+            self._print_error_hint(e)
+            return None
+    
+    async def aanalyze_image_with_structured_response(
+        self,
+        image_input: Union[str, BytesIO, Image.Image],
+        prompt: str,
+        response_model: BaseModel,
+        system_prompt: Optional[str] = None,
+        model: Optional[str] = None,
+        max_tokens: int = 2000,
+        use_cache: bool = True,
+        priority: LLMPriority = LLMPriority.NORMAL
+    ) -> Optional[BaseModel]:
+        """Async variant of analyze_image_with_structured_response"""
+        if not self.is_available():
+            print("ERROR: LLM client not available")
+            return None
+        
+        try:
+            prepared = self._prepare_image_structured_call(image_input, prompt, response_model, system_prompt,
+                                                           model, max_tokens, use_cache)
+            if prepared is None:
+                return None
+            completion_params, cache, cache_key, cached_result = prepared
+            if cached_result is not None:
+                return cached_result
             
-            # Provide more specific error handling for common issues
-            error_str = str(e).lower()
-            if "overloaded" in error_str:
-                print("INFO: Anthropic API is temporarily overloaded. LiteLLM will automatically retry with exponential backoff and fallback to alternative models if configured.")
-            elif "rate" in error_str and "limit" in error_str:
-                print("INFO: Rate limit encountered. LiteLLM will handle cooldown periods and retry automatically.")
-            elif "context" in error_str and ("length" in error_str or "window" in error_str):
-                print("INFO: Context window exceeded. LiteLLM will attempt fallback to models with larger context windows if configured.")
-            
+            response = await self._acomplete(completion_params, priority)
+            return self._structured_result(response, response_model, cache, cache_key, completion_params["model"])
+                
+        except Exception as e:
+            print(f"Error analyzing image with structured response: {e}")
+            self._print_error_hint(e)
+            return None
+    
+    def _prepare_image_structured_call(self, image_input: Union[str, BytesIO, Image.Image], prompt: str,
+                                       response_model: BaseModel, system_prompt: Optional[str],
+                                       model: Optional[str], max_tokens: int, use_cache: bool):
+        """Build completion parameters for a structured vision call; None if the image cannot be read"""
+        # Convert image to base64
+        base64_image = self._image_to_base64(image_input)
+        if not base64_image:
             return None
+        
+        model_name = self.get_model_name(model)
+        
+        cache = self._response_cache(use_cache)
+        cache_key, cached_result = None, None
+        if cache:
+            cache_key = cache.make_key(model_name, system_prompt, prompt,
+                                       image_sha256=hashlib.sha256(base64_image.encode("ascii")).hexdigest(),
+                                       response_schema=response_model.model_json_schema(), max_tokens=max_tokens)
+            cached_result = self._cached_structured_result(cache, cache_key, response_model)
+            if cached_result is not None:
+                self._record_cache_hit(model_name)
+        
+        # Prepare completion parameters with Pydantic model
+        completion_params = {
+            "model": model_name,
+            "messages": self._build_messages(prompt, system_prompt, base64_image),
+            "max_tokens": max_tokens,
+            "response_format": response_model,
+            "num_retries": 3
+        }
+        return completion_params, cache, cache_key, cached_result
+    
+    @staticmethod
+    def _print_error_hint(error: Exception):
+        """Provide more specific error handling for common issues"""
+        error_str = str(error).lower()
+        if "overloaded" in error_str:
+            print("INFO: Anthropic API is temporarily overloaded. The call was retried with exponential backoff before giving up.")
+        elif "rate" in error_str and "limit" in error_str:
+            print("INFO: Rate limit encountered. Further LLM calls are paused until the provider's cooldown passes.")
+        elif "context" in error_str and ("length" in error_str or "window" in error_str):
+            print("INFO: Context window exceeded. LiteLLM will attempt fallback to models with larger context windows if configured.")
 
     def generate_structured_text(
         self,
@@ -472,7 +683,9 @@ class LLMClient:
         system_prompt: Optional[str] = None,
         model: Optional[str] = None,
         max_tokens: int = 2000,
-        temperature: float = 0.1
+        temperature: float = 0.1,
+        use_cache: bool = True,
+        priority: LLMPriority = LLMPriority.NORMAL
     ) -> Optional[BaseModel]:
         """
         Generate structured text using LiteLLM with Pydantic model
@@ -484,6 +697,8 @@ class LLMClient:
             model: Model to use (uses default if not specified)
             max_tokens: Maximum tokens in response
             temperature: Sampling temperature (0.0 to 1.0)
+            use_cache: Whether an identical earlier call may answer from the response cache
+            priority: Admission priority in the process-wide rate limiter
             
         Returns:
             Instance of the response_model, or None if failed
@@ -493,51 +708,86 @@ class LLMClient:
             return None
         
         try:
-            # Create messages
-            messages = [{"role": "user", "content": prompt}]
-            
-            # Add system message if provided
-            if system_prompt:
-                messages.insert(0, {"role": "system", "content": system_prompt})
-            
-            # Get model name
-            model_name = self.get_model_name(model)
-            
-            # Prepare completion parameters with Pydantic model
-            completion_params = {
-                "model": model_name,
-                "messages": messages,
-                "max_tokens": max_tokens,
-                "temperature": temperature,
-                "response_format": response_model,
-                "num_retries": 3
-            }
+            completion_params, cache, cache_key, cached_result = self._prepare_structured_text_call(
+                prompt, response_model, system_prompt, model, max_tokens, temperature, use_cache)
+            if cached_result is not None:
+                return cached_result
             
             # Make the completion call using LiteLLM with retries
-            response = self._litellm.completion(**completion_params)
-            
-            # Extract and parse the structured response
-            if hasattr(response.choices[0].message, 'parsed') and response.choices[0].message.parsed:
-                return response.choices[0].message.parsed
-            else:
-                # Fallback to manual parsing if parsed attribute not available
-                response_text = response.choices[0].message.content.strip()
-                return response_model.model_validate_json(response_text)
+            response = self._complete(completion_params, priority)
+            return self._structured_result(response, response_model, cache, cache_key, completion_params["model"])
                 
         except Exception as e:
             print(f"Error generating structured text: {e}")
             return None
+    
+    def _prepare_structured_text_call(self, prompt: str, response_model: BaseModel, system_prompt: Optional[str],
+                                      model: Optional[str], max_tokens: int, temperature: float, use_cache: bool):
+        """Build completion parameters for a structured text call; returns (params, cache, cache_key, cached_result)"""
+        model_name = self.get_model_name(model)
+        
+        cache = self._response_cache(use_cache)
+        cache_key, cached_result = None, None
+        if cache:
+            cache_key = cache.make_key(model_name, system_prompt, prompt,
+                                       response_schema=response_model.model_json_schema(),
+                                       max_tokens=max_tokens, temperature=temperature)
+            cached_result = self._cached_structured_result(cache, cache_key, response_model)
+            if cached_result is not None:
+                self._record_cache_hit(model_name)
+        
+        # Prepare completion parameters with Pydantic model
+        completion_params = {
+            "model": model_name,
+            "messages": self._build_messages(prompt, system_prompt),
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format": response_model,
+            "num_retries": 3
+        }
+        return completion_params, cache, cache_key, cached_result
+    
+    def _structured_result(self, response, response_model: BaseModel, cache, cache_key: Optional[str],
+                           model_name: str) -> BaseModel:
+        """Extract (and cache) the response_model instance of a structured call"""
+        result = self._parse_structured_response(response, response_model)
+        if cache:
+            cache.put(cache_key, result.model_dump(mode="json"), model_name)
+        return result
+    
+    @staticmethod
+    def _parse_structured_response(response, response_model: BaseModel) -> BaseModel:
+        """Get the response_model instance from a LiteLLM completion response"""
+        if hasattr(response.choices[0].message, 'parsed') and response.choices[0].message.parsed:
+            parsed = response.choices[0].message.parsed
+            return parsed if isinstance(parsed, response_model) else response_model.model_validate(parsed)
+        # Fallback to manual parsing if parsed attribute not available
+        response_text = response.choices[0].message.content.strip()
+        return response_model.model_validate_json(response_text)
+    
+    @staticmethod
+    def _cached_structured_result(cache, cache_key: str, response_model: BaseModel) -> Optional[BaseModel]:
+        """Rebuild a cached structured response; None if missing or no longer valid for the model"""
+        cached_data = cache.get(cache_key)
+        if cached_data is None:
+            return None
+        try:
+            return response_model.model_validate(cached_data)
+        except Exception as e:
+            print(f"WARNING: Ignoring cached LLM response that no longer matches {response_model.__name__}: {e}")
+            return None
 
 
 # Global instance for easy access - completely LLM-agnostic
 llm_client = LLMClient()
 
 
-def analyze_ide_state_with_llm(
+async def analyze_ide_state_with_llm(
     image_input: Union[str, BytesIO, Image.Image],
     interface_state_analysis_prompt: str,
     ide_name: Optional[str] = None,
-    project_name: Optional[str] = None
+    project_name: Optional[str] = None,
+    use_cache: bool = True
 ) -> tuple[bool, str, str]:
     """
     Analyze IDE state using the configured LLM provider with structured response
@@ -547,6 +797,7 @@ def analyze_ide_state_with_llm(
         interface_state_analysis_prompt: Prompt for IDE state analysis
         ide_name: Optional IDE name for enhanced visibility detection
         project_name: Optional project name for enhanced visibility detection
+        use_cache: Whether a byte-identical screenshot may be answered from the response cache
         
     Returns:
         tuple: (bool, str, str) - (Whether the IDE is done, State, Reasoning)
@@ -556,7 +807,8 @@ def analyze_ide_state_with_llm(
         from .computer_use_utils import IDEContext, get_ide_window_title_for_project
         
         ide_context = IDEContext.create(ide_name)
-        expected_window_title = get_ide_window_title_for_project(ide_name, project_name)
+        # Looking up the window title runs AppleScript, which blocks
+        expected_window_title = await asyncio.to_thread(get_ide_window_title_for_project, ide_name, project_name)
         
         system_prompt = f"""You are an IDE State Analysis AI. Analyze screenshots of IDE interfaces to determine their current state.
 
@@ -589,12 +841,15 @@ State definitions:
 Analyze the image and provide your assessment in the required JSON format."""
     
     try:
-        result = llm_client.analyze_image_with_structured_response(
-            image_input=image_input,
-            prompt=interface_state_analysis_prompt,
-            response_model=IDEState,
-            system_prompt=system_prompt
-        )
+        with llm_caller("analyze_ide_state_with_llm"):
+            result = await llm_client.aanalyze_image_with_structured_response(
+                image_input=image_input,
+                prompt=interface_state_analysis_prompt,
+                response_model=IDEState,
+                system_prompt=system_prompt,
+                use_cache=use_cache,
+                priority=LLMPriority.BACKGROUND
+            )
         
         if result:
             state = result.interface_state.lower()
@@ -704,12 +959,13 @@ Guidelines for branch name:
     user_message = "\n".join(user_message_parts)
     
     try:
-        result = llm_client.generate_structured_text(
-            prompt=user_message,
-            response_model=CommitPRContent,
-            system_prompt=system_prompt,
-            max_tokens=2500
-        )
+        with llm_caller("generate_commit_and_pr_content_with_llm"):
+            result = llm_client.generate_structured_text(
+                prompt=user_message,
+                response_model=CommitPRContent,
+                system_prompt=system_prompt,
+                max_tokens=2500
+            )
         
         if result:
             return {
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+LLM Rate Limiter
+
+Process-wide admission control for LLM provider calls. Every call made through
+LLMClient first takes a slot from a concurrency limit and a token from a
+requests-per-minute token bucket, so tasks running side by side (the API runs each
+task's orchestrator on its own thread and event loop) share the provider's limits
+instead of tripping 429s independently.
+
+Waiting callers are admitted by priority, then arrival order: an interactive
+coordinate lookup (the agent is about to click) goes ahead of background IDE state
+polls that queued earlier. When the provider still answers with a rate limit error,
+report_rate_limited() pauses admissions for everyone until the cooldown passes.
+
+The limiter is thread-safe and works from synchronous code (acquire) as well as from
+coroutines on any event loop (acquire_async).
+"""
+
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+from enum import IntEnum
+from contextlib import contextmanager, asynccontextmanager
+from typing import Optional, Dict, List, Tuple
+
+from common.config import config
+
+
+class LLMPriority(IntEnum):
+    """Admission priority of an LLM call (lower is admitted first)"""
+    INTERACTIVE = 0  # Locating a UI element the agent is about to act on
+    NORMAL = 1  # One-off generation (PR content, analysis)
+    BACKGROUND = 2  # Periodic IDE state polls
+
+
+class LLMRateLimiter:
+    """Concurrency limit plus token bucket with priority-ordered admission"""
+
+    # Requests per minute allowed by the lowest paid tier of each provider
+    DEFAULT_REQUESTS_PER_MINUTE = {
+        "anthropic": 50,
+        "openai": 500
+    }
+
+    # Longest single sleep of a waiting coroutine, so it notices releases promptly
+    ASYNC_POLL_SECONDS = 0.05
+
+    def __init__(self, max_concurrent: int, requests_per_minute: int):
+        self.max_concurrent = max_concurrent
+        self.requests_per_minute = requests_per_minute
+        self._capacity = float(max(1, requests_per_minute)) if requests_per_minute else 0.0
+        self._tokens = self._capacity
+        self._refill_rate = requests_per_minute / 60.0
+        self._last_refill = time.monotonic()
+        self._blocked_until = 0.0
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int]] = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self.admitted = 0
+        self.total_wait_seconds = 0.0
+        self.rate_limited = 0
+
+    @classmethod
+    def for_provider(cls, provider: str) -> 'LLMRateLimiter':
+        """Build a limiter sized from the configured or default limits of a provider"""
+        requests_per_minute = config.llm_requests_per_minute
+        if requests_per_minute is None:
+            requests_per_minute = cls.DEFAULT_REQUESTS_PER_MINUTE.get(provider, 50)
+        return cls(config.llm_max_concurrent_requests, requests_per_minute)
+
+    def _refill(self, now: float):
+        if self._capacity:
+            self._tokens = min(self._capacity, self._tokens + (now - self._last_refill) * self._refill_rate)
+        self._last_refill = now
+
+    def _try_admit(self, ticket: Tuple[int, int]) -> float:
+        """Admit ticket if it is first in line and a slot and token are free; otherwise return seconds to wait"""
+        now = time.monotonic()
+        self._refill(now)
+        if self._waiters[0] != ticket or self._in_flight >= self.max_concurrent:
+            return self.ASYNC_POLL_SECONDS * 10  # Woken by notify_all when something changes
+        if now < self._blocked_until:
+            return self._blocked_until - now
+        if self._capacity and self._tokens < 1.0:
+            return (1.0 - self._tokens) / self._refill_rate
+
+        heapq.heappop(self._waiters)
+        if self._capacity:
+            self._tokens -= 1.0
+        self._in_flight += 1
+        self.admitted += 1
+        # The next waiter may now be admissible too
+        self._condition.notify_all()
+        return 0.0
+
+    def _enqueue(self, priority: LLMPriority) -> Tuple[int, int]:
+        ticket = (int(priority), next(self._sequence))
+        heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _abandon(self, ticket: Tuple[int, int]):
+        """Remove a waiter that gave up (e.g. a cancelled coroutine)"""
+        with self._condition:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+
+    def _release(self):
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify_all()
+
+    @contextmanager
+    def acquire(self, priority: LLMPriority = LLMPriority.NORMAL):
+        """Block until the call may go to the provider; hold the slot for the duration of the block"""
+        started = time.monotonic()
+        with self._condition:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait = self._try_admit(ticket)
+                    if wait <= 0:
+                        self.total_wait_seconds += time.monotonic() - started
+                        break
+                    self._condition.wait(timeout=wait)
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._condition.notify_all()
+                raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def acquire_async(self, priority: LLMPriority = LLMPriority.NORMAL):
+        """Async counterpart of acquire(); waits without blocking the event loop"""
+        started = time.monotonic()
+        with self._condition:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._condition:
+                    wait = self._try_admit(ticket)
+                    if wait <= 0:
+                        self.total_wait_seconds += time.monotonic() - started
+                if wait <= 0:
+                    break
+                await asyncio.sleep(min(wait, self.ASYNC_POLL_SECONDS))
+        except BaseException:
+            self._abandon(ticket)
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def report_rate_limited(self, retry_after: Optional[float] = None):
+        """Pause admissions after the provider returned a rate limit error"""
+        cooldown = retry_after if retry_after and retry_after > 0 else 60.0 / max(1, self.requests_per_minute or 60)
+        with self._condition:
+            self.rate_limited += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + cooldown)
+            self._tokens = 0.0
+            self._condition.notify_all()
+
+    def stats(self) -> Dict[str, float]:
+        """Admission statistics for this process"""
+        with self._condition:
+            return {
+                "admitted": self.admitted,
+                "waiting": len(self._waiters),
+                "in_flight": self._in_flight,
+                "rate_limited": self.rate_limited,
+                "average_wait_seconds": round(self.total_wait_seconds / self.admitted, 3) if self.admitted else 0.0
+            }
+
+
+_limiters: Dict[str, LLMRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> LLMRateLimiter:
+    """Get the process-wide limiter for a provider"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = LLMRateLimiter.for_provider(provider)
+        return _limiters[provider]
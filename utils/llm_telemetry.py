@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+LLM Call Telemetry
+
+Records every provider call made through LLMClient (model, input/output tokens,
+image bytes, latency, retries, outcome and estimated cost) and aggregates the
+records per caller and per model:
+
+- per run, for the collector made current with set_telemetry() (the orchestrator
+  does this for every task; the summary goes into the execution report and is
+  saved under execution_output/llm_usage/<run_id>.json for the API)
+- per process, in process_telemetry, since the process started
+
+Callers label their calls with llm_caller(), e.g.
+
+    with llm_caller("analyze_ide_state_with_llm"):
+        llm_client.analyze_image_with_structured_response(...)
+
+Like the tracer, the current collector and caller live in context variables, so
+they follow a run into asyncio.to_thread() workers and never mix between
+concurrent runs.
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Optional, Dict, Any, Iterator, List
+
+from common.config import config
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 20, 30, 60]
+
+
+@dataclass
+class LLMCallRecord:
+    """One LLM call as seen by LLMClient"""
+    caller: str
+    model: str
+    outcome: str  # "success", "error", "rate_limited" or "cache_hit"
+    latency_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    image_bytes: int = 0
+    retries: int = 0
+    cost_usd: Optional[float] = None
+    timestamp: float = field(default_factory=time.time)
+
+
+class _Aggregate:
+    """Running totals and latency histogram of a group of calls"""
+
+    def __init__(self):
+        self.calls = 0
+        self.outcomes: Dict[str, int] = {}
+        self.retries = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.image_bytes = 0
+        self.cost_usd = 0.0
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.latency_histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, record: LLMCallRecord):
+        self.calls += 1
+        self.outcomes[record.outcome] = self.outcomes.get(record.outcome, 0) + 1
+        self.retries += record.retries
+        self.input_tokens += record.input_tokens
+        self.output_tokens += record.output_tokens
+        self.image_bytes += record.image_bytes
+        self.cost_usd += record.cost_usd or 0.0
+        if record.outcome != "cache_hit":
+            self.latency_total += record.latency_seconds
+            self.latency_max = max(self.latency_max, record.latency_seconds)
+            bucket = next((index for index, bound in enumerate(LATENCY_BUCKETS) if record.latency_seconds <= bound),
+                          len(LATENCY_BUCKETS))
+            self.latency_histogram[bucket] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        provider_calls = self.calls - self.outcomes.get("cache_hit", 0)
+        labels = [f"<={bound}s" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}s"]
+        return {
+            "calls": self.calls,
+            "outcomes": dict(self.outcomes),
+            "retries": self.retries,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "image_bytes": self.image_bytes,
+            "cost_usd": round(self.cost_usd, 4),
+            "latency_seconds": {
+                "total": round(self.latency_total, 3),
+                "mean": round(self.latency_total / provider_calls, 3) if provider_calls else 0.0,
+                "max": round(self.latency_max, 3),
+                "histogram": dict(zip(labels, self.latency_histogram))
+            }
+        }
+
+
+class LLMTelemetry:
+    """Aggregates LLM call records overall, per caller and per model"""
+
+    def __init__(self, name: Optional[str] = None):
+        self.name = name
+        self._lock = threading.Lock()
+        self._total = _Aggregate()
+        self._by_caller: Dict[str, _Aggregate] = {}
+        self._by_model: Dict[str, _Aggregate] = {}
+
+    def record(self, record: LLMCallRecord):
+        with self._lock:
+            self._total.add(record)
+            self._by_caller.setdefault(record.caller, _Aggregate()).add(record)
+            self._by_model.setdefault(record.model, _Aggregate()).add(record)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals plus breakdowns by caller and by model"""
+        with self._lock:
+            summary = self._total.to_dict()
+            summary["by_caller"] = {caller: aggregate.to_dict() for caller, aggregate in self._by_caller.items()}
+            summary["by_model"] = {model: aggregate.to_dict() for model, aggregate in self._by_model.items()}
+            return summary
+
+    def save(self, run_id: str) -> Optional[str]:
+        """Write the summary to execution_output/llm_usage/<run_id>.json; returns the path or None"""
+        path = os.path.join(config.llm_usage_path, f"{run_id}.json")
+        try:
+            os.makedirs(config.llm_usage_path, exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"run_id": run_id, "saved_at": time.time(), **self.summary()}, f, indent=2)
+            os.replace(temp_path, path)
+            return path
+        except OSError as e:
+            print(f"WARNING: Failed to save LLM usage for run {run_id}: {e}")
+            return None
+
+
+# Process-wide totals since start
+process_telemetry = LLMTelemetry("process")
+
+# Collectors of runs in progress, by run id, so the API can report live usage
+_active_runs: Dict[str, LLMTelemetry] = {}
+_active_runs_lock = threading.Lock()
+
+_current_telemetry: contextvars.ContextVar[Optional[LLMTelemetry]] = contextvars.ContextVar(
+    "simulatedev_llm_telemetry", default=None)
+_current_caller: contextvars.ContextVar[str] = contextvars.ContextVar("simulatedev_llm_caller", default="other")
+
+
+def get_telemetry() -> Optional[LLMTelemetry]:
+    """Get the collector of the current run, if any"""
+    return _current_telemetry.get()
+
+
+def set_telemetry(telemetry: Optional[LLMTelemetry]) -> contextvars.Token:
+    """Make a collector current for this context (and visible to the API under its name, if it has one)"""
+    if telemetry is not None and telemetry.name:
+        with _active_runs_lock:
+            _active_runs[telemetry.name] = telemetry
+    return _current_telemetry.set(telemetry)
+
+
+def reset_telemetry(token: contextvars.Token):
+    """Restore the collector that was current before set_telemetry()"""
+    telemetry = _current_telemetry.get()
+    if telemetry is not None and telemetry.name:
+        with _active_runs_lock:
+            _active_runs.pop(telemetry.name, None)
+    _current_telemetry.reset(token)
+
+
+@contextmanager
+def llm_caller(name: str) -> Iterator[None]:
+    """Attribute the LLM calls made inside the block to a caller"""
+    token = _current_caller.set(name)
+    try:
+        yield
+    finally:
+        _current_caller.reset(token)
+
+
+def current_caller() -> str:
+    return _current_caller.get()
+
+
+def record_call(record: LLMCallRecord):
+    """Add a call record to the current run's collector and the process totals"""
+    process_telemetry.record(record)
+    telemetry = _current_telemetry.get()
+    if telemetry is not None:
+        telemetry.record(record)
+
+
+def get_run_usage(run_id: str) -> Optional[Dict[str, Any]]:
+    """LLM usage of a run: live if it is in progress in this process, else as saved when it finished"""
+    with _active_runs_lock:
+        telemetry = _active_runs.get(run_id)
+    if telemetry is not None:
+        return {"run_id": run_id, "in_progress": True, **telemetry.summary()}
+
+    path = os.path.join(config.llm_usage_path, f"{run_id}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def image_bytes_in_messages(messages: List[Dict[str, Any]]) -> int:
+    """Decoded size of the base64 images attached to chat messages"""
+    total = 0
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            continue
+        for part in content:
+            if part.get("type") == "image_url":
+                url = part.get("image_url", {}).get("url", "")
+                total += len(url.partition(",")[2]) * 3 // 4
+    return total
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Screen Change Detector
+
+Lets the IDE completion monitor skip the vision LLM when the IDE window looks the
+same as it did at the last analyzed check. Each screenshot is reduced to a small
+grayscale thumbnail and compared pixel by pixel with the thumbnail of the frame the
+last LLM verdict was based on:
+
+- If only a tiny fraction of the thumbnail changed (a blinking cursor, a clock),
+  the previous verdict is reused.
+- If the change is meaningful, or the previous verdict is older than the maximum
+  staleness window, the caller asks the LLM again.
+"""
+
+import io
+import time
+from typing import Optional, Tuple, Union
+
+from PIL import Image, ImageChops
+
+from common.config import config
+
+
+class ScreenChangeDetector:
+    """Reuses the last IDE state verdict while the monitored window is unchanged"""
+
+    # Small enough to make comparisons cheap and ignore scaling/compression noise,
+    # large enough that a new line of agent output changes dozens of pixels
+    THUMBNAIL_SIZE = (160, 100)
+
+    # Per-pixel grayscale difference below which a thumbnail pixel counts as unchanged
+    PIXEL_TOLERANCE = 16
+
+    def __init__(self, change_threshold: Optional[float] = None, max_staleness_seconds: Optional[float] = None):
+        self.change_threshold = config.screen_change_threshold if change_threshold is None else change_threshold
+        self.max_staleness_seconds = (config.screen_max_staleness_seconds
+                                      if max_staleness_seconds is None else max_staleness_seconds)
+        self._last_thumbnail: Optional[Image.Image] = None
+        self._last_verdict: Optional[Tuple[bool, str, str]] = None
+        self._last_verdict_time = 0.0
+        self.analyzed_count = 0
+        self.reused_count = 0
+
+    @classmethod
+    def thumbnail(cls, image: Union[Image.Image, io.BytesIO, None]) -> Optional[Image.Image]:
+        """Reduce a screenshot (PIL Image or BytesIO) to a grayscale thumbnail for comparison"""
+        if image is None:
+            return None
+        try:
+            if isinstance(image, io.BytesIO):
+                image.seek(0)
+                pil_image = Image.open(image)
+                pil_image.load()
+                image.seek(0)
+            else:
+                pil_image = image
+            return pil_image.convert("L").resize(cls.THUMBNAIL_SIZE, Image.BILINEAR)
+        except Exception as e:
+            print(f"WARNING: Could not fingerprint screenshot for change detection: {e}")
+            return None
+
+    @classmethod
+    def changed_fraction(cls, previous: Image.Image, current: Image.Image) -> float:
+        """Fraction of thumbnail pixels whose brightness changed beyond the tolerance"""
+        difference = ImageChops.difference(previous, current)
+        changed = difference.point(lambda value: 255 if value > cls.PIXEL_TOLERANCE else 0).histogram()[255]
+        return changed / (cls.THUMBNAIL_SIZE[0] * cls.THUMBNAIL_SIZE[1])
+
+    def reusable_verdict(self, thumbnail: Optional[Image.Image]) -> Optional[Tuple[bool, str, str]]:
+        """
+        Get the last verdict if the new frame is effectively unchanged and the verdict is still fresh.
+
+        Returns:
+            tuple: The previous (is_done, state, reasoning), or None if the LLM should be asked
+        """
+        if thumbnail is None or self._last_thumbnail is None or self._last_verdict is None:
+            return None
+        if time.time() - self._last_verdict_time >= self.max_staleness_seconds:
+            return None
+        if self.changed_fraction(self._last_thumbnail, thumbnail) > self.change_threshold:
+            return None
+
+        self.reused_count += 1
+        return self._last_verdict
+
+    def record(self, thumbnail: Optional[Image.Image], verdict: Tuple[bool, str, str]):
+        """Remember a fresh LLM verdict and the frame it was based on"""
+        self.analyzed_count += 1
+        # Errors and missing frames are never reused
+        if thumbnail is None or verdict[1].startswith("error"):
+            self.reset()
+            return
+        self._last_thumbnail = thumbnail
+        self._last_verdict = verdict
+        self._last_verdict_time = time.time()
+
+    def reset(self):
+        """Forget the last frame so the next check always goes to the LLM"""
+        self._last_thumbnail = None
+        self._last_verdict = None
+        self._last_verdict_time = 0.0
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+Workspace Activity Monitor
+
+Watches an agent's work directory for file changes while the agent runs. The
+completion detectors use it as a cheap signal:
+
+- While files are still being written the agent is obviously working, so the IDE
+  monitor can skip the screenshot and vision call for that check.
+- When writes stop (quiescence) or the agent's output file appears, the monitor
+  can wake up early and check immediately instead of sleeping out its interval.
+
+On Linux, changes are reported by inotify (through libc, no extra dependency).
+Elsewhere, or if inotify is unavailable, the directory is polled: `git status
+--porcelain` plus the mtimes of the files it lists for git repositories, an
+os.scandir walk otherwise.
+
+find_output_file() locates a file the agent was asked to write without a recursive
+glob over the whole repository, using what a monitor saw being created first.
+"""
+
+import os
+import time
+import struct
+import asyncio
+import hashlib
+import threading
+import subprocess
+from collections import deque
+from typing import Optional, Dict, List, Tuple
+
+# Directories whose churn says nothing about the agent's progress
+IGNORED_DIRS = {'.git', 'node_modules', '__pycache__', '.venv', 'venv', '.mypy_cache', '.pytest_cache', '.tox'}
+
+
+class WorkspaceActivityMonitor:
+    """Tracks when files in a work directory last changed"""
+
+    def __init__(self, root: str, output_file: Optional[str] = None, poll_interval: float = 2.0):
+        self.root = os.path.abspath(root)
+        self.output_file = output_file
+        self.poll_interval = poll_interval
+        self.backend: Optional[str] = None
+        self._last_change = 0.0
+        self._created_files: Dict[str, str] = {}  # file name -> path of the latest file created with it
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'WorkspaceActivityMonitor':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def start(self):
+        """Start watching in a background thread (inotify if possible, polling otherwise)"""
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        inotify = _Inotify.open(self.root)
+        if inotify is not None:
+            self.backend = "inotify"
+            target = lambda: self._run_inotify(inotify)
+        else:
+            self.backend = "polling"
+            target = self._run_polling
+        self._thread = threading.Thread(target=target, name="workspace-activity", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _mark_changed(self, created_paths: Tuple[str, ...] = ()):
+        with self._lock:
+            self._last_change = time.monotonic()
+            for path in created_paths:
+                self._created_files[os.path.basename(path)] = path
+
+    def created_file(self, filename: str) -> Optional[str]:
+        """Path of a file with this name that was created while watching, if it still exists"""
+        with self._lock:
+            path = self._created_files.get(filename)
+        return path if path and os.path.isfile(path) else None
+
+    def seconds_since_change(self) -> float:
+        """Seconds since the last observed file change (infinite if none was seen)"""
+        with self._lock:
+            last_change = self._last_change
+        return time.monotonic() - last_change if last_change else float("inf")
+
+    def is_active(self, quiet_seconds: float) -> bool:
+        """Whether files changed within the last quiet_seconds"""
+        return self.seconds_since_change() < quiet_seconds
+
+    def output_file_exists(self) -> bool:
+        """Whether the agent's output file is present in the work directory"""
+        return bool(self.output_file) and os.path.exists(os.path.join(self.root, self.output_file))
+
+    async def wait_for_signal(self, timeout: float, quiet_seconds: float) -> Optional[str]:
+        """
+        Sleep for up to timeout seconds, waking early on a completion signal.
+
+        Returns:
+            "output_file" if the output file appeared, "quiescent" if files were changing
+            and then stopped for quiet_seconds, or None if the timeout elapsed
+        """
+        output_existed = self.output_file_exists()
+        was_active = self.is_active(quiet_seconds)
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(1.0, remaining))
+            if not output_existed and self.output_file_exists():
+                return "output_file"
+            if self.is_active(quiet_seconds):
+                was_active = True
+            elif was_active:
+                return "quiescent"
+
+    # Polling backend
+
+    def _snapshot(self) -> Tuple[str, Tuple[str, ...]]:
+        """Fingerprint of the work directory's current contents, plus the untracked files git reports"""
+        digest = hashlib.sha1()
+        untracked = []
+        try:
+            status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=all"], cwd=self.root,
+                                    capture_output=True, text=True, timeout=30)
+        except (OSError, subprocess.TimeoutExpired):
+            status = None
+
+        if status is not None and status.returncode == 0:
+            # Include mtimes so repeated writes to an already-modified file still count
+            for line in status.stdout.splitlines():
+                path = os.path.join(self.root, line[3:].split(" -> ")[-1].strip('"'))
+                if line.startswith("??"):
+                    untracked.append(path)
+                try:
+                    stat = os.stat(path)
+                    digest.update(f"{line}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+                except OSError:
+                    digest.update(f"{line}\n".encode())
+            return digest.hexdigest(), tuple(untracked)
+
+        for path, stat in _walk_files(self.root):
+            digest.update(f"{path}|{stat.st_mtime_ns}|{stat.st_size}\n".encode())
+        return digest.hexdigest(), ()
+
+    def _run_polling(self):
+        previous, known_untracked = self._snapshot()
+        while not self._stop_event.wait(self.poll_interval):
+            current, untracked = self._snapshot()
+            if current != previous:
+                self._mark_changed(tuple(set(untracked) - set(known_untracked)))
+                previous, known_untracked = current, untracked
+
+    # inotify backend
+
+    def _run_inotify(self, inotify: '_Inotify'):
+        try:
+            while not self._stop_event.is_set():
+                changed, created_paths = inotify.read_events(timeout=0.5)
+                if changed:
+                    self._mark_changed(created_paths)
+        finally:
+            inotify.close()
+
+
+def find_output_file(root: str, filename: str,
+                     activity_monitor: Optional[WorkspaceActivityMonitor] = None) -> Optional[str]:
+    """
+    Find a file the agent wrote, without walking vendored or ignored trees.
+
+    Tries, in order: root/filename, a file of that name the activity monitor saw being
+    created, untracked non-ignored files from `git ls-files --others --exclude-standard`,
+    and finally a breadth-first os.scandir walk that prunes IGNORED_DIRS.
+
+    Returns:
+        Optional[str]: The path of the shallowest match, or None
+    """
+    root = os.path.abspath(root)
+    direct_path = os.path.join(root, filename)
+    if os.path.isfile(direct_path):
+        return direct_path
+
+    if activity_monitor is not None:
+        created_path = activity_monitor.created_file(filename)
+        if created_path and os.path.abspath(created_path).startswith(root + os.sep):
+            return created_path
+
+    try:
+        result = subprocess.run(["git", "ls-files", "--others", "--exclude-standard", "-z", "--", f"*{filename}"],
+                                cwd=root, capture_output=True, text=True, timeout=60)
+        if result.returncode == 0:
+            matches = [path for path in result.stdout.split("\0")
+                       if os.path.basename(path) == filename and not IGNORED_DIRS.intersection(path.split("/")[:-1])]
+            if matches:
+                return os.path.join(root, min(matches, key=lambda path: path.count("/")))
+    except (OSError, subprocess.TimeoutExpired):
+        pass
+
+    # Not a git repository, or the file is ignored by .gitignore
+    queue = deque([root])
+    while queue:
+        directory = queue.popleft()
+        subdirectories: List[str] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRS:
+                                subdirectories.append(entry.path)
+                        elif entry.name == filename and entry.is_file():
+                            return entry.path
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        queue.extend(sorted(subdirectories))
+    return None
+
+
+def _walk_files(root: str):
+    """Yield (path, stat) for every file under root, skipping IGNORED_DIRS"""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in IGNORED_DIRS:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry.path, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+
+class _Inotify:
+    """Minimal recursive inotify watcher using libc through ctypes (Linux only)"""
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self, libc, fd: int):
+        self._libc = libc
+        self.fd = fd
+        self._watches = {}
+
+    @classmethod
+    def open(cls, root: str) -> Optional['_Inotify']:
+        """Create a watcher for root and all its subdirectories, or None if inotify is unavailable"""
+        if not hasattr(os, "uname") or os.uname().sysname != "Linux":
+            return None
+        try:
+            import ctypes
+            import ctypes.util
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(cls.IN_NONBLOCK)
+            if fd < 0:
+                return None
+        except (OSError, AttributeError):
+            return None
+
+        watcher = cls(libc, fd)
+        if not watcher._add_tree(root):
+            watcher.close()
+            return None
+        return watcher
+
+    def _add_tree(self, root: str) -> bool:
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd < 0:
+                # Typically fs.inotify.max_user_watches; fall back to polling
+                return False
+            self._watches[wd] = directory
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(entry.path for entry in entries
+                                 if entry.is_dir(follow_symlinks=False) and entry.name not in IGNORED_DIRS)
+            except OSError:
+                continue
+        return True
+
+    def read_events(self, timeout: float) -> Tuple[bool, Tuple[str, ...]]:
+        """Wait up to timeout for events; returns whether any relevant file changed and the files created"""
+        import select
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False, ()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False, ()
+
+        changed = False
+        created_paths = []
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_length = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_length].rstrip(b"\0").decode(errors="replace")
+            offset += name_length
+            if mask & self.IN_ISDIR:
+                if name in IGNORED_DIRS:
+                    continue
+                if mask & self.IN_CREATE and wd in self._watches:
+                    self._add_tree(os.path.join(self._watches[wd], name))
+            elif mask & (self.IN_CREATE | self.IN_MOVED_TO) and wd in self._watches:
+                created_paths.append(os.path.join(self._watches[wd], name))
+            changed = True
+        return changed, tuple(created_paths)
+
+    def close(self):
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Workspace Pool for SimulateDev
+
+Keeps one bare mirror per repository and hands out a dedicated git worktree per
+task. Repeated tasks on the same repository only pay for an incremental fetch
+instead of a full clone, and concurrent tasks never share (or delete) each
+other's checkout.
+
+Layout (under execution_output/):
+    repo_mirrors/<owner>__<repo>.git       bare mirror, updated with `git fetch`
+    workspaces/<owner>__<repo>/<repo>-<n>  worktrees, `git worktree lock`-ed while leased
+
+A leased worktree is locked with `git worktree lock`, which git refuses to do twice,
+so the lock doubles as the lease across threads and processes. Released worktrees
+are unlocked and reused by the next task on the same repository (reset, cleaned and
+switched to a fresh branch off the latest default branch).
+
+The worktree of an interrupted run stays locked for `--resume`, with a lock reason
+naming the run; acquire() returns such worktrees to the pool once they are older than
+RESUME_WORKSPACE_TTL_HOURS.
+
+A mirror is created with the clone mode of the task that first needs it (the
+request's clone_mode, else CLONE_MODE): full or blobless. Shallow is not offered,
+since a mirror is long-lived and fetched incrementally; the orchestrator clones
+shallow requests directly instead. Worktrees can be limited to a sparse checkout
+of the directories a task mentions.
+"""
+
+import os
+import shutil
+import subprocess
+import threading
+import time
+import uuid
+from typing import Optional, List, Dict
+
+from common.config import config
+from utils.clone_repo import parse_repo_name, apply_sparse_checkout
+
+
+class WorkspacePool:
+    """Bare-mirror cache plus a pool of reusable git worktrees"""
+
+    LEASE_REASON = "leased by simulatedev"
+    KEEP_REASON_PREFIX = "kept by simulatedev for resume of run "
+    BRANCH_PREFIX = "simulatedev/workspace-"
+
+    def __init__(self, mirrors_dir: Optional[str] = None, workspaces_dir: Optional[str] = None,
+                 max_idle_workspaces: Optional[int] = None):
+        self.mirrors_dir = mirrors_dir or config.repo_mirrors_path
+        self.workspaces_dir = workspaces_dir or config.workspaces_path
+        self.max_idle_workspaces = (max_idle_workspaces if max_idle_workspaces is not None
+                                    else config.max_idle_workspaces)
+
+        # One lock per repository so mirror updates and slot allocation don't race in-process
+        self._repo_locks: Dict[str, threading.Lock] = {}
+        self._repo_locks_guard = threading.Lock()
+
+    @staticmethod
+    def repo_key(repo_url: str) -> str:
+        """Get a filesystem-safe key for a repository URL (e.g. 'owner__repo')"""
+        path = repo_url.strip().rstrip('/')
+        if path.endswith('.git'):
+            path = path[:-4]
+        parts = [part for part in path.replace(':', '/').split('/') if part]
+        return "__".join(parts[-2:]) if len(parts) >= 2 else parse_repo_name(repo_url)
+
+    def mirror_path(self, repo_url: str) -> str:
+        """Get the bare mirror directory for a repository"""
+        return os.path.join(self.mirrors_dir, f"{self.repo_key(repo_url)}.git")
+
+    def _repo_lock(self, repo_url: str) -> threading.Lock:
+        key = self.repo_key(repo_url)
+        with self._repo_locks_guard:
+            if key not in self._repo_locks:
+                self._repo_locks[key] = threading.Lock()
+            return self._repo_locks[key]
+
+    @staticmethod
+    def _run_git(args: List[str], cwd: Optional[str] = None, check: bool = True) -> subprocess.CompletedProcess:
+        return subprocess.run(["git"] + args, cwd=cwd, check=check,
+                              capture_output=True, text=True)
+
+    def ensure_mirror(self, repo_url: str, clone_mode: Optional[str] = None) -> Optional[str]:
+        """
+        Create the bare mirror for a repository, or bring an existing one up to date.
+
+        Upstream branches are kept under refs/remotes/origin/* so that pruning never
+        touches the per-workspace branches.
+
+        Args:
+            repo_url: Repository URL
+            clone_mode: "full" or "blobless" (defaults to config.clone_mode); only used when
+                the mirror is created
+
+        Returns:
+            str: Path to the bare mirror, or None if it could not be created
+        """
+        mirror = self.mirror_path(repo_url)
+
+        try:
+            if not os.path.isdir(mirror):
+                os.makedirs(self.mirrors_dir, exist_ok=True)
+                # Clone next to the final location and rename, so other processes
+                # never see a half-written mirror
+                temp_mirror = f"{mirror}.tmp-{uuid.uuid4().hex[:8]}"
+                print(f"Creating repository mirror for {repo_url}...")
+                clone_mode = clone_mode or config.clone_mode
+                if clone_mode not in ("full", "blobless"):
+                    raise ValueError(f"Clone mode '{clone_mode}' is not supported for mirrors")
+                clone_args = ["--filter=blob:none"] if clone_mode == "blobless" else []
+                self._run_git(["clone", "--bare", "--quiet"] + clone_args + [repo_url, temp_mirror])
+                try:
+                    os.rename(temp_mirror, mirror)
+                except OSError:
+                    # Another process created the mirror first
+                    shutil.rmtree(temp_mirror, ignore_errors=True)
+
+            # Pushes go to the target URL directly; origin is only kept so that fetches
+            # come from the requested URL
+            self._run_git(["--git-dir", mirror, "config", "remote.origin.url", repo_url])
+
+            start_time = time.time()
+            fetch = self._run_git(["--git-dir", mirror, "fetch", "--prune", "--quiet", repo_url,
+                                   "+refs/heads/*:refs/remotes/origin/*"], check=False)
+            if fetch.returncode != 0:
+                print(f"WARNING: Failed to update mirror for {repo_url}, using cached refs: {fetch.stderr.strip()}")
+            else:
+                print(f"Mirror for {repo_url} updated in {time.time() - start_time:.1f}s")
+
+            return mirror
+
+        except subprocess.CalledProcessError as e:
+            print(f"ERROR: Failed to create mirror for {repo_url}: {e.stderr.strip() if e.stderr else e}")
+            return None
+        except Exception as e:
+            print(f"ERROR: Failed to prepare mirror for {repo_url}: {str(e)}")
+            return None
+
+    def _default_branch(self, mirror: str) -> str:
+        result = self._run_git(["--git-dir", mirror, "symbolic-ref", "--short", "HEAD"], check=False)
+        branch = result.stdout.strip()
+        return branch if result.returncode == 0 and branch else "main"
+
+    def _list_worktrees(self, mirror: str) -> List[Dict[str, Optional[str]]]:
+        """Parse `git worktree list --porcelain` into dicts with path, branch and locked"""
+        result = self._run_git(["--git-dir", mirror, "worktree", "list", "--porcelain"], check=False)
+        if result.returncode != 0:
+            return []
+
+        worktrees = []
+        current: Dict[str, Optional[str]] = {}
+        for line in result.stdout.splitlines() + [""]:
+            if not line:
+                if current.get("path") and "bare" not in current:
+                    worktrees.append(current)
+                current = {}
+                continue
+            key, _, value = line.partition(" ")
+            if key == "worktree":
+                current["path"] = value
+            elif key == "branch":
+                current["branch"] = value[len("refs/heads/"):] if value.startswith("refs/heads/") else value
+            elif key in ("locked", "bare", "prunable"):
+                current[key] = value
+        return worktrees
+
+    def _owned_worktrees(self, repo_url: str, mirror: str) -> List[Dict[str, Optional[str]]]:
+        """Worktrees of this mirror that live in the pool's directory"""
+        repo_dir = os.path.realpath(os.path.join(self.workspaces_dir, self.repo_key(repo_url)))
+        return [wt for wt in self._list_worktrees(mirror)
+                if os.path.realpath(wt["path"]).startswith(repo_dir + os.sep)
+                and "prunable" not in wt]
+
+    def _new_branch_name(self) -> str:
+        return f"{self.BRANCH_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+    def _is_sparse(self, path: str) -> bool:
+        result = self._run_git(["config", "--get", "core.sparseCheckout"], cwd=path, check=False)
+        return result.stdout.strip() == "true"
+
+    def _set_lock_reason(self, path: str, reason: str):
+        """Replace the reason of a locked worktree (git keeps it in the worktree's admin "locked" file)"""
+        git_dir = self._run_git(["rev-parse", "--absolute-git-dir"], cwd=path).stdout.strip()
+        with open(os.path.join(git_dir, "locked"), 'w', encoding='utf-8') as f:
+            f.write(reason)
+
+    def _keep_reason(self, run_id: str) -> str:
+        return f"{self.KEEP_REASON_PREFIX}{run_id} at {int(time.time())}"
+
+    def _expire_kept_worktrees(self, mirror: str, worktrees: List[Dict[str, Optional[str]]]):
+        """Unlock worktrees kept for resume longer than the resume TTL so they can be recycled"""
+        max_age = config.resume_workspace_ttl_hours * 3600
+        for worktree in worktrees:
+            reason = worktree.get("locked") or ""
+            if not reason.startswith(self.KEEP_REASON_PREFIX):
+                continue
+            try:
+                kept_at = float(reason.rsplit(" at ", 1)[1])
+            except (IndexError, ValueError):
+                kept_at = 0
+            if time.time() - kept_at < max_age:
+                continue
+            if self._run_git(["--git-dir", mirror, "worktree", "unlock", worktree["path"]],
+                             check=False).returncode == 0:
+                del worktree["locked"]
+                print(f"INFO: Workspace {worktree['path']} was kept for resume too long, returning it to pool")
+
+    def _recycle(self, mirror: str, worktree: Dict[str, Optional[str]], base_ref: str,
+                 sparse_paths: Optional[List[str]] = None) -> bool:
+        """Reset an idle, already-locked worktree onto a fresh branch from base_ref"""
+        path = worktree["path"]
+        try:
+            self._run_git(["reset", "--hard", "--quiet"], cwd=path)
+            self._run_git(["clean", "-fdxq"], cwd=path)
+            self._run_git(["checkout", "--quiet", "--no-track", "-B", self._new_branch_name(), base_ref], cwd=path)
+            if sparse_paths or self._is_sparse(path):
+                apply_sparse_checkout(path, sparse_paths)
+
+            old_branch = worktree.get("branch")
+            if old_branch and old_branch.startswith(self.BRANCH_PREFIX):
+                self._run_git(["--git-dir", mirror, "branch", "-D", old_branch], check=False)
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"WARNING: Failed to recycle workspace {path}: {e.stderr.strip() if e.stderr else e}")
+            self._run_git(["--git-dir", mirror, "worktree", "unlock", path], check=False)
+            return False
+
+    def acquire(self, repo_url: str, sparse_paths: Optional[List[str]] = None,
+                clone_mode: Optional[str] = None) -> Optional[str]:
+        """
+        Lease a clean worktree of the repository's default branch on a fresh branch.
+
+        Args:
+            repo_url: Repository URL (or local path) to work on
+            sparse_paths: Paths the task needs; enables sparse checkout of their directories
+            clone_mode: "full" or "blobless" mirror if it has to be created (defaults to config.clone_mode)
+
+        Returns:
+            str: Path to the leased worktree, or None if the pool could not provide one
+        """
+        with self._repo_lock(repo_url):
+            mirror = self.ensure_mirror(repo_url, clone_mode)
+            if not mirror:
+                return None
+
+            base_ref = f"refs/remotes/origin/{self._default_branch(mirror)}"
+            if self._run_git(["--git-dir", mirror, "rev-parse", "--verify", "--quiet", base_ref],
+                             check=False).returncode != 0:
+                # Mirror predates the remote-tracking refs; fall back to the bare HEAD
+                base_ref = "HEAD"
+
+            worktrees = self._owned_worktrees(repo_url, mirror)
+            self._expire_kept_worktrees(mirror, worktrees)
+
+            # Prefer recycling an idle worktree; the lock fails if someone else got it first
+            for worktree in worktrees:
+                if "locked" in worktree:
+                    continue
+                lock = self._run_git(["--git-dir", mirror, "worktree", "lock",
+                                      "--reason", self.LEASE_REASON, worktree["path"]], check=False)
+                if lock.returncode == 0 and self._recycle(mirror, worktree, base_ref, sparse_paths):
+                    print(f"SUCCESS: Reusing workspace {worktree['path']}")
+                    return worktree["path"]
+
+            # Otherwise add a new worktree in the first free slot
+            repo_dir = os.path.join(self.workspaces_dir, self.repo_key(repo_url))
+            os.makedirs(repo_dir, exist_ok=True)
+            repo_name = parse_repo_name(repo_url)
+            for slot in range(1, 1000):
+                path = os.path.join(repo_dir, f"{repo_name}-{slot}")
+                if os.path.exists(path):
+                    continue
+                add_args = ["--no-checkout"] if sparse_paths else []
+                result = self._run_git(["--git-dir", mirror, "worktree", "add", "--quiet", "--lock"] + add_args +
+                                       ["-b", self._new_branch_name(), path, base_ref], check=False)
+                if result.returncode == 0:
+                    if sparse_paths:
+                        try:
+                            apply_sparse_checkout(path, sparse_paths)
+                            self._run_git(["reset", "--hard", "--quiet"], cwd=path)
+                        except subprocess.CalledProcessError as e:
+                            print(f"ERROR: Failed to check out workspace {path}: {e.stderr.strip() if e.stderr else e}")
+                            self._run_git(["--git-dir", mirror, "worktree", "unlock", path], check=False)
+                            return None
+                    print(f"SUCCESS: Created workspace {path}")
+                    return path
+                if not os.path.exists(path):
+                    print(f"ERROR: Failed to create workspace for {repo_url}: {result.stderr.strip()}")
+                    return None
+
+            print(f"ERROR: No free workspace slot for {repo_url}")
+            return None
+
+    def keep(self, repo_url: str, workspace_path: str, run_id: str):
+        """Keep a leased worktree locked for resuming the given run (see reclaim)"""
+        with self._repo_lock(repo_url):
+            try:
+                self._set_lock_reason(workspace_path, self._keep_reason(run_id))
+                print(f"INFO: Keeping workspace {workspace_path} for resume")
+            except (subprocess.CalledProcessError, OSError) as e:
+                print(f"WARNING: Failed to keep workspace {workspace_path} for resume: {str(e)}")
+
+    def reclaim(self, repo_url: str, workspace_path: str, run_id: str) -> bool:
+        """
+        Lease again a worktree kept for resuming the given run.
+
+        Returns:
+            bool: False if the worktree is no longer kept for that run (e.g. it expired
+                and was recycled by another task)
+        """
+        with self._repo_lock(repo_url):
+            mirror = self.mirror_path(repo_url)
+            if not os.path.isdir(mirror):
+                return False
+
+            keep_prefix = f"{self.KEEP_REASON_PREFIX}{run_id} at "
+            for worktree in self._owned_worktrees(repo_url, mirror):
+                if os.path.realpath(worktree["path"]) != os.path.realpath(workspace_path):
+                    continue
+                if not (worktree.get("locked") or "").startswith(keep_prefix):
+                    return False
+                try:
+                    self._set_lock_reason(workspace_path, self.LEASE_REASON)
+                except (subprocess.CalledProcessError, OSError) as e:
+                    print(f"WARNING: Failed to reclaim workspace {workspace_path}: {str(e)}")
+                    return False
+                return True
+            return False
+
+    def release(self, repo_url: str, workspace_path: str):
+        """
+        Return a leased worktree to the pool.
+
+        Worktrees beyond max_idle_workspaces for the repository are removed instead.
+        """
+        with self._repo_lock(repo_url):
+            mirror = self.mirror_path(repo_url)
+            if not os.path.isdir(mirror):
+                return
+
+            self._run_git(["--git-dir", mirror, "worktree", "unlock", workspace_path], check=False)
+
+            idle = [wt for wt in self._owned_worktrees(repo_url, mirror) if "locked" not in wt]
+            if len(idle) <= self.max_idle_workspaces:
+                print(f"INFO: Workspace {workspace_path} returned to pool")
+                return
+
+            branch = next((wt.get("branch") for wt in idle
+                           if os.path.realpath(wt["path"]) == os.path.realpath(workspace_path)), None)
+            result = self._run_git(["--git-dir", mirror, "worktree", "remove", "--force", workspace_path], check=False)
+            if result.returncode != 0:
+                print(f"WARNING: Failed to remove workspace {workspace_path}: {result.stderr.strip()}")
+                return
+            if branch and branch.startswith(self.BRANCH_PREFIX):
+                self._run_git(["--git-dir", mirror, "branch", "-D", branch], check=False)
+            print(f"INFO: Workspace {workspace_path} removed (pool already has {self.max_idle_workspaces} idle)")
+
+
+# Global workspace pool instance
+workspace_pool = WorkspacePool()